@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Build a million cards with the interned Card and with the original per-card checks, and compare memory.
+
+Example:
+  Run from the repository root::
+
+      $ python benchmarks/bench_cards.py
+
+"""
+
+import os
+import gc
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_card_game'))
+
+from engine import Card
+from engine.card import VALID_CARDS, BadCardParamsExepction, card_constraints
+
+
+class LegacyCard(object):
+  # The original Card, a dict per card, without its prints, kept here as the baseline.
+
+  def __init__(self, gold=0, diplomacy=0, stealth=0, might=0, victory_point=0, effect="None"):
+    super(LegacyCard, self).__init__()
+    self.gold = gold
+    self.diplomacy = diplomacy
+    self.stealth = stealth
+    self.might = might
+    self.effect = effect
+    self.victory_point = victory_point
+    attr_dict = self.__dict__
+
+    card_sum = 0
+    non_zero_count = 0
+    for attr in attr_dict.keys():
+      if attr != "effect":
+        val = attr_dict[attr]
+        card_sum += val
+        if val < card_constraints[attr][0] or val > card_constraints[attr][1]:
+          raise BadCardParamsExepction("attributes_are_bad")
+        elif val != 0:
+          non_zero_count += 1
+
+    if non_zero_count > 3:
+      raise BadCardParamsExepction("non_zero_count")
+    if card_sum > 6:
+      raise BadCardParamsExepction("card_sum")
+    elif (card_sum - victory_point) % 2 != 0:
+      raise BadCardParamsExepction("odd_sum")
+
+
+def build(card_class, attributes, count):
+  cards = []
+  append = cards.append
+  for i in xrange(count):
+    gold, diplomacy, stealth, might, victory_point = attributes[i % len(attributes)]
+    append(card_class(gold, diplomacy, stealth, might, victory_point))
+  return cards
+
+
+def memory(cards):
+  # Bytes held by the distinct card objects, and their attribute dicts where they have one
+  distinct = dict((id(card), card) for card in cards).values()
+  size = 0
+  for card in distinct:
+    size += sys.getsizeof(card)
+    if hasattr(card, '__dict__'):
+      size += sys.getsizeof(card.__dict__)
+  return size, len(distinct)
+
+
+def main(count=1000000):
+  attributes = sorted(VALID_CARDS)
+  print "%d cards, cycling through %d legal attribute sets" % (count, len(attributes))
+  for name, card_class in (("legacy", LegacyCard), ("interned", Card)):
+    best = min(timeit.repeat(lambda: build(card_class, attributes, count), number=1, repeat=3))
+    print "  %-8s %8.3f s, %6.2f us/card" % (name, best, best / count * 1e6)
+
+  print "100000 cards"
+  for name, card_class in (("legacy", LegacyCard), ("interned", Card)):
+    cards = build(card_class, attributes, 100000)
+    size, distinct = memory(cards)
+    print "  %-8s %8d distinct objects, %6.2f MB" % (name, distinct, size / 1e6)
+    del cards
+    gc.collect()
+
+
+if __name__ == '__main__':
+  main()
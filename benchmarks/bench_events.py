@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare notify and subscribe costs of EventHandler with the original list-based handler.
+
+Example:
+  Run from the repository root::
+
+      $ python benchmarks/bench_events.py
+
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_card_game'))
+
+from engine import EventHandler
+
+
+class LegacyEventHandler:
+  # The original engine EventHandler, kept here as the baseline.
+
+  def __init__(self):
+    self.functions = []
+
+  def __iadd__(self, function):
+    if function not in self.functions:
+      self.functions.append(function)
+    return self
+
+  def __isub__(self, function):
+    if function in self.functions:
+      self.functions.remove(function)
+    return self
+
+  def notify(self, *args):
+    for function in self.functions:
+      function(*args)
+
+
+class Listener(object):
+
+  def __init__(self):
+    self.count = 0
+
+  def on_event(self, event):
+    self.count += 1
+
+
+def function_listener(event):
+  pass
+
+
+def subscribe(handler_class, listeners):
+  handler = handler_class()
+  for listener in listeners:
+    handler += listener
+  return handler
+
+
+def main():
+  for subscribers in (10, 1000, 5000):
+    listeners = [Listener() for i in range(subscribers)]
+    methods = [listener.on_event for listener in listeners]
+    functions = [function_listener] + [(lambda event: None) for i in range(subscribers - 1)]
+    number = max(20000 / subscribers, 5)
+    print "%d subscribers" % subscribers
+
+    for name, handler_class in (("legacy", LegacyEventHandler), ("handler", EventHandler)):
+      best = min(timeit.repeat(lambda: subscribe(handler_class, methods), number=1, repeat=3))
+      print "  %-8s subscribe all      %10.2f ms" % (name, best * 1e3)
+
+      for kind, callbacks in (("methods", methods), ("functions", functions)):
+        handler = subscribe(handler_class, callbacks)
+        best = min(timeit.repeat(lambda: handler.notify(None), number=number, repeat=3))
+        print "  %-8s notify %-10s  %10.2f us/notify, %6.3f us/callback" % (
+            name, kind, best / number * 1e6, best / number / subscribers * 1e6)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare list hands with bitboard hands for Hearts legal-move generation.
+
+Example:
+  Run from the repository root::
+
+      $ python benchmarks/bench_hand.py
+
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_card_game'))
+
+from engine import bitboard, encoding
+from game import Heart2
+
+
+def main():
+  rng = random.Random(0)
+  game = Heart2.Hearts(headless=True, seed=0)
+  game.firstTrick = False
+  player = Heart2.Player("bench", None)
+
+  # A fixed set of (hand, lead card) states, shared by both paths
+  states = []
+  for i in range(1000):
+    cards = rng.sample(game.deck, 14)
+    states.append((cards[1:], cards[0], bitboard.mask_from_cards(cards[1:])))
+
+  def list_path():
+    for hand, lead, mask in states:
+      player.hand = hand
+      game.legal_cards(player, [lead])
+
+  def mask_path():
+    legal_moves = Heart2.legal_moves
+    for hand, lead, mask in states:
+      legal_moves(mask, lead.suit, False, False)
+
+  def list_contains():
+    for hand, lead, mask in states:
+      lead in hand
+
+  def mask_contains():
+    for hand, lead, mask in states:
+      mask >> encoding.from_card(lead) & 1
+
+  cases = [
+      ("legal, list", list_path),
+      ("legal, bitboard", mask_path),
+      ("contains, list", list_contains),
+      ("contains, bitboard", mask_contains),
+  ]
+  print "%d hands of 13 cards" % len(states)
+  for name, function in cases:
+    best = min(timeit.repeat(function, number=20, repeat=3))
+    print "  %-20s %8.3f us/hand" % (name, best / 20 / len(states) * 1e6)
+
+
+if __name__ == '__main__':
+  main()
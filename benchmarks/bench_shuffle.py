@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare the engine's Fisher-Yates shuffle with the original pop() shuffle.
+
+Example:
+  Run from the repository root::
+
+      $ python benchmarks/bench_shuffle.py
+
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_card_game'))
+
+from engine import Shuffler
+
+
+def legacy_shuffle(deck):
+  # The original CardEngine.shuffle, kept here as the baseline.
+  temp = []
+  shuffled = []
+  for i in range(0, len(deck)):
+    temp.append(deck[i])
+  for i in range(0, len(deck)):
+    rand = random.randrange(0, len(deck) - i)
+    shuffled.append(temp.pop(rand))
+  return shuffled
+
+
+def main():
+  shuffler = Shuffler(seed=0)
+  for decks in (1, 6, 20):
+    deck = range(52 * decks)
+    number = 2000 / decks
+    cases = [
+        ("legacy", lambda: legacy_shuffle(deck)),
+        ("shuffled", lambda: shuffler.shuffled(deck)),
+        ("in place", lambda: shuffler.shuffle(deck)),
+    ]
+    print "%d card shoe, %d shuffles" % (len(deck), number)
+    for name, function in cases:
+      best = min(timeit.repeat(function, number=number, repeat=3))
+      print "  %-10s %8.2f us/shuffle" % (name, best / number * 1e6)
+
+  shoes = [range(52 * 6) for i in range(100)]
+  best = min(timeit.repeat(lambda: shuffler.shuffle_all(shoes), number=20, repeat=3))
+  print "shuffle_all, 100 x 312 cards: %.2f ms/call" % (best / 20 * 1e3)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,646 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmark suite for the engine, hitbox and UI hot paths, with stored baselines.
+
+Every benchmark reports the best time per call over a few repeats.  The results
+are compared with ``baseline.json`` next to this script, and the run fails when
+any benchmark is slower than its baseline by more than the threshold, so a
+performance change shows up in the commit that made it.  A benchmark over the
+threshold is timed again, with ``reference``, up to ``--confirm`` more times
+keeping the best, and only counts as a regression when it stays over, since
+one slow run on a busy machine is common.  Save new baselines with ``--save``
+after a deliberate change.
+
+Every run also times ``reference``, plain interpreter work that none of the
+changes to this repository touch, and the baselines are scaled by how much
+faster or slower it ran than when they were saved.  That makes a baseline
+saved on one machine usable on another, within the noise of the machines;
+on a very different machine or interpreter, save new baselines before
+relying on small thresholds.
+
+The UI benchmarks need pygame.  They run without a window through SDL's dummy
+video driver, and are skipped when pygame is not installed.  They are allowed
+``UI_NOISE`` more change than the threshold, since they vary more.
+
+Example:
+  Run from the repository root::
+
+      $ python benchmarks/run.py
+      $ python benchmarks/run.py --filter hitbox --threshold 0.1
+      $ python benchmarks/run.py --save
+
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from StringIO import StringIO
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'python_card_game'))
+sys.path.insert(0, os.path.join(ROOT, 'python_card_game', 'ui'))
+
+from engine import Card, CardEngine, Event, EventType, MouseButton
+from engine.card import CARD_ATTRIBUTES, VALID_CARDS
+from engine.cardtable import CardTable
+from engine.catalog import CSV, JSON_LINES, CatalogLoader
+from engine.effects import EffectQueue, EffectRegistry
+from engine.geometry import PointArray, fan_layout
+from engine.hitbox import Point, SquareHitbox
+from engine.hitboxset import HitboxSet
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# name -> (setup, number of calls per repeat, needs pygame, extra threshold).  setup returns the function to time.
+BENCHMARKS = []
+
+# Extra change allowed for the UI benchmarks.  Blits and font rendering are SDL's work, not the interpreter's, so
+# REFERENCE scales their baselines less well and they vary more between runs.
+UI_NOISE = 0.5
+
+# The machine speed benchmark every run includes, and its calls per repeat
+REFERENCE = 'reference'
+REFERENCE_NUMBER = 2000
+
+
+def benchmark(name, number, ui=False, noise=None):
+  # noise is added to the threshold for this benchmark, UI_NOISE by default for the UI ones
+  if noise is None:
+    noise = UI_NOISE if ui else 0.0
+
+  def register(setup):
+    BENCHMARKS.append((name, setup, number, ui, noise))
+    return setup
+  return register
+
+
+class FakeElement(object):
+  # Stand-in for a UI element, for benchmarking the engine without pygame.
+
+  def __init__(self, x, y, z):
+    self.z = z
+    self.hitbox = SquareHitbox(x, y, 72, 96, 0)
+
+  def collide(self, x, y):
+    return self.hitbox.collide(x, y)
+
+  def get_bounds(self):
+    return self.hitbox.get_bounds()
+
+  def render(self, surface):
+    pass
+
+
+def new_deck():
+  return CardEngine.create_deck((1, 2, 3, 4), range(1, 14))
+
+
+def table(elements=200):
+  # A screen full of overlapping cards
+  CardEngine.init(800, 600, seed=0, headless=True)
+  CardEngine.remove_all_ui_elements()
+  generator = random.Random(0)
+  for i in range(elements):
+    CardEngine.add_ui_element(FakeElement(generator.randrange(0, 728), generator.randrange(0, 504), i % 7))
+
+
+# Engine
+
+@benchmark('engine.shuffle', 20000)
+def bench_shuffle():
+  CardEngine.seed(0)
+  deck = new_deck()
+  return lambda: CardEngine.shuffle(deck)
+
+
+@benchmark('engine.create_deck', 20000)
+def bench_create_deck():
+  return new_deck
+
+
+@benchmark('engine.deal_cards', 20000)
+def bench_deal_cards():
+  deck = new_deck()
+
+  def deal():
+    # Includes copying the deck, as dealing empties it
+    source = list(deck)
+    for i in range(4):
+      CardEngine.deal_cards(source, [], 13)
+  return deal
+
+
+@benchmark('engine.transfer_cards', 20000)
+def bench_transfer_cards():
+  deck = new_deck()
+  moved = deck[::4]
+
+  def transfer():
+    CardEngine.transfer_cards(moved, list(deck), [])
+  return transfer
+
+
+@benchmark('card.create', 300000)
+def bench_card_create():
+  # A card that is already in a deck, found interned.  The default argument keeps the deck alive.
+  deck = [Card(2, 0, 0, 2, 2)]
+  return lambda deck=deck: Card(2, 0, 0, 2, 2)
+
+
+@benchmark('card.create.new', 100000)
+def bench_card_create_new():
+  # A card with no live copy, validated and interned, then dropped again
+  return lambda: Card(0, 2, 2, 0, 2)
+
+
+def catalog_rows(count=1000):
+  # Every legal card in turn, with an effect on some
+  attributes = sorted(VALID_CARDS)
+  return [attributes[i % len(attributes)] + (('draw', 'steal', 'None')[i % 3],) for i in range(count)]
+
+
+def effect_card_class():
+  # A Card class with a registry of its own for the effects of catalog_rows, each adding the card to the state.
+  # Registering them on the global EFFECTS would leave them there for every later benchmark.
+  registry = EffectRegistry()
+  for name in ('draw', 'steal', 'trade'):
+    registry.register(name, lambda state, card: state.append(card))
+
+  class EffectCard(Card):
+    __slots__ = ()
+    effects = registry
+  return EffectCard
+
+
+@benchmark('catalog.load.jsonl.1000', 200)
+def bench_catalog_jsonl():
+  names = CARD_ATTRIBUTES + ('effect',)
+  text = ''.join(json.dumps(dict(zip(names, row))) + '\n' for row in catalog_rows())
+  loader = CatalogLoader(card_class=effect_card_class())
+  return lambda: list(loader.load(StringIO(text), JSON_LINES))
+
+
+@benchmark('catalog.load.csv.1000', 200)
+def bench_catalog_csv():
+  text = ','.join(CARD_ATTRIBUTES + ('effect',)) + '\n'
+  text += ''.join(','.join(str(value) for value in row) + '\n' for row in catalog_rows())
+  loader = CatalogLoader(card_class=effect_card_class())
+  return lambda: list(loader.load(StringIO(text), CSV))
+
+
+def resource_deck(count=10000, card_class=Card):
+  return [card_class(*row) for row in catalog_rows(count)]
+
+
+@benchmark('cards.totals.10000', 20)
+def bench_card_totals():
+  deck = resource_deck()
+  return lambda: dict((name, sum(getattr(card, name) for card in deck)) for name in CARD_ATTRIBUTES)
+
+
+@benchmark('cardtable.totals.10000', 500)
+def bench_cardtable_totals():
+  table = CardTable.from_cards(resource_deck())
+  return table.totals
+
+
+@benchmark('cardtable.histogram.10000', 500)
+def bench_cardtable_histogram():
+  table = CardTable.from_cards(resource_deck())
+  return lambda: table.histogram('gold')
+
+
+@benchmark('cardtable.filter.10000', 100)
+def bench_cardtable_filter():
+  table = CardTable.from_cards(resource_deck())
+  return lambda: table.filter(gold=(2, 4), victory_point=2)
+
+
+def effect_cards(count=1000):
+  # A turn's worth of cards whose effects all count into the state
+  return resource_deck(count, effect_card_class())
+
+
+@benchmark('effects.by_name.1000', 500)
+def bench_effects_by_name():
+  cards = effect_cards()
+  registry = cards[0].effects
+  handlers = dict((name, registry.handler(name)) for name in ('draw', 'steal', 'trade'))
+
+  def apply_all(state=[]):
+    for card in cards:
+      if card.effect != "None":
+        handlers[card.effect](state, card)
+    del state[:]
+  return apply_all
+
+
+@benchmark('effects.apply_all.1000', 2000)
+def bench_effects_apply_all():
+  cards = effect_cards()
+  registry = cards[0].effects
+
+  def apply_all(state=[]):
+    registry.apply_all(state, cards)
+    del state[:]
+  return apply_all
+
+
+@benchmark('effects.queue.1000', 2000)
+def bench_effects_queue():
+  cards = effect_cards()
+  queue = EffectQueue(cards[0].effects)
+
+  def apply_all(state=[]):
+    queue.extend(cards)
+    queue.run(state)
+    del state[:]
+  return apply_all
+
+
+@benchmark('engine.sort_ui_elements', 2000)
+def bench_sort_ui_elements():
+  # The full resort, which frames no longer do: the display list is kept in order by update_ui_element below
+  table()
+  return CardEngine._sort_ui_elements
+
+
+@benchmark('engine.update_ui_element.z', 100000)
+def bench_update_ui_element_z():
+  # What replaced sorting every frame: one element changing z and moving to its new place in the display list
+  table()
+  element = list(CardEngine.UIElements)[100]
+  zs = [element.z, element.z + 3]
+  state = {'next': 0}
+
+  def raise_and_lower():
+    state['next'] ^= 1
+    element.z = zs[state['next']]
+    CardEngine.update_ui_element(element)
+  return raise_and_lower
+
+
+@benchmark('engine.on_click', 20000)
+def bench_on_click():
+  table()
+  event = Event(EventType.MOUSEBUTTONDOWN, button=MouseButton.LEFT, pos=(400, 300))
+  return lambda: CardEngine._on_click(event)
+
+
+# Hitbox
+
+@benchmark('hitbox.collide.hit', 300000)
+def bench_collide_hit():
+  hitbox = SquareHitbox(100, 100, 72, 96, 30)
+  return lambda: hitbox.collide(110, 150)
+
+
+@benchmark('hitbox.collide.miss', 1000000)
+def bench_collide_miss():
+  hitbox = SquareHitbox(100, 100, 72, 96, 30)
+  return lambda: hitbox.collide(500, 500)
+
+
+@benchmark('hitbox.update', 50000)
+def bench_hitbox_update():
+  hitbox = SquareHitbox(100, 100, 72, 96, 30)
+  return lambda: hitbox.update(120, 80, angle=45)
+
+
+def layout(count=500):
+  generator = random.Random(0)
+  return [SquareHitbox(generator.uniform(0, 728), generator.uniform(0, 504), 72, 96, generator.uniform(0, 360))
+          for i in range(count)]
+
+
+@benchmark('hitbox.collide_each.500', 2000)
+def bench_collide_each():
+  hitboxes = layout()
+  return lambda: [index for index, hitbox in enumerate(hitboxes) if hitbox.collide(400, 300)]
+
+
+@benchmark('hitboxset.query_point.500', 3000)
+def bench_hitboxset_point():
+  hitboxes = HitboxSet(layout())
+  return lambda: hitboxes.query_point(400, 300)
+
+
+@benchmark('hitboxset.query_rect.500', 500)
+def bench_hitboxset_rect():
+  hitboxes = HitboxSet(layout())
+  return lambda: hitboxes.query_rect(300, 200, 500, 400)
+
+
+@benchmark('geometry.rotate_each_point.500', 500)
+def bench_rotate_each_point():
+  points = [Point(hitbox.x, hitbox.y) for hitbox in layout()]
+
+  def rotate():
+    for point in points:
+      point.rotate_clockwise(0.5, 400, 300)
+  return rotate
+
+
+@benchmark('geometry.point_array.rotate.500', 2000)
+def bench_point_array_rotate():
+  points = PointArray.from_points([Point(hitbox.x, hitbox.y) for hitbox in layout()])
+  return lambda: points.rotate_clockwise(0.5, 400, 300)
+
+
+@benchmark('geometry.fan_layout.13', 5000)
+def bench_fan_layout():
+  return lambda: fan_layout(13, 400, 560, 300, card_width=72)
+
+
+# UI, each element class's _update with nothing changed, _update with its content changed, and render
+
+def ui_setup():
+  os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+  import pygame
+  pygame.init()
+  pygame.display.set_mode((800, 600), 0, 32)
+  CardEngine.init(800, 600, seed=0, headless=True)
+  CardEngine.remove_all_ui_elements()
+  import UI
+  return pygame, UI
+
+
+def card_art():
+  from game import Heart2
+  return Heart2.card_image_path(Heart2.HEARTS, 1), Heart2.card_back_path()
+
+
+@benchmark('ui.card.update', 50000, ui=True)
+def bench_card_update():
+  pygame, UI = ui_setup()
+  front, back = card_art()
+  card = UI.Card(CardEngine, 4, 1, front, back, 100, 100, angle_radians=30)
+  return card._update
+
+
+@benchmark('ui.card.render', 20000, ui=True)
+def bench_card_render():
+  pygame, UI = ui_setup()
+  front, back = card_art()
+  card = UI.Card(CardEngine, 4, 1, front, back, 100, 100, angle_radians=30)
+  surface = CardEngine.DISPLAYSURFACE
+  return lambda: card.render(surface)
+
+
+@benchmark('ui.text.update', 200000, ui=True)
+def bench_text_update():
+  pygame, UI = ui_setup()
+  text = UI.Text(CardEngine, rect=pygame.Rect(10, 10, 150, 20), text='Hearts broken')
+  return text._update
+
+
+@benchmark('ui.text.set_text', 20000, ui=True)
+def bench_text_set_text():
+  pygame, UI = ui_setup()
+  text = UI.Text(CardEngine, rect=pygame.Rect(10, 10, 150, 20), text='Score')
+  scores = ['Score: %d' % score for score in range(26)]
+  state = {'next': 0}
+
+  def set_text():
+    state['next'] = (state['next'] + 1) % len(scores)
+    text.text = scores[state['next']]
+  return set_text
+
+
+@benchmark('ui.text.render', 100000, ui=True)
+def bench_text_render():
+  pygame, UI = ui_setup()
+  text = UI.Text(CardEngine, rect=pygame.Rect(10, 10, 150, 20), text='Hearts broken')
+  surface = CardEngine.DISPLAYSURFACE
+  return lambda: text.render(surface)
+
+
+@benchmark('ui.textbox.type', 5000, ui=True)
+def bench_textbox_type():
+  pygame, UI = ui_setup()
+  textbox = UI.TextBox(CardEngine, rect=pygame.Rect(10, 10, 180, 20), background_text='Name')
+  textbox._isSelected = True
+  key = Event(pygame.KEYDOWN, key=pygame.K_a, unicode=u'a')
+  backspace = Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, unicode=u'')
+
+  def type_character():
+    if len(textbox.inputText) > 20:
+      for i in range(21):
+        textbox.handle_event(backspace)
+    textbox.handle_event(key)
+  return type_character
+
+
+@benchmark('ui.textbox.render', 100000, ui=True)
+def bench_textbox_render():
+  pygame, UI = ui_setup()
+  textbox = UI.TextBox(CardEngine, rect=pygame.Rect(10, 10, 180, 20), background_text='Name')
+  surface = CardEngine.DISPLAYSURFACE
+  return lambda: textbox.render(surface)
+
+
+@benchmark('ui.checkbox.update', 20000, ui=True)
+def bench_checkbox_update():
+  pygame, UI = ui_setup()
+  checkbox = UI.CheckBox(CardEngine, rect=pygame.Rect(10, 10, 14, 14))
+  return checkbox._update
+
+
+@benchmark('ui.checkbox.render', 200000, ui=True)
+def bench_checkbox_render():
+  pygame, UI = ui_setup()
+  checkbox = UI.CheckBox(CardEngine, rect=pygame.Rect(10, 10, 14, 14))
+  surface = CardEngine.DISPLAYSURFACE
+  return lambda: checkbox.render(surface)
+
+
+@benchmark('ui.button.update', 100000, ui=True)
+def bench_button_update():
+  pygame, UI = ui_setup()
+  button = UI.Button(CardEngine, rect=pygame.Rect(10, 10, 70, 20), text='Deal')
+  return button._update
+
+
+@benchmark('ui.button.hover', 20000, ui=True)
+def bench_button_hover():
+  pygame, UI = ui_setup()
+  button = UI.Button(CardEngine, rect=pygame.Rect(10, 10, 70, 20), text='Deal')
+  inside = Event(pygame.MOUSEMOTION, pos=(20, 20))
+  outside = Event(pygame.MOUSEMOTION, pos=(200, 200))
+
+  def hover():
+    button.handle_event(inside)
+    button.handle_event(outside)
+  return hover
+
+
+@benchmark('ui.button.render', 100000, ui=True)
+def bench_button_render():
+  pygame, UI = ui_setup()
+  button = UI.Button(CardEngine, rect=pygame.Rect(10, 10, 70, 20), text='Deal')
+  surface = CardEngine.DISPLAYSURFACE
+  return lambda: button.render(surface)
+
+
+def have_pygame():
+  try:
+    import pygame
+  except ImportError:
+    return False
+  return True
+
+
+def reference():
+  # Dict, list and arithmetic work that stands for the speed of the machine and interpreter
+  values = {}
+  for i in xrange(1000):
+    values[i] = i * 7 % 13
+  return sorted(values.itervalues())
+
+
+def time_call(function, number, repeat):
+  # Best microseconds per call over repeat runs of number calls
+  return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+
+def run(names_filter=None, repeat=7, scale=1.0):
+  """Return {name: microseconds per call}, the names skipped for lack of pygame, and {name: (function, number)}
+  to time a benchmark again with.
+
+  The results always include REFERENCE, whatever the filter.
+  """
+  timers = {REFERENCE: (reference, max(int(REFERENCE_NUMBER * scale), 1))}
+  results = {REFERENCE: time_call(reference, timers[REFERENCE][1], repeat)}
+  skipped = []
+  ui_available = have_pygame()
+  for name, setup, number, ui, noise in BENCHMARKS:
+    if names_filter and names_filter not in name:
+      continue
+    if ui and not ui_available:
+      skipped.append(name)
+      continue
+    timers[name] = setup(), max(int(number * scale), 1)
+    results[name] = time_call(timers[name][0], timers[name][1], repeat)
+  return results, skipped, timers
+
+
+def confirm(results, baseline, threshold, timers, repeat, rounds):
+  """Time the regressed benchmarks again, up to ``rounds`` times, keeping the best time of each.
+
+  Short benchmarks on a busy machine are often slow for one run only, so a
+  regression only counts when it holds after every round.  Each round times
+  REFERENCE just before the benchmark and scales the new time by how that
+  compares with the REFERENCE of the results, so a round on a busier or
+  quieter machine than the first run is not mistaken for a change.  Returns
+  the benchmarks still regressed.
+  """
+  regressions = regressed(results, baseline, threshold)
+  for attempt in range(rounds):
+    if not regressions:
+      break
+    for name in regressions:
+      reference_time = time_call(timers[REFERENCE][0], timers[REFERENCE][1], repeat)
+      time = time_call(timers[name][0], timers[name][1], repeat) * results[REFERENCE] / reference_time
+      results[name] = min(results[name], time)
+    regressions = regressed(results, baseline, threshold)
+  return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+  if not os.path.isfile(path):
+    return {}
+  with open(path) as baseline:
+    return json.load(baseline)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+  # Keep the baselines of benchmarks that were not run, such as the UI ones without pygame.  Those are only
+  # comparable with the stored reference, so then the new results are scaled to it rather than replacing it.
+  baseline = load_baseline(path)
+  if any(name not in results for name in baseline):
+    scale = speed(results, baseline)
+    results = dict((name, time / scale) for name, time in results.items() if name != REFERENCE)
+  baseline.update(results)
+  with open(path, 'w') as output:
+    json.dump(baseline, output, indent=2, sort_keys=True)
+    output.write('\n')
+
+
+def speed(results, baseline):
+  # How much slower this run is than the baseline's, by REFERENCE.  The baselines are scaled by it.
+  if baseline.get(REFERENCE) and REFERENCE in results:
+    return results[REFERENCE] / baseline[REFERENCE]
+  return 1.0
+
+
+def regressed(results, baseline, threshold):
+  """The benchmarks slower than their scaled baseline by more than ``threshold`` and their noise."""
+  scale = speed(results, baseline)
+  return [name for name, setup, number, ui, noise in BENCHMARKS
+          if name in results and name in baseline and results[name] / (baseline[name] * scale) - 1.0 > threshold + noise]
+
+
+def compare(results, baseline, threshold):
+  """Print a table of results against the baseline.  Returns the names that regressed.
+
+  The baselines are scaled by the REFERENCE of the results over that of the
+  baseline, when the baseline has one.
+  """
+  regressions = []
+  scale = speed(results, baseline)
+  print "reference %.3f us/call, baselines scaled by %.2f" % (results.get(REFERENCE, 0.0), scale)
+  print "%-28s %12s %12s %8s" % ('benchmark', 'us/call', 'baseline', 'change')
+  for name, setup, number, ui, noise in BENCHMARKS:
+    if name not in results:
+      continue
+    time = results[name]
+    base = baseline.get(name)
+    if base is None:
+      print "%-28s %12.3f %12s %8s" % (name, time, '-', 'new')
+      continue
+    base *= scale
+    change = time / base - 1.0
+    flag = ''
+    if change > threshold + noise:
+      flag = '  REGRESSION'
+      regressions.append(name)
+    print "%-28s %12.3f %12.3f %+7.1f%%%s" % (name, time, base, change * 100, flag)
+  return regressions
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+  parser.add_argument('--repeat', type=int, default=7, help='repeats per benchmark, the best is kept')
+  parser.add_argument('--confirm', type=int, default=5,
+                      help='times a regressed benchmark is timed again before it counts, the best is kept')
+  parser.add_argument('--scale', type=float, default=1.0, help='multiplies the calls per repeat')
+  parser.add_argument('--threshold', type=float, default=0.25,
+                      help='fail when slower than the baseline by more than this fraction')
+  parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+  parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON file')
+  options = parser.parse_args(argv)
+
+  results, skipped, timers = run(options.filter, options.repeat, options.scale)
+  baseline = load_baseline(options.baseline)
+  if not options.save:
+    confirm(results, baseline, options.threshold, timers, options.repeat, options.confirm)
+  regressions = compare(results, baseline, options.threshold)
+  if skipped:
+    print "skipped without pygame: %s" % ', '.join(skipped)
+
+  if options.save:
+    save_baseline(results, options.baseline)
+    print "baseline saved to %s" % options.baseline
+    return 0
+  if regressions:
+    print "%d regression(s) over %d%%: %s" % (len(regressions), options.threshold * 100, ', '.join(regressions))
+    return 1
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
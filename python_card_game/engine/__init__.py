@@ -43,5 +43,7 @@ __maintainer__ = "Mathew Cosgrove"
 __email__ = "cosgroma@gmail.com"
 __status__ = "Development"
 
-from engine import CardEngine
-from card import Card, BadCardParamsExepction
+from engine import CardEngine, EventType, Event, MouseButton
+from card import Card, PlayingCard, BadCardParamsExepction
+from events import EventHandler
+from shuffle import Shuffler
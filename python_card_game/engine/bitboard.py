@@ -0,0 +1,109 @@
+"""Bitboard hands for the 52-card deck.
+
+A hand is a single integer with bit ``code`` set for every card it holds,
+where ``code`` comes from the integer encoding in ``encoding``.  Each suit
+is a run of 13 bits, so per-suit questions are one ``&`` with a suit mask
+and the whole hand fits in 64 bits.
+
+Example:
+  Hearts held in a hand::
+
+      hand = Hand.from_cards(player.hand)
+      hearts = hand.mask & SUIT_MASKS[4]
+
+"""
+
+import encoding
+
+FULL_DECK = (1 << encoding.DECK_SIZE) - 1
+
+# suit -> mask of its 13 bits.  Suits are 1-based, so index 0 is empty.
+SUIT_MASKS = (0,) + tuple(((1 << encoding.VALUE_COUNT) - 1) << (encoding.VALUE_COUNT * suit)
+                          for suit in range(encoding.SUIT_COUNT))
+
+
+def bit(code):
+  return 1 << code
+
+
+def popcount(mask):
+  return bin(mask).count('1')
+
+
+def iter_codes(mask):
+  """Yield the code of every set bit, lowest first."""
+  while mask:
+    low = mask & -mask
+    yield low.bit_length() - 1
+    mask ^= low
+
+
+def mask_from_cards(cards):
+  mask = 0
+  for card in cards:
+    mask |= 1 << encoding.from_card(card)
+  return mask
+
+
+def cards_from_mask(mask):
+  cards = encoding.CARDS
+  return [cards[code] for code in iter_codes(mask)]
+
+
+class Hand(object):
+  """Set of cards stored as a bitboard.
+
+  Args:
+    mask: Initial bitboard.  Defaults to an empty hand.
+  """
+  __slots__ = ("mask",)
+
+  def __init__(self, mask=0):
+    self.mask = mask
+
+  @classmethod
+  def from_cards(cls, cards):
+    return cls(mask_from_cards(cards))
+
+  def to_cards(self):
+    return cards_from_mask(self.mask)
+
+  def add(self, code):
+    self.mask |= 1 << code
+
+  def remove(self, code):
+    if not self.mask & (1 << code):
+      raise KeyError(code)
+    self.mask ^= 1 << code
+
+  def discard(self, code):
+    self.mask &= ~(1 << code)
+
+  def suit(self, suit):
+    return self.mask & SUIT_MASKS[suit]
+
+  def count(self, suit=None):
+    if suit is None:
+      return popcount(self.mask)
+    return popcount(self.mask & SUIT_MASKS[suit])
+
+  def __contains__(self, code):
+    return self.mask >> code & 1 == 1
+
+  def __len__(self):
+    return popcount(self.mask)
+
+  def __iter__(self):
+    return iter_codes(self.mask)
+
+  def __eq__(self, other):
+    return isinstance(other, Hand) and self.mask == other.mask
+
+  def __ne__(self, other):
+    return not self == other
+
+  # Hands are mutable, hash the mask instead
+  __hash__ = None
+
+  def __repr__(self):
+    return "Hand(0x%x)" % self.mask
@@ -41,6 +41,11 @@ __maintainer__ = "Mathew Cosgrove"
 __email__ = "cosgroma@gmail.com"
 __status__ = "Development"
 
+import itertools
+import weakref
+
+from effects import EFFECTS
+
 
 card_constraints = {
     "gold": (0, 6),
@@ -59,52 +64,188 @@ class BadCardParamsExepction(BaseException):
     super(BadCardParamsExepction, self).__init__(message)
 
 
+# Order of the numeric attributes in the tuples of VALID_CARDS and card_rejection
+CARD_ATTRIBUTES = ("gold", "diplomacy", "stealth", "might", "victory_point")
+
+
+def _check_card(values):
+  """Why a (gold, diplomacy, stealth, might, victory_point) tuple is not a legal card, or None if it is."""
+  card_sum = 0
+  non_zero_count = 0
+  for attr, val in zip(CARD_ATTRIBUTES, values):
+    card_sum += val
+    # checks inputs against card constraints
+    if val < card_constraints[attr][0] or val > card_constraints[attr][1]:
+      return "attributes_are_bad"
+    # gets number of nonzero attributes
+    elif val != 0:
+      non_zero_count += 1
+
+  # more than 3 non-zero attributes
+  if non_zero_count > 3:
+    return "non_zero_count"
+  # sum of attributes greater than 6
+  if card_sum > 6:
+    return "card_sum"
+  # odd number of resources
+  elif (card_sum - values[-1]) % 2 != 0:
+    return "odd_sum"
+  return None
+
+
+def _enumerate_cards():
+  # Every tuple inside card_constraints, split into the legal ones and the reasons the others are not
+  valid = []
+  rejections = {}
+  ranges = [range(card_constraints[attr][0], card_constraints[attr][1] + 1) for attr in CARD_ATTRIBUTES]
+  for values in itertools.product(*ranges):
+    reason = _check_card(values)
+    if reason is None:
+      valid.append(values)
+    else:
+      rejections[values] = reason
+  return frozenset(valid), rejections
+
+
+# Every legal attribute tuple, and the reason of every illegal one within card_constraints, which only
+# card_rejection reads
+VALID_CARDS, _CARD_REJECTIONS = _enumerate_cards()
+
+
+def card_rejection(values):
+  """Why a (gold, diplomacy, stealth, might, victory_point) tuple is not a legal card, or None if it is.
+
+  Tuples within card_constraints are looked up, others are checked.
+  """
+  try:
+    if values in VALID_CARDS:
+      return None
+    return _CARD_REJECTIONS[values]
+  except (KeyError, TypeError):
+    # Outside the enumerated ranges, or not whole numbers: check it the long way
+    return _check_card(values)
+
+
+def _forget_card(interned, key):
+  # Callback dropping an interned card once it is garbage, unless the key already holds a newer card
+  def forget(reference):
+    if interned.get(key) is reference:
+      del interned[key]
+  return forget
+
+
 class Card(object):
   """
   @summary: Card Class
-  """
 
-  def __init__(self, gold=0, diplomacy=0, stealth=0, might=0, victory_point=0, effect="None"):
-    super(Card, self).__init__()
-    # def __init__(self, **kwargs): -- look into how kwargs can make you life easier
-    # defines card attributes
-    self.gold = gold
-    self.diplomacy = diplomacy
-    self.stealth = stealth
-    self.might = might
-    self.effect = effect
-    self.victory_point = victory_point
-    # turns the object members into a dictionary
-    attr_dict = self.__dict__
-
-    # checks for impossible attributes
-    card_sum = 0
-    non_zero_count = 0
-    attributes_are_bad = False
-    #
-    for attr in attr_dict.keys():
-      print"attr --", attr
-      if attr != "effect":
-        val = attr_dict[attr]
-        print "val --", val
-        card_sum += val
-        # checks inputs against card constraints
-        if val < card_constraints[attr][0] or val > card_constraints[attr][1]:
-          # if card constraint is violated, raise and error
-          raise BadCardParamsExepction("attributes_are_bad")
-        # gets number of nonzero attributes
-        elif val != 0:
-          non_zero_count += 1
-
-    # if number of non-zeroes is greater than 3, nullifiy the caller
-    if non_zero_count > 3:
-      raise BadCardParamsExepction("non_zero_count")
-    # if sum of attributes is greater than 6, nullifiy the caller
-    if card_sum > 6:
-      raise BadCardParamsExepction("card_sum")
-    # if number of resources is odd, nullifiy the caller
-    elif (card_sum - victory_point) % 2 != 0:
-      raise BadCardParamsExepction("odd_sum")
+  Cards are immutable and interned: constructing a card with the same
+  attributes as one that is still alive returns that same object, so a deck
+  of repeated cards holds one object per distinct card.  The effect has to be
+  hashable.  ``effect_code`` is the opcode of the effect in ``effects``,
+  effects.EFFECTS unless a subclass gives its own registry, looked up once
+  here so applying the effect needs no string comparisons.
+  """
+  __slots__ = ("gold", "diplomacy", "stealth", "might", "victory_point", "effect", "effect_code", "_hash",
+               "__weakref__")
+
+  # (class, gold, diplomacy, stealth, might, victory_point, effect) -> weak reference to the live card with those
+  # attributes.  A plain dict of weak references, as WeakValueDictionary costs several times more per card.
+  _interned = {}
+
+  # The EffectRegistry effect codes are looked up in
+  effects = EFFECTS
+
+  def __new__(cls, gold=0, diplomacy=0, stealth=0, might=0, victory_point=0, effect="None"):
+    key = (cls, gold, diplomacy, stealth, might, victory_point, effect)
+    reference = cls._interned.get(key)
+    if reference is not None:
+      card = reference()
+      if card is not None:
+        return card
+
+    # A legal card is one lookup in the table of every legal attribute tuple
+    values = (gold, diplomacy, stealth, might, victory_point)
+    try:
+      valid = values in VALID_CARDS
+    except TypeError:
+      valid = False
+    if not valid:
+      reason = card_rejection(values)
+      if reason is not None:
+        raise BadCardParamsExepction(reason)
+
+    # defines card attributes, once, as the card is immutable from here on
+    card = super(Card, cls).__new__(cls)
+    set_attribute = super(Card, cls).__setattr__
+    set_attribute(card, "gold", gold)
+    set_attribute(card, "diplomacy", diplomacy)
+    set_attribute(card, "stealth", stealth)
+    set_attribute(card, "might", might)
+    set_attribute(card, "victory_point", victory_point)
+    set_attribute(card, "effect", effect)
+    set_attribute(card, "effect_code", cls.effects.opcode(effect))
+    set_attribute(card, "_hash", hash(key[1:]))
+    cls._interned[key] = weakref.ref(card, _forget_card(cls._interned, key))
+    return card
+
+  def __init__(self, *args, **kwargs):
+    # Everything is set up by __new__, and an interned card must not be set up again
+    pass
+
+  def _attributes(self):
+    return self.gold, self.diplomacy, self.stealth, self.might, self.victory_point, self.effect
+
+  def __setattr__(self, name, value):
+    raise AttributeError("Card is immutable")
+
+  def __delattr__(self, name):
+    raise AttributeError("Card is immutable")
+
+  def __reduce__(self):
+    # Pickling and copying construct the card again, which finds the interned one
+    return type(self), self._attributes()
+
+  def __eq__(self, other):
+    # Interned cards with the same attributes are the same object
+    if self is other:
+      return True
+    return type(self) is type(other) and self._hash == other._hash and self._attributes() == other._attributes()
+
+  def __ne__(self, other):
+    return not self == other
+
+  def __hash__(self):
+    return self._hash
+
+  def __repr__(self):
+    return "Card(gold=%r, diplomacy=%r, stealth=%r, might=%r, victory_point=%r, effect=%r)" % self._attributes()
 
   def __str__(self):
     return "gold = %d\ndiplomacy = %d\nstealth = %d\nmight = %d\neffect = %s\nvictory_point = %d\n" % (self.gold, self.diplomacy, self.stealth, self.might, self.effect, self.victory_point)
+
+
+class PlayingCard(object):
+  """
+  @summary: Standard playing card, identified by its suit and value
+  """
+  __slots__ = ("suit", "value")
+
+  def __init__(self, suit, value):
+    super(PlayingCard, self).__init__()
+    self.suit = suit
+    self.value = value
+
+  def __eq__(self, other):
+    return isinstance(other, PlayingCard) and self.suit == other.suit and self.value == other.value
+
+  def __ne__(self, other):
+    return not self == other
+
+  def __hash__(self):
+    return hash((self.suit, self.value))
+
+  def __repr__(self):
+    return "PlayingCard(%r, %r)" % (self.suit, self.value)
+
+  def __str__(self):
+    return "%s of %s" % (self.value, self.suit)
@@ -0,0 +1,206 @@
+"""Resource cards stored as columns, for deck statistics.
+
+A ``CardTable`` keeps each numeric attribute of ``card.Card``, ``gold``,
+``diplomacy``, ``stealth``, ``might`` and ``victory_point``, in a column of its
+own, one row per card, and the effects in a list beside them.  Totals,
+filters and histograms then work on whole columns instead of reading an
+attribute off every card.
+
+Columns are NumPy arrays when NumPy is installed, and ``array.array`` columns
+looped over in Python otherwise.  Both give the same results.
+
+Example:
+  Balance a deck::
+
+      table = CardTable.from_cards(deck)
+      print table.totals()
+      print table.histogram('gold')
+      expensive = table.filter(gold=(4, 6))
+      hand = table.sample_hand(5, random.Random(1)).to_cards()
+
+"""
+
+import array
+import random
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+from card import CARD_ATTRIBUTES, Card, card_constraints
+
+# Type code of the array.array columns.  Every attribute fits in a signed byte.
+_TYPECODE = 'b'
+
+
+class CardTable(object):
+  """Cards as one column per attribute.
+
+  Args:
+    columns: {attribute: values} for every name in CARD_ATTRIBUTES, all as
+      long as ``effects``.  Values must be whole numbers within
+      card_constraints; 2.0 is taken as 2, and 1.5 raises ValueError.
+    effects: The effect of every card.
+    use_numpy: Keep the columns in NumPy arrays.  None uses NumPy when it is
+      installed.
+  """
+
+  def __init__(self, columns=None, effects=(), use_numpy=None):
+    super(CardTable, self).__init__()
+    if use_numpy is None:
+      use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+      raise ImportError("CardTable(use_numpy=True) needs numpy")
+    self.useNumpy = use_numpy
+
+    self.effects = list(effects)
+    if columns is None:
+      columns = dict((name, ()) for name in CARD_ATTRIBUTES)
+    self._columns = {}
+    for name in CARD_ATTRIBUTES:
+      values = columns[name]
+      try:
+        column = array.array(_TYPECODE, values)
+      except (TypeError, OverflowError):
+        # Not all ints that fit a byte: convert whole floats, and name the first value that is neither
+        column = array.array(_TYPECODE, [_whole(name, value) for value in values])
+      if len(column) != len(self.effects):
+        raise ValueError("column %r has %d values for %d cards" % (name, len(column), len(self.effects)))
+      # histogram counts values from 0 to the attribute's maximum
+      low, high = card_constraints[name]
+      if column and (min(column) < low or max(column) > high):
+        raise ValueError("column %r has values outside %d to %d" % (name, low, high))
+      self._columns[name] = numpy.array(column, dtype=numpy.int8) if use_numpy else column
+
+  @classmethod
+  def _from_columns(cls, columns, effects, use_numpy):
+    # A table around columns that are already checked and of the right kind
+    table = cls.__new__(cls)
+    table.useNumpy = use_numpy
+    table.effects = effects
+    table._columns = columns
+    return table
+
+  @classmethod
+  def from_cards(cls, cards, use_numpy=None):
+    """A table of a list of Cards, in order."""
+    cards = list(cards)
+    columns = dict((name, [getattr(card, name) for card in cards]) for name in CARD_ATTRIBUTES)
+    return cls(columns, [card.effect for card in cards], use_numpy)
+
+  def to_cards(self):
+    """The Cards of the table, in order.  Identical rows give the same interned Card."""
+    columns = [self.column(name) for name in CARD_ATTRIBUTES]
+    if self.useNumpy:
+      columns = [column.tolist() for column in columns]
+    return [Card(*attributes) for attributes in zip(*(columns + [self.effects]))]
+
+  def column(self, name):
+    """The values of one attribute, or the effects."""
+    if name == "effect":
+      return self.effects
+    try:
+      return self._columns[name]
+    except KeyError:
+      raise KeyError("no card attribute %r" % (name,))
+
+  def total(self, name):
+    """Sum of one attribute over every card."""
+    column = self.column(name)
+    if self.useNumpy:
+      return int(column.sum())
+    return sum(column)
+
+  def totals(self):
+    """{attribute: sum} for every numeric attribute."""
+    return dict((name, self.total(name)) for name in CARD_ATTRIBUTES)
+
+  def histogram(self, name):
+    """Number of cards with each value of an attribute, indexed by value from 0 to the attribute's maximum."""
+    column = self.column(name)
+    size = card_constraints[name][1] + 1
+    if self.useNumpy:
+      return numpy.bincount(column, minlength=size).tolist()
+    counts = [0] * size
+    for value in column:
+      counts[value] += 1
+    return counts
+
+  def mask(self, **conditions):
+    """Which cards meet every condition, as a list of booleans.
+
+    A condition is ``attribute=value``, or ``attribute=(low, high)`` for values
+    from low to high inclusive.  ``effect`` can only be compared for equality.
+    """
+    selected = self._mask(conditions)
+    return selected.tolist() if self.useNumpy else selected
+
+  def _mask(self, conditions):
+    # mask as a NumPy array of booleans with NumPy, or a list of them without
+    if self.useNumpy:
+      selected = numpy.ones(len(self), dtype=bool)
+      for name, condition in conditions.items():
+        column = self.column(name)
+        if name == "effect":
+          selected &= numpy.array([effect == condition for effect in column], dtype=bool)
+        elif isinstance(condition, tuple):
+          low, high = condition
+          selected &= (column >= low) & (column <= high)
+        else:
+          selected &= column == condition
+      return selected
+
+    selected = [True] * len(self)
+    for name, condition in conditions.items():
+      column = self.column(name)
+      if name != "effect" and isinstance(condition, tuple):
+        low, high = condition
+        selected = [keep and low <= value <= high for keep, value in zip(selected, column)]
+      else:
+        selected = [keep and value == condition for keep, value in zip(selected, column)]
+    return selected
+
+  def filter(self, **conditions):
+    """A new table of the cards meeting every condition, see ``mask``."""
+    selected = self._mask(conditions)
+    if self.useNumpy:
+      return self.take(numpy.flatnonzero(selected))
+    return self.take([index for index, keep in enumerate(selected) if keep])
+
+  def take(self, indices):
+    """A new table of the cards at ``indices``, in that order."""
+    if self.useNumpy:
+      rows = numpy.asarray(indices, dtype=numpy.intp)
+      columns = dict((name, column[rows]) for name, column in self._columns.items())
+      indices = rows.tolist()
+    else:
+      indices = list(indices)
+      columns = dict((name, array.array(_TYPECODE, [column[index] for index in indices]))
+                     for name, column in self._columns.items())
+    return self._from_columns(columns, [self.effects[index] for index in indices], self.useNumpy)
+
+  def sample_hand(self, size, generator=None):
+    """A new table of ``size`` different cards drawn at random.
+
+    Args:
+      size: Cards in the hand, at most the cards in the table.
+      generator: A random.Random to draw with, such as CardEngine.shuffler.random,
+        so hands can be reproduced from a seed.
+    """
+    if generator is None:
+      generator = random
+    return self.take(generator.sample(xrange(len(self)), size))
+
+  def __len__(self):
+    return len(self.effects)
+
+
+def _whole(name, value):
+  # value as an int for a column of attribute name, which card_constraints limits to fit a byte
+  if isinstance(value, float) and value.is_integer():
+    value = int(value)
+  low, high = card_constraints[name]
+  if not isinstance(value, (int, long)) or not low <= value <= high:
+    raise ValueError("column %r has %r, not a whole number from %d to %d" % (name, value, low, high))
+  return value
@@ -0,0 +1,257 @@
+"""Streaming card catalogs from JSON lines and CSV files.
+
+A catalog has one resource card per line: a JSON object per line in a
+``.jsonl`` file, or a row under a header in a ``.csv`` file, with the fields
+of ``card.Card``.  ``CatalogLoader.load`` reads it a batch of rows at a time
+and yields the cards, so memory stays the same however long the file is.  A
+bad row does not stop the load: it is reported with its line number and
+skipped.  Rows whose effect is not registered in the registry of the card
+class are bad rows too, so a misspelt effect shows up while loading rather
+than when the card is played.
+
+Numbers must be whole.  In JSON they are JSON numbers, so ``2`` and ``2.0``
+are fine but ``"2"``, ``2.5`` and ``true`` are not.  CSV cells are text and
+must be written as integers, so ``2`` is fine but ``2.0`` is not.
+
+Example:
+  Load a catalog and print every bad row::
+
+      def report(error):
+        print "line %d: %s" % (error.line, error.reason)
+
+      loader = CatalogLoader(on_error=report)
+      cards = loader.load('catalog.jsonl')
+      deck.extend(cards)
+      print "%d cards from %d rows" % (cards.cards, cards.rows)
+
+"""
+
+import collections
+import csv
+import json
+import os
+
+from card import CARD_ATTRIBUTES, Card, card_constraints, card_rejection
+
+JSON_LINES = 'jsonl'
+CSV = 'csv'
+
+# File extensions of each format
+FORMATS = {
+    '.jsonl': JSON_LINES,
+    '.ndjson': JSON_LINES,
+    '.csv': CSV,
+}
+
+# A bad row: the line it is on, why it is bad, and the row as read
+RowError = collections.namedtuple('RowError', ('line', 'reason', 'row'))
+
+# Card's defaults for fields a row leaves out
+_DEFAULTS = {
+    "gold": 0,
+    "diplomacy": 0,
+    "stealth": 0,
+    "might": 0,
+    "victory_point": 0,
+    "effect": "None",
+}
+
+
+class CatalogLoader(object):
+  """Loads cards from catalogs, validating a batch of rows at a time.
+
+  Args:
+    batch_size: Rows read and validated together.
+    on_error: Called with a RowError for every bad row.  Bad rows are skipped
+      either way.
+    card_class: The class of the cards loaded.  Effects must be registered in
+      its ``effects``.
+  """
+
+  def __init__(self, batch_size=1024, on_error=None, card_class=Card):
+    super(CatalogLoader, self).__init__()
+    if batch_size < 1:
+      raise ValueError("batch_size must be at least 1")
+    self.batchSize = batch_size
+    self.onError = on_error
+    self.cardClass = card_class
+
+  def load(self, source, format=None):
+    """A CatalogStream of the cards of a catalog, a path or an open file, in file order.
+
+    The format is taken from the file extension unless given as JSON_LINES or
+    CSV.  A loader can run any number of loads at once.
+    """
+    # Check the format now rather than on the first card
+    stream = CatalogStream()
+    stream._cards = self._stream(source, self._format(source, format), stream)
+    return stream
+
+  def _stream(self, source, format, stream):
+    if hasattr(source, 'read'):
+      for card in self._load(source, format, stream):
+        yield card
+    else:
+      with open(source, 'rb' if format == CSV else 'r') as catalog:
+        for card in self._load(catalog, format, stream):
+          yield card
+
+  @staticmethod
+  def _format(source, format):
+    if format is not None:
+      if format not in (JSON_LINES, CSV):
+        raise ValueError("unknown catalog format %r" % (format,))
+      return format
+    name = source if isinstance(source, basestring) else getattr(source, 'name', '')
+    extension = os.path.splitext(name)[1].lower()
+    if extension not in FORMATS:
+      raise ValueError("can't tell the catalog format of %r, pass format=JSON_LINES or format=CSV" % (name,))
+    return FORMATS[extension]
+
+  def _load(self, catalog, format, stream):
+    if format == JSON_LINES:
+      rows, integer = _json_lines(catalog), _json_integer
+    else:
+      rows, integer = _csv_rows(catalog), _csv_integer
+    batch = []
+    for row in rows:
+      batch.append(row)
+      if len(batch) == self.batchSize:
+        for card in self._validate(batch, integer, stream):
+          yield card
+        batch = []
+    for card in self._validate(batch, integer, stream):
+      yield card
+
+  def _validate(self, batch, integer, stream):
+    # Parse every row of the batch into the attributes of its card, look each distinct set of attributes up once,
+    # then report the bad rows and build the cards in file order
+    parsed = []
+    reasons = {}
+    effects = self.cardClass.effects
+    for line, row in batch:
+      attributes = row if isinstance(row, RowError) else _attributes(line, row, integer)
+      if not isinstance(attributes, RowError) and attributes[-1] not in effects:
+        attributes = RowError(line, "unknown_effect", row)
+      if not isinstance(attributes, RowError):
+        values = attributes[:-1]
+        if values not in reasons:
+          reasons[values] = card_rejection(values)
+      parsed.append((line, row, attributes))
+
+    card_class = self.cardClass
+    cards = []
+    for line, row, attributes in parsed:
+      if isinstance(attributes, RowError):
+        self._error(attributes, stream)
+        continue
+      reason = reasons[attributes[:-1]]
+      if reason is not None:
+        self._error(RowError(line, reason, row), stream)
+      else:
+        cards.append(card_class(*attributes))
+    stream.rows += len(batch)
+    stream.cards += len(cards)
+    return cards
+
+  def _error(self, error, stream):
+    stream.errors += 1
+    if self.onError is not None:
+      self.onError(error)
+
+
+class CatalogStream(object):
+  """The cards of one ``CatalogLoader.load``, read as they are iterated.
+
+  Attributes:
+    rows: Rows read so far.
+    cards: Cards loaded so far.
+    errors: Bad rows skipped so far.
+  """
+
+  def __init__(self):
+    super(CatalogStream, self).__init__()
+    self.rows = 0
+    self.cards = 0
+    self.errors = 0
+    self._cards = iter(())
+
+  def __iter__(self):
+    return self
+
+  def next(self):
+    return next(self._cards)
+
+
+def _json_lines(catalog):
+  # (line, dict) per non-blank line, or (line, RowError) for lines that are not a JSON object
+  for line, text in enumerate(catalog, 1):
+    text = text.strip()
+    if not text:
+      continue
+    try:
+      row = json.loads(text)
+    except ValueError:
+      yield line, RowError(line, "invalid_json", text)
+      continue
+    if not isinstance(row, dict):
+      yield line, RowError(line, "not_an_object", text)
+    else:
+      yield line, row
+
+
+def _csv_rows(catalog):
+  # (line, dict) per row under the header.  Cells left empty are left out of the dict.
+  reader = csv.reader(catalog)
+  header = next(reader, None)
+  if header is None:
+    return
+  header = [name.strip() for name in header]
+  for cells in reader:
+    line = reader.line_num
+    if not cells:
+      continue
+    if len(cells) != len(header):
+      yield line, RowError(line, "wrong_column_count", cells)
+      continue
+    yield line, dict((name, cell.strip()) for name, cell in zip(header, cells) if cell.strip())
+
+
+def _json_integer(value):
+  # A JSON integer, or a float with nothing after the point, as an int.  None for anything else.
+  if isinstance(value, (int, long)) and not isinstance(value, bool):
+    return value
+  if isinstance(value, float) and value.is_integer():
+    return int(value)
+  return None
+
+
+def _csv_integer(text):
+  # A CSV cell written as an integer, as an int.  None for anything else, "2.0" included.
+  try:
+    return int(text)
+  except ValueError:
+    return None
+
+
+def _attributes(line, row, integer):
+  # The (gold, diplomacy, stealth, might, victory_point, effect) of a row, or a RowError.  integer(value) is the
+  # int a field holds, or None if it does not hold one.
+  for name in row:
+    if name not in card_constraints:
+      return RowError(line, "unknown_field", row)
+  attributes = []
+  for name in CARD_ATTRIBUTES:
+    if name in row:
+      value = integer(row[name])
+      if value is None:
+        return RowError(line, "not_an_integer", row)
+    else:
+      value = _DEFAULTS[name]
+    attributes.append(value)
+  effect = row.get("effect", _DEFAULTS["effect"])
+  # A JSON null is no effect, as Card(effect=None) is
+  if effect is not None and not isinstance(effect, basestring):
+    return RowError(line, "bad_effect", row)
+  attributes.append(effect)
+  return tuple(attributes)
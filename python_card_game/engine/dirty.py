@@ -0,0 +1,103 @@
+"""Dirty-rectangle bookkeeping for partial screen updates.
+
+Anything that changes on screen adds the bounds it covered before and after
+the change.  At render time the regions are merged and handed back as
+``(x, y, width, height)`` rectangles, so only those parts of the screen are
+redrawn and pushed to the display.  When little is dirty an idle frame costs
+next to nothing; when most of the screen is dirty the whole screen is
+returned as one region instead.
+
+Example:
+  One frame of a renderer::
+
+      regions.add(old_bounds)
+      regions.add(new_bounds)
+      for x, y, w, h in regions.pop():
+        redraw(x, y, w, h)
+
+"""
+
+import math
+
+
+class DirtyRegions(object):
+  """Collects dirty bounds and merges them into screen rectangles.
+
+  Args:
+    width: Screen width in pixels.
+    height: Screen height in pixels.
+    max_regions: More merged regions than this are redrawn as the full screen.
+  """
+
+  def __init__(self, width=0, height=0, max_regions=32):
+    super(DirtyRegions, self).__init__()
+    self.width = width
+    self.height = height
+    self.maxRegions = max_regions
+    # Dirty (left, top, right, bottom) regions in whole pixels
+    self._regions = []
+    # The first frame always draws everything
+    self.full = True
+
+  def resize(self, width, height):
+    self.width = width
+    self.height = height
+    self.invalidate_all()
+
+  def invalidate_all(self):
+    self.full = True
+    del self._regions[:]
+
+  def add(self, bounds):
+    """Mark the area covered by ``bounds`` (left, top, right, bottom) as dirty."""
+    if self.full or bounds is None:
+      return
+
+    # Round outwards, so antialiased and rotated edges are always covered
+    left, top, right, bottom = bounds
+    left = max(int(math.floor(left)), 0)
+    top = max(int(math.floor(top)), 0)
+    right = min(int(math.ceil(right)) + 1, self.width)
+    bottom = min(int(math.ceil(bottom)) + 1, self.height)
+    if left < right and top < bottom:
+      self._regions.append((left, top, right, bottom))
+
+  def pop(self):
+    """Return the merged dirty rectangles as (x, y, width, height) and reset."""
+    if self.full:
+      self.full = False
+      del self._regions[:]
+      return [(0, 0, self.width, self.height)]
+
+    regions = self._merge(self._regions)
+    self._regions = []
+
+    area = sum((right - left) * (bottom - top) for left, top, right, bottom in regions)
+    if len(regions) > self.maxRegions or area * 2 > self.width * self.height:
+      return [(0, 0, self.width, self.height)]
+    return [(left, top, right - left, bottom - top) for left, top, right, bottom in regions]
+
+  @staticmethod
+  def _merge(regions):
+    # Repeatedly replace overlapping or touching regions by their union.
+    merged = []
+    for region in regions:
+      left, top, right, bottom = region
+      i = 0
+      while i < len(merged):
+        other_left, other_top, other_right, other_bottom = merged[i]
+        if left <= other_right and other_left <= right and top <= other_bottom and other_top <= bottom:
+          left = min(left, other_left)
+          top = min(top, other_top)
+          right = max(right, other_right)
+          bottom = max(bottom, other_bottom)
+          # The grown region may now touch ones already checked, so start over
+          del merged[i]
+          i = 0
+        else:
+          i += 1
+      merged.append((left, top, right, bottom))
+    return merged
+
+  def __nonzero__(self):
+    return self.full or bool(self._regions)
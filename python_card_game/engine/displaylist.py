@@ -0,0 +1,99 @@
+"""Z-ordered display list for UI elements.
+
+Elements are kept sorted by their ``z`` attribute as they are added, so the
+renderer can simply iterate the list.  Elements with the same ``z`` keep the
+order in which they were added.  An element whose ``z`` changes must be passed
+to ``update`` to be moved to its new place.
+
+Example:
+  Render from bottom to top::
+
+      display = DisplayList()
+      display.add(card)
+      for element in display:
+        element.render(surface)
+
+"""
+
+import bisect
+
+
+class DisplayList(object):
+  """Elements sorted by ``(z, insertion order)``."""
+
+  def __init__(self):
+    super(DisplayList, self).__init__()
+    # Sort keys and elements, kept in parallel
+    self._keys = []
+    self._items = []
+    # id(element) -> sort key, for O(1) membership
+    self._entries = {}
+    self._sequence = 0
+
+  def add(self, item):
+    """Add ``item`` above every element with the same z.  Returns False if already present."""
+    if id(item) in self._entries:
+      return False
+    key = (item.z, self._sequence)
+    self._sequence += 1
+    self._insert(item, key)
+    return True
+
+  def remove(self, item):
+    """Remove ``item``.  Returns False if it was not present."""
+    key = self._entries.get(id(item))
+    if key is None:
+      return False
+    self._delete(key)
+    del self._entries[id(item)]
+    return True
+
+  def update(self, item):
+    """Move ``item`` to match its current z.  Returns False if it was not present."""
+    key = self._entries.get(id(item))
+    if key is None:
+      return False
+    if key[0] != item.z:
+      # Keep the original insertion order among equal z values
+      self._delete(key)
+      self._insert(item, (item.z, key[1]))
+    return True
+
+  def resort(self):
+    """Re-read the z of every element, for elements changed without calling update."""
+    pairs = sorted(((item.z, key[1]), item) for key, item in zip(self._keys, self._items))
+    self._keys = [key for key, item in pairs]
+    self._items = [item for key, item in pairs]
+    self._entries = dict((id(item), key) for key, item in pairs)
+
+  def key(self, item):
+    """Sort key of ``item``.  A larger key is drawn later, on top."""
+    return self._entries[id(item)]
+
+  def clear(self):
+    del self._keys[:]
+    del self._items[:]
+    self._entries.clear()
+
+  def _insert(self, item, key):
+    index = bisect.bisect_right(self._keys, key)
+    self._keys.insert(index, key)
+    self._items.insert(index, item)
+    self._entries[id(item)] = key
+
+  def _delete(self, key):
+    index = bisect.bisect_left(self._keys, key)
+    del self._keys[index]
+    del self._items[index]
+
+  def __contains__(self, item):
+    return id(item) in self._entries
+
+  def __iter__(self):
+    return iter(self._items)
+
+  def __len__(self):
+    return len(self._items)
+
+  def __getitem__(self, index):
+    return self._items[index]
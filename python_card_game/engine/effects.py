@@ -0,0 +1,187 @@
+"""Card effects dispatched by opcode instead of by name.
+
+An ``EffectRegistry`` gives every effect name a small integer opcode when a
+handler is first registered for it, and keeps the handler of each opcode in a
+list.  ``card.Card`` looks its effect up in its registry, ``EFFECTS`` unless
+a subclass says otherwise, once, when the card is constructed, and keeps the
+opcode as ``effect_code``.  Applying an effect is then a list index and a
+call, with no string comparisons or dict lookups.
+
+Looking a name up never adds it.  Cards whose effect is not registered get
+``UNKNOWN_EFFECT``, whose handler finds the effect by name when applied, so
+handlers registered after the card was made still apply, and effects that
+were never registered raise LookupError.
+
+Handlers are called as ``handler(state, card)``, with whatever game state
+the caller passes.  Registering a handler again for the same name replaces
+it, and existing cards use the new handler, as they only hold the opcode.
+
+``EffectQueue`` collects the effects of a turn and applies them in one pass.
+
+Example:
+  Register effects and apply the effects of the cards played this turn::
+
+      def draw(state, card):
+        state.draw(card.victory_point)
+
+      EFFECTS.register('draw', draw)
+      queue = EffectQueue()
+      for card in played:
+        queue.push(card)
+      queue.run(state)
+
+"""
+
+# The opcode of the effect of cards without one, Card's default effect "None", or None
+NO_EFFECT = 0
+# The opcode of effects that were not registered when the card was made
+UNKNOWN_EFFECT = 1
+
+
+def _no_effect(state, card):
+  pass
+
+
+class EffectRegistry(object):
+  """Effect names, their opcodes and their handlers.
+
+  Attributes:
+    names: The effect name of every opcode, indexed by opcode, None for
+      UNKNOWN_EFFECT.
+    handlers: The handler of every opcode, indexed by opcode.  Opcodes of
+      unregistered names raise LookupError when applied.
+  """
+
+  def __init__(self):
+    super(EffectRegistry, self).__init__()
+    self._opcodes = {"None": NO_EFFECT, None: NO_EFFECT}
+    self.names = ["None", None]
+    self.handlers = [_no_effect, self._apply_by_name]
+    # Names that were unregistered.  They keep their opcode for the cards holding it, but are not found.
+    self._unregistered = set()
+
+  def find(self, name):
+    """The opcode of a registered effect name, or None.  Never adds the name."""
+    if name in self._unregistered:
+      return None
+    return self._opcodes.get(name)
+
+  def opcode(self, name):
+    """The opcode a card with the effect ``name`` holds, UNKNOWN_EFFECT if it was never registered."""
+    code = self._opcodes.get(name)
+    if code is None:
+      return UNKNOWN_EFFECT
+    return code
+
+  def register(self, name, handler):
+    """Apply ``handler(state, card)`` for the effect ``name``.  Returns the opcode."""
+    if name is None or name == "None":
+      raise ValueError("%r is the effect of cards without one" % (name,))
+    code = self._opcodes.get(name)
+    if code is None:
+      code = self._opcodes[name] = len(self.names)
+      self.names.append(name)
+      self.handlers.append(handler)
+    else:
+      self.handlers[code] = handler
+      self._unregistered.discard(name)
+    return code
+
+  def unregister(self, name):
+    """Stop applying the effect ``name``.
+
+    The name is no longer found, but keeps its opcode: cards holding it raise
+    LookupError when applied, until the name is registered again.
+    """
+    code = self._opcodes.get(name)
+    if code is not None and code != NO_EFFECT:
+      self.handlers[code] = _missing_handler(name)
+      self._unregistered.add(name)
+
+  def handler(self, name):
+    code = self._opcodes.get(name)
+    if code is None:
+      return _missing_handler(name)
+    return self.handlers[code]
+
+  def apply(self, state, card):
+    """Apply the effect of one card."""
+    self.handlers[card.effect_code](state, card)
+
+  def apply_all(self, state, cards):
+    """Apply the effects of ``cards`` in order, in one pass."""
+    handlers = self.handlers
+    for card in cards:
+      # Skipping cards without an effect is cheaper than calling the empty handler
+      code = card.effect_code
+      if code:
+        handlers[code](state, card)
+
+  def _apply_by_name(self, state, card):
+    # The handler of UNKNOWN_EFFECT: the effect may have been registered since the card was made
+    code = self._opcodes.get(card.effect)
+    if code is None:
+      raise LookupError("no handler registered for effect %r" % (card.effect,))
+    self.handlers[code](state, card)
+
+  def __contains__(self, name):
+    return name in self._opcodes and name not in self._unregistered
+
+  def __len__(self):
+    return len(self.names)
+
+
+def _missing_handler(name):
+  def missing(state, card):
+    raise LookupError("no handler registered for effect %r" % (name,))
+  return missing
+
+
+class EffectQueue(object):
+  """Effects queued during a turn, applied together by ``run``.
+
+  Args:
+    registry: The registry the cards took their effect codes from, EFFECTS
+      by default, as Card does.
+  """
+
+  def __init__(self, registry=None):
+    super(EffectQueue, self).__init__()
+    self.registry = EFFECTS if registry is None else registry
+    self._cards = []
+
+  def push(self, card):
+    self._cards.append(card)
+
+  def extend(self, cards):
+    self._cards.extend(cards)
+
+  def run(self, state):
+    """Apply every queued effect to ``state`` in the order queued, and empty the queue.
+
+    Effects queued by the handlers while running are applied in the same pass.
+    """
+    cards = self._cards
+    handlers = self.registry.handlers
+    applied = 0
+    try:
+      # Iterating the list itself also reaches cards appended to it by the handlers
+      for card in cards:
+        applied += 1
+        code = card.effect_code
+        if code:
+          handlers[code](state, card)
+    finally:
+      # Drop what was applied, and the card whose handler raised, keeping the rest queued
+      del cards[:applied]
+    return applied
+
+  def clear(self):
+    del self._cards[:]
+
+  def __len__(self):
+    return len(self._cards)
+
+
+# The registry Card takes its effect codes from
+EFFECTS = EffectRegistry()
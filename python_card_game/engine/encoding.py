@@ -0,0 +1,98 @@
+"""Compact integer encoding of the 52 standard playing cards.
+
+Every card is the small integer ``(suit - 1) * 13 + (value - 1)``, using the
+engine's 1-based suits (1-4) and values (1-13, ace low).  Hands, decks and
+tricks can then live in an ``array('B')`` or a byte string and are compared
+and hashed as plain integers.
+
+All lookups go through tables built once at import, and ``to_card`` always
+returns the same interned PlayingCard for a code.
+
+Example:
+  Round trip a deck through its encoding::
+
+      codes = encode_cards(deck)
+      deck = decode_cards(codes)
+
+"""
+
+from array import array
+
+from card import PlayingCard
+
+SUIT_COUNT = 4
+VALUE_COUNT = 13
+DECK_SIZE = SUIT_COUNT * VALUE_COUNT
+
+# code -> suit, code -> value and code -> interned card
+SUITS = tuple(code // VALUE_COUNT + 1 for code in range(DECK_SIZE))
+VALUES = tuple(code % VALUE_COUNT + 1 for code in range(DECK_SIZE))
+CARDS = tuple(PlayingCard(suit, value) for suit, value in zip(SUITS, VALUES))
+
+# (suit, value) -> code
+_CODES = dict(((card.suit, card.value), code) for code, card in enumerate(CARDS))
+
+
+def encode(suit, value):
+  try:
+    return _CODES[(suit, value)]
+  except KeyError:
+    raise ValueError("no card with suit %r and value %r" % (suit, value))
+
+
+def from_card(card):
+  """Encode any card with ``suit`` and ``value`` attributes, e.g. a UI Card."""
+  return encode(card.suit, card.value)
+
+
+def _check_code(code):
+  # Negative codes would index the tables from the end and decode to the wrong card
+  if not 0 <= code < DECK_SIZE:
+    raise ValueError("card code %r is outside 0..%d" % (code, DECK_SIZE - 1))
+
+
+def to_card(code):
+  _check_code(code)
+  return CARDS[code]
+
+
+def suit_of(code):
+  _check_code(code)
+  return SUITS[code]
+
+
+def value_of(code):
+  _check_code(code)
+  return VALUES[code]
+
+
+def encode_cards(cards):
+  return array('B', [from_card(card) for card in cards])
+
+
+def decode_cards(codes):
+  return [to_card(code) for code in codes]
+
+
+def index_cards(cards):
+  """{code: card} for any cards with ``suit`` and ``value`` attributes, e.g. the UI Cards of a hand."""
+  return dict((from_card(card), card) for card in cards)
+
+
+def select_cards(codes, cards):
+  """The cards among ``cards``, e.g. UI Cards, with the given codes, in the order of ``codes``.
+
+  This is the way back from codes to the card objects they were encoded from.
+  """
+  index = index_cards(cards)
+  try:
+    return [index[code] for code in codes]
+  except KeyError as error:
+    code = error.args[0]
+    _check_code(code)
+    raise ValueError("no card with code %r among the cards given" % (code,))
+
+
+def new_deck(copies=1):
+  """Return a shoe of ``copies`` decks as an array of codes, in order."""
+  return array('B', range(DECK_SIZE) * copies)
@@ -1,9 +1,23 @@
 
 import sys
-# import pygame
-import random
 
-from card import Card
+# pygame is only needed for a real display.  Without it the engine can still
+# run headless, which is all the game logic and the tests need.
+try:
+  import pygame
+except ImportError:
+  pygame = None
+
+from card import Card, PlayingCard
+from catalog import CatalogLoader
+from dirty import DirtyRegions
+from displaylist import DisplayList
+from events import EventHandler
+from loop import GameLoop
+from profiler import PHASE, RENDER, Profiler
+from router import EventRouter
+from shuffle import Shuffler
+from spatial import GridIndex
 
 # totally untested
 
@@ -15,27 +29,35 @@ class MouseButton:
   WHEEL_UP = 4
   WHEEL_DOWN = 5
 
-# totally untested
 
+# Event types understood by the engine.  These are pygame's values when pygame
+# is installed, so real and synthetic events can be mixed freely.
+class EventType:
+  QUIT = getattr(pygame, 'QUIT', 12)
+  KEYDOWN = getattr(pygame, 'KEYDOWN', 2)
+  KEYUP = getattr(pygame, 'KEYUP', 3)
+  MOUSEMOTION = getattr(pygame, 'MOUSEMOTION', 4)
+  MOUSEBUTTONDOWN = getattr(pygame, 'MOUSEBUTTONDOWN', 5)
+  MOUSEBUTTONUP = getattr(pygame, 'MOUSEBUTTONUP', 6)
+  VIDEOEXPOSE = getattr(pygame, 'VIDEOEXPOSE', 17)
 
-class EventHandler:
 
-  def __init__(self):
-    self.functions = []
+class Event(object):
+  """Synthetic event with the same shape as a pygame event.
+
+  Example:
+    Feed a left click to a headless engine::
 
-  def __iadd__(self, function):
-    if function not in self.functions:
-      self.functions.append(function)
-    return self
+        CardEngine.post_event(Event(EventType.MOUSEBUTTONDOWN, button=MouseButton.LEFT, pos=(10, 20)))
 
-  def __isub__(self, function):
-    if function in self.functions:
-      self.functions.remove(function)
-    return self
+  """
 
-  def notify(self, *args):
-    for function in self.functions:
-      function(*args)
+  def __init__(self, type, **attributes):
+    self.type = type
+    self.__dict__.update(attributes)
+
+  def __repr__(self):
+    return "<Event(%d %r)>" % (self.type, dict((k, v) for k, v in self.__dict__.items() if k != 'type'))
 
 
 class CardEngine(object):
@@ -45,63 +67,196 @@ class CardEngine(object):
     super(CardEngine, self).__init__()
     self.arg = arg
 
-  # Pygame Display
+  # Pygame Display.  Headless engines render into an off-screen surface, or
+  # nowhere at all when pygame is not installed.
   DISPLAYSURFACE = None
   width = 0
   height = 0
+  headless = False
+  backgroundColor = (70, 200, 70)
+
+  # Parts of the screen to redraw on the next render
+  dirtyRegions = DirtyRegions()
+
+  # Synthetic events waiting to be handled by the next update
+  eventQueue = []
 
-  # Event handlers for various events, to be linked internally and externally
-  mouseClick = EventHandler()
-  cardClick = EventHandler()
-  mouseMovement = EventHandler()
-  keyPress = EventHandler()
-  gameQuit = EventHandler()
+  # Event handlers for various events, to be linked internally and externally.  Every init starts with new ones,
+  # so nothing subscribed to a previous game is notified.
+  mouseClick = EventHandler('mouseClick')
+  # Notified with the topmost UI element under a left click.  It used to be notified with (element.card,
+  # element.frontView), attributes that the UI elements never had.
+  cardClick = EventHandler('cardClick')
+  mouseMovement = EventHandler('mouseMovement')
+  keyPress = EventHandler('keyPress')
+  gameQuit = EventHandler('gameQuit')
+  # Notified with the step length in seconds for every fixed logic step of the main loop.  Anything animating
+  # subscribes while it moves; with no subscribers and nothing to redraw the loop sleeps until the next event.
+  gameTick = EventHandler('gameTick')
 
-  # List of UI Elements
-  UIElements = []
+  # Main loop started by run
+  loop = None
+
+  # Profiler timing the frame phases, element renders and handler notifies, or None when not profiling
+  profiler = None
+
+  # UI Elements in drawing order, and a spatial index of their bounds for hit-testing
+  UIElements = DisplayList()
+  UIIndex = GridIndex()
+
+  # Delivers events to the UI elements registered for them, topmost first being the one drawn last.  It finds
+  # elements under the mouse through UIIndex rather than keeping a second index of them.
+  eventRouter = EventRouter(EventType, key=UIElements.key, query_point=UIIndex.query_point)
+
+  # Random number generator used for shuffling, owned by the engine
+  shuffler = Shuffler()
 
   def __init__(self):
     raise NotImplementedError("CardEgnine cannot be instantiated.")
 
   @classmethod
-  def init(cls, width=800, height=600, display_caption='A Card Game'):
-    # Seed needed for shuffling function
-    random.seed()
+  def init(cls, width=800, height=600, display_caption='A Card Game', seed=None, headless=False):
+    # Seed the engine's own shuffler.  A fixed seed reproduces every shuffle.
+    cls.seed(seed)
 
-    # Setup the pygame display for use in the Engine
-    pygame.init()
     cls.width = width
     cls.height = height
-    cls.DISPLAYSURFACE = pygame.display.set_mode((width, height), 0, 32)
-    pygame.display.set_caption(display_caption)
+    cls.headless = headless or pygame is None
+    del cls.eventQueue[:]
+    cls.dirtyRegions = DirtyRegions(width, height)
+
+    cls.mouseClick = EventHandler('mouseClick')
+    cls.cardClick = EventHandler('cardClick')
+    cls.mouseMovement = EventHandler('mouseMovement')
+    cls.keyPress = EventHandler('keyPress')
+    cls.gameQuit = EventHandler('gameQuit')
+    cls.gameTick = EventHandler('gameTick')
+    cls._attach_profiler()
+
+    if cls.headless:
+      # No SDL display.  Keep an off-screen buffer if pygame can provide one.
+      if pygame is not None:
+        cls.DISPLAYSURFACE = pygame.Surface((width, height), 0, 32)
+      else:
+        cls.DISPLAYSURFACE = None
+    else:
+      # Setup the pygame display for use in the Engine
+      pygame.init()
+      cls.DISPLAYSURFACE = pygame.display.set_mode((width, height), 0, 32)
+      pygame.display.set_caption(display_caption)
 
     # Link mouse click event to card click event function
     cls.mouseClick += cls._on_click
 
+  @classmethod
+  def enable_profiling(cls, profiler=None):
+    # Start timing the engine.  Returns the profiler, a new one unless one is given.
+    if profiler is None:
+      profiler = Profiler()
+    cls.profiler = profiler
+    cls._attach_profiler()
+    return profiler
+
+  @classmethod
+  def disable_profiling(cls):
+    cls.profiler = None
+    cls._attach_profiler()
+
+  @classmethod
+  def _attach_profiler(cls):
+    for handler in (cls.mouseClick, cls.cardClick, cls.mouseMovement, cls.keyPress, cls.gameQuit, cls.gameTick):
+      handler.profiler = cls.profiler
+
   @classmethod
   def update(cls):
-    for event in pygame.event.get():
-      if event.type == pygame.QUIT:
+    profiler = cls.profiler
+    if profiler is None:
+      cls._handle_events()
+    else:
+      with profiler.time(PHASE, 'update'):
+        cls._handle_events()
+
+  @classmethod
+  def _handle_events(cls):
+    events = cls._get_events()
+    for index, event in enumerate(events):
+      if event.type == EventType.QUIT:
         # Notify other parts before closing the window and exiting program.
         cls.gameQuit.notify()
+        if cls.headless:
+          # Stop here, but keep the events after the quit for the next update rather than dropping them
+          cls.eventQueue[:0] = events[index + 1:]
+          return
         pygame.quit()
         sys.exit()
 
-      elif event.type == pygame.MOUSEBUTTONDOWN:
+      elif event.type == EventType.MOUSEBUTTONDOWN:
         cls.mouseClick.notify(event)
 
-      elif event.type == pygame.MOUSEBUTTONUP:
+      elif event.type == EventType.MOUSEBUTTONUP:
         cls.mouseClick.notify(event)
 
-      elif event.type == pygame.MOUSEMOTION:
+      elif event.type == EventType.MOUSEMOTION:
         cls.mouseMovement.notify(event)
 
-      elif event.type == pygame.KEYDOWN:
+      elif event.type == EventType.KEYDOWN:
         cls.keyPress.notify(event)
 
-      elif event.type == pygame.KEYUP:
+      elif event.type == EventType.KEYUP:
         cls.keyPress.notify(event)
 
+      elif event.type == EventType.VIDEOEXPOSE:
+        # The window was uncovered, so its contents may be gone
+        cls.dirtyRegions.invalidate_all()
+
+      # Only the elements interested in the event get to see it
+      cls.eventRouter.dispatch(event)
+
+  @classmethod
+  def tick(cls, seconds):
+    profiler = cls.profiler
+    if profiler is None:
+      cls.gameTick.notify(seconds)
+    else:
+      with profiler.time(PHASE, 'tick'):
+        cls.gameTick.notify(seconds)
+
+  @classmethod
+  def run(cls, fps=60, tick_rate=60, max_frame_skip=5, max_frames=None):
+    # Handle events, step the logic and render until the game quits.  A headless engine has nothing to wait
+    # for, so it returns as soon as it is idle.
+    loop = GameLoop(fps, tick_rate, max_frame_skip)
+    cls.loop = loop
+    cls.gameQuit += loop.stop
+    wait = None if cls.headless else cls._wait_for_event
+    try:
+      loop.run(cls.update, cls.render, cls.tick, cls.is_idle, wait, max_frames)
+    finally:
+      cls.gameQuit -= loop.stop
+
+  @classmethod
+  def is_idle(cls):
+    # Nothing to handle, nothing animating and nothing to redraw
+    return not cls.eventQueue and not cls.dirtyRegions and not len(cls.gameTick)
+
+  @classmethod
+  def _wait_for_event(cls):
+    # Sleep until pygame has an event, then queue it to be handled first
+    cls.eventQueue.append(pygame.event.wait())
+
+  @classmethod
+  def post_event(cls, event):
+    # Queue a synthetic event, handled by the next update before any pygame events.
+    cls.eventQueue.append(event)
+
+  @classmethod
+  def _get_events(cls):
+    events = cls.eventQueue[:]
+    del cls.eventQueue[:]
+    if not cls.headless:
+      events.extend(pygame.event.get())
+    return events
+
   @classmethod
   def render(cls):
     """
@@ -109,85 +264,148 @@ class CardEngine(object):
     @param cls:
     @result:
     """
-    cls.DISPLAYSURFACE.fill((70, 200, 70))
-    cls._sort_ui_elements()
-    for card in cls.UIElements:
-      card.render(cls.DISPLAYSURFACE)
-    pygame.display.update()
+    profiler = cls.profiler
+    if profiler is not None:
+      start = profiler.clock()
+
+    # Only the dirty parts of the screen are redrawn.  Nothing dirty, nothing to do.
+    regions = cls.dirtyRegions.pop()
+    if cls.DISPLAYSURFACE is not None and regions:
+      surface = cls.DISPLAYSURFACE
+      key = cls.UIElements.key
+      for region in regions:
+        x, y, w, h = region
+        surface.set_clip(region)
+        surface.fill(cls.backgroundColor, region)
+        elements = cls.UIIndex.query_rect(x, y, x + w, y + h)
+        elements.sort(key=key)
+        for card in elements:
+          if profiler is None:
+            card.render(surface)
+          else:
+            # Render cost by element class
+            element_start = profiler.clock()
+            card.render(surface)
+            profiler.record(RENDER, type(card).__name__, profiler.clock() - element_start)
+      surface.set_clip(None)
+
+      if profiler is not None:
+        display_start = profiler.clock()
+        profiler.record(PHASE, 'render', display_start - start)
+      if not cls.headless:
+        pygame.display.update(regions)
+      if profiler is not None:
+        profiler.record(PHASE, 'display', profiler.clock() - display_start)
+
+    if profiler is not None:
+      profiler.end_frame()
 
   @classmethod
-  def _on_click(cls, button, click, x, y):
-    if click is not pygame.MOUSEBUTTONDOWN:
+  def _on_click(cls, event):
+    if event.type != EventType.MOUSEBUTTONDOWN:
+      return
+    if event.button != MouseButton.LEFT:
       return
-    clicked = []
-
-    if button is MouseButton.LEFT:
-      for card in cls.UIElements:
-        if card.collide(x, y):
-          clicked.append(card)
 
-    if len(clicked) is 0:
+    x, y = event.pos
+    card_display = cls.topmost_at(x, y)
+    if card_display is None:
       return
 
-    card_display = clicked[0]
-    for card in clicked:
-      if card.z > card_display.z:
-        card_display = card
+    cls.cardClick.notify(card_display)
 
-    cls.cardClick.notify(card_display.card, card_display.frontView)
+  @classmethod
+  def topmost_at(cls, x, y):
+    # Only elements whose bounds contain the point need the exact collision test.
+    # Among those, the one drawn last is on top.
+    topmost = None
+    topmost_key = None
+    key = cls.UIElements.key
+    for element in cls.UIIndex.query_point(x, y):
+      if element.collide(x, y) and (topmost is None or key(element) > topmost_key):
+        topmost = element
+        topmost_key = key(element)
+    return topmost
 
   # Methods below are used to handle the ui elements on screen.
   @classmethod
   def _sort_ui_elements(cls):
-    for i in range(1, len(cls.UIElements)):
-      j = i
-      while (j > 0) and (cls.UIElements[j - 1].z > cls.UIElements[j].z):
-        temp = cls.UIElements[j]
-        cls.UIElements[j] = cls.UIElements[j - 1]
-        cls.UIElements[j - 1] = temp
-        j -= 1
+    # The display list is kept sorted as elements change.  This is only needed
+    # for elements whose z was changed without calling update_ui_element.
+    cls.UIElements.resort()
 
   @classmethod
   def add_ui_element(cls, ui_element):
-    if ui_element not in cls.UIElements:
-      cls.UIElements.append(ui_element)
+    if cls.UIElements.add(ui_element):
+      bounds = ui_element.get_bounds()
+      cls.UIIndex.insert(ui_element, bounds)
+      cls.dirtyRegions.add(bounds)
+      cls.eventRouter.register(ui_element, getattr(ui_element, 'eventTypes', ()))
+
+  @classmethod
+  def update_ui_element(cls, ui_element):
+    # Called by an element whenever its location, size, angle, z, visibility or
+    # content may have changed.  Both the old and the new area need redrawing.
+    if cls.UIElements.update(ui_element):
+      old_bounds = cls.UIIndex.get_bounds(ui_element)
+      bounds = ui_element.get_bounds()
+      cls.dirtyRegions.add(old_bounds)
+      if bounds != old_bounds:
+        cls.dirtyRegions.add(bounds)
+        cls.UIIndex.update(ui_element, bounds)
 
   @classmethod
   def remove_ui_element(cls, ui_element):
-    if ui_element in cls.UIElements:
-      cls.UIElements.remove(ui_element)
+    if cls.UIElements.remove(ui_element):
+      cls.dirtyRegions.add(cls.UIIndex.get_bounds(ui_element))
+      cls.UIIndex.remove(ui_element)
+      cls.eventRouter.unregister(ui_element)
 
   @classmethod
   def remove_all_ui_elements(cls):
-    del cls.UIElements[:]
+    cls.UIElements.clear()
+    cls.UIIndex.clear()
+    cls.eventRouter.clear()
+    cls.dirtyRegions.invalidate_all()
 
   # Methods below are used to create and shuffle a deck.
   @staticmethod
-  def create_deck(suits, values, special_cards=None):
+  def create_deck(suits, values, special_cards=None, card_class=PlayingCard):
     deck = []
     for suit in suits:
       for value in values:
-        deck.append(Card(suit, value))
+        deck.append(card_class(suit, value))
     if special_cards is not None:
       for card in special_cards:
         deck.append(card)
     return deck
 
+  @staticmethod
+  def load_deck(source, format=None, on_error=None, batch_size=1024, card_class=Card):
+    """A deck of every good card in a catalog file.  Bad rows are passed to ``on_error`` and left out."""
+    loader = CatalogLoader(batch_size=batch_size, on_error=on_error, card_class=card_class)
+    return list(loader.load(source, format))
+
   @staticmethod
   def print_deck(deck):
     for card in deck:
       print "card -> ", card
 
-  @staticmethod
-  def shuffle(deck):
-    temp = []
-    shuffled = []
-    for i in range(0, len(deck)):
-      temp.append(deck[i])
-    for i in range(0, len(deck)):
-      rand = random.randrange(0, len(deck) - i)
-      shuffled.append(temp.pop(rand))
-    return shuffled
+  @classmethod
+  def seed(cls, seed=None):
+    cls.shuffler.seed(seed)
+
+  @classmethod
+  def shuffle(cls, deck):
+    return cls.shuffler.shuffled(deck)
+
+  @classmethod
+  def shuffle_in_place(cls, deck):
+    return cls.shuffler.shuffle(deck)
+
+  @classmethod
+  def shuffle_decks(cls, decks, in_place=True):
+    return cls.shuffler.shuffle_all(decks, in_place)
 
   # Methods below deal with transferring cards.
   @staticmethod
@@ -200,7 +418,7 @@ class CardEngine(object):
   @staticmethod
   def transfer_card(card, source, destination):
     if card in source:
-      source.pop(card)
+      source.remove(card)
       destination.append(card)
 
   @staticmethod
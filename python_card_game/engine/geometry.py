@@ -0,0 +1,186 @@
+"""Transforms applied to many points at once.
+
+``PointArray`` holds the x and y coordinates of any number of points and
+applies the same translations, rotations, scales and reflections as
+``hitbox.Point``, to all of them in one call.  With NumPy every transform is a
+single array operation; without it the same arithmetic runs over plain lists.
+
+Rotations take their cosine and sine from ``hitbox.cos_sin``, which keeps
+those of recently used angles, as cards share a handful of angles.
+
+``fan_layout`` uses these to place a fanned hand of cards in one go.
+
+Example:
+  Rotate the corners of every card on the table about the table center::
+
+      corners = PointArray.from_points(points)
+      corners.rotate_clockwise(math.radians(90), 400, 300)
+      points = corners.to_points()
+
+"""
+
+import math
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+from hitbox import Point, cos_sin
+
+
+class PointArray(object):
+  """Coordinates of many points, transformed together in place.
+
+  Args:
+    xs: x coordinates.
+    ys: y coordinates, as many as there are x coordinates.
+    use_numpy: Keep the coordinates in NumPy arrays.  None uses NumPy when it
+      is installed.
+  """
+
+  def __init__(self, xs=(), ys=(), use_numpy=None):
+    super(PointArray, self).__init__()
+    if use_numpy is None:
+      use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+      raise ImportError("PointArray(use_numpy=True) needs numpy")
+    if len(xs) != len(ys):
+      raise ValueError("PointArray needs as many x as y coordinates")
+
+    self.useNumpy = use_numpy
+    if use_numpy:
+      self.xs = numpy.array(xs, dtype=numpy.float64)
+      self.ys = numpy.array(ys, dtype=numpy.float64)
+    else:
+      self.xs = [float(x) for x in xs]
+      self.ys = [float(y) for y in ys]
+
+  @classmethod
+  def from_points(cls, points, use_numpy=None):
+    """From hitbox.Points, or anything with x and y attributes."""
+    points = list(points)
+    return cls([point.x for point in points], [point.y for point in points], use_numpy)
+
+  @classmethod
+  def from_pairs(cls, pairs, use_numpy=None):
+    """From (x, y) pairs."""
+    pairs = list(pairs)
+    return cls([x for x, y in pairs], [y for x, y in pairs], use_numpy)
+
+  def to_points(self):
+    return [Point(x, y) for x, y in self]
+
+  def to_pairs(self):
+    return list(self)
+
+  def copy(self):
+    return PointArray(self.xs, self.ys, self.useNumpy)
+
+  def translate(self, dx, dy):
+    if self.useNumpy:
+      self.xs += dx
+      self.ys += dy
+    else:
+      self.xs = [x + dx for x in self.xs]
+      self.ys = [y + dy for y in self.ys]
+    return self
+
+  def rotate_clockwise(self, angle_radians, x=0, y=0):
+    """Rotate every point about (x, y) by the same angle, as hitbox.Point.rotate_clockwise does."""
+    cos, sin = cos_sin(angle_radians)
+    if self.useNumpy:
+      dx = self.xs - x
+      dy = self.ys - y
+      self.xs = cos * dx - sin * dy + x
+      self.ys = sin * dx + cos * dy + y
+    else:
+      xs = self.xs
+      ys = self.ys
+      self.xs = [cos * (px - x) - sin * (py - y) + x for px, py in zip(xs, ys)]
+      self.ys = [sin * (px - x) + cos * (py - y) + y for px, py in zip(xs, ys)]
+    return self
+
+  def rotate_counterclockwise(self, angle_radians, x=0, y=0):
+    return self.rotate_clockwise(-1 * angle_radians, x, y)
+
+  def rotate_each_clockwise(self, angles_radians, x=0, y=0):
+    """Rotate every point about (x, y) by its own angle, one angle per point."""
+    if len(angles_radians) != len(self):
+      raise ValueError("rotate_each_clockwise needs one angle per point")
+    if self.useNumpy:
+      angles = numpy.asarray(angles_radians, dtype=numpy.float64)
+      cos = numpy.cos(angles)
+      sin = numpy.sin(angles)
+      dx = self.xs - x
+      dy = self.ys - y
+      self.xs = cos * dx - sin * dy + x
+      self.ys = sin * dx + cos * dy + y
+    else:
+      xs = []
+      ys = []
+      for px, py, angle in zip(self.xs, self.ys, angles_radians):
+        cos, sin = cos_sin(angle)
+        xs.append(cos * (px - x) - sin * (py - y) + x)
+        ys.append(sin * (px - x) + cos * (py - y) + y)
+      self.xs = xs
+      self.ys = ys
+    return self
+
+  def scale(self, x, y, scalar):
+    """Scale every point about (x, y) by a constant scalar."""
+    if self.useNumpy:
+      self.xs = (self.xs - x) * scalar + x
+      self.ys = (self.ys - y) * scalar + y
+    else:
+      self.xs = [(px - x) * scalar + x for px in self.xs]
+      self.ys = [(py - y) * scalar + y for py in self.ys]
+    return self
+
+  def reflect(self, axis):
+    if axis in ('x', 'X'):
+      self.xs = self.xs * -1 if self.useNumpy else [-x for x in self.xs]
+    elif axis in ('y', 'Y'):
+      self.ys = self.ys * -1 if self.useNumpy else [-y for y in self.ys]
+    return self
+
+  def bounds(self):
+    """Axis-aligned bounds (left, top, right, bottom) of all points."""
+    if not len(self):
+      raise ValueError("bounds of an empty PointArray")
+    return min(self.xs), min(self.ys), max(self.xs), max(self.ys)
+
+  def __iter__(self):
+    if self.useNumpy:
+      return iter(zip(self.xs.tolist(), self.ys.tolist()))
+    return iter(zip(self.xs, self.ys))
+
+  def __len__(self):
+    return len(self.xs)
+
+
+def fan_layout(count, x, y, radius, spread_degrees=60, card_width=0, use_numpy=None):
+  """Place ``count`` cards on an arc, fanned out like a hand held up.
+
+  The arc is centered on the pivot (x, y), ``radius`` above it, and the cards
+  are spread evenly over ``spread_degrees``.  Each card is tilted to point
+  away from the pivot, so the middle card of an odd hand stands upright.
+
+  Returns:
+    A list of (x, y, angle) per card, left to right.  (x, y) is the top-left
+    corner of the card before it is tilted by ``angle`` degrees about it, as
+    SquareHitbox and UI.Card take them, for a card ``card_width`` wide.
+  """
+  if count <= 0:
+    return []
+  if count == 1:
+    tilts = [0.0]
+  else:
+    step = float(spread_degrees) / (count - 1)
+    tilts = [-spread_degrees / 2.0 + i * step for i in range(count)]
+
+  # Each card's top-left corner starts half a card left of the top of the arc, and is turned about the pivot by
+  # the card's tilt.  That puts the middle of its top edge on the arc, with the top edge along the tilt.
+  corners = PointArray([x - card_width / 2.0] * count, [y - radius] * count, use_numpy)
+  corners.rotate_each_clockwise([math.radians(tilt) for tilt in tilts], x, y)
+  return [(corner_x, corner_y, -tilt) for (corner_x, corner_y), tilt in zip(corners, tilts)]
@@ -2,7 +2,29 @@ __author__ = 'Evan'
 import math
 
 
-class SquareHitbox:
+# cos and sin of recently used angles.  Cards on a table share a handful of angles.
+_TRIG_CACHE = {}
+_TRIG_CACHE_SIZE = 1024
+
+
+def cos_sin(angle_radians):
+    # (cos, sin) of an angle, exactly as math.cos and math.sin give them.  Shared with geometry.
+    trig = _TRIG_CACHE.get(angle_radians)
+    if trig is None:
+        if len(_TRIG_CACHE) >= _TRIG_CACHE_SIZE:
+            _TRIG_CACHE.clear()
+        trig = _TRIG_CACHE[angle_radians] = (math.cos(angle_radians), math.sin(angle_radians))
+    return trig
+
+
+class SquareHitbox(object):
+    # Corners, edge vectors and bounds are kept as plain floats and worked out once per update, so collide does
+    # a bounds check and two dot products without creating any objects.
+    __slots__ = ('x', 'y', 'width', 'height', 'angle',
+                 '_x1', '_y1', '_x2', '_y2', '_x3', '_y3',
+                 '_abx', '_aby', '_abab', '_adx', '_ady', '_adad',
+                 '_left', '_top', '_right', '_bottom')
+
     def __init__(self, x, y, width, height, angle):
         self.x = x
         self.y = y
@@ -10,26 +32,32 @@ class SquareHitbox:
         self.height = height
         self.angle = math.radians(angle)
 
-        self.points = []
-        self.rotatedPoints = []
-
-        self._get_points()
-        self._get_rotated_points()
+        self._compute()
 
     def collide(self, x, y):
         # Assuming points a, b, c, and d, and a point m with coordinates (x, y).
         # Check the vector from point a to point m against the vectors from a to b and a to d.
         # Vector math to check if a point is inside the hitbox.  Allows hitbox to be rotated to any angle
-        vector_am = Vector(self.rotatedPoints[0].x - x,
-                           self.rotatedPoints[0].y - y)
-        vector_ab = Vector(self.rotatedPoints[0].x - self.rotatedPoints[1].x,
-                           self.rotatedPoints[0].y - self.rotatedPoints[1].y)
-        vector_ad = Vector(self.rotatedPoints[0].x - self.rotatedPoints[3].x,
-                           self.rotatedPoints[0].y - self.rotatedPoints[3].y)
-        if 0 <= vector_am * vector_ab < vector_ab * vector_ab and 0 <= vector_am * vector_ad < vector_ad * vector_ad:
-            return True
-        else:
+        if x < self._left or x > self._right or y < self._top or y > self._bottom:
+            return False
+
+        amx = self.x - x
+        amy = self.y - y
+        am_ab = amx * self._abx + amy * self._aby
+        if not 0 <= am_ab < self._abab:
             return False
+        am_ad = amx * self._adx + amy * self._ady
+        return 0 <= am_ad < self._adad
+
+    def get_bounds(self):
+        # Axis-aligned bounds (left, top, right, bottom) of the rotated hitbox
+        return self._left, self._top, self._right, self._bottom
+
+    def get_edges(self):
+        # Corner a, the edge vectors from b and d back to a, and their squared lengths:
+        # (ax, ay, abx, aby, abab, adx, ady, adad).  A point m is inside when 0 <= (a - m).ab < abab and
+        # 0 <= (a - m).ad < adad.
+        return self.x, self.y, self._abx, self._aby, self._abab, self._adx, self._ady, self._adad
 
     def update(self, x=None, y=None, width=None, height=None, angle=None):
         if x is not None:
@@ -43,26 +71,53 @@ class SquareHitbox:
         if angle is not None:
             self.angle = math.radians(angle)
 
-        self._get_points()
-        self._get_rotated_points()
-
-    def _get_points(self):
-        self.points = []
-        self.points.append(Point(self.x, self.y))
-        self.points.append(Point(self.x + self.width, self.y))
-        self.points.append(Point(self.x + self.width, self.y + self.height))
-        self.points.append(Point(self.x, self.y + self.height))
-
-    def _get_rotated_points(self):
-        # Use Point 0 as reference for rotating every point
-        x, y = self.points[0].x, self.points[0].y
-
-        self.rotatedPoints = []
-        for point in self.points:
-            self.rotatedPoints.append(point.copy())
-
-        for point in self.rotatedPoints:
-            point.rotate_counterclockwise(x, y, self.angle)
+        self._compute()
+
+    def _compute(self):
+        # Rotate the corners clockwise by -angle about corner a, the point (x, y)
+        x = self.x
+        y = self.y
+        # Measured between the unrotated corners, exactly as the corner Points would give it
+        w = (x + self.width) - x
+        h = (y + self.height) - y
+        cos, sin = cos_sin(self.angle)
+
+        x1 = cos * w + x
+        y1 = -sin * w + y
+        x2 = cos * w + sin * h + x
+        y2 = -sin * w + cos * h + y
+        x3 = sin * h + x
+        y3 = cos * h + y
+        self._x1, self._y1, self._x2, self._y2, self._x3, self._y3 = x1, y1, x2, y2, x3, y3
+
+        # Edge vectors from b and d back to a, and their squared lengths
+        self._abx = x - x1
+        self._aby = y - y1
+        self._abab = self._abx * self._abx + self._aby * self._aby
+        self._adx = x - x3
+        self._ady = y - y3
+        self._adad = self._adx * self._adx + self._ady * self._ady
+
+        self._left = min(x, x1, x2, x3)
+        self._top = min(y, y1, y2, y3)
+        self._right = max(x, x1, x2, x3)
+        self._bottom = max(y, y1, y2, y3)
+
+    # The corners as Points, before and after rotating.  Built on request, for code using the old attributes.
+    def _prop_get_points(self):
+        return [Point(self.x, self.y),
+                Point(self.x + self.width, self.y),
+                Point(self.x + self.width, self.y + self.height),
+                Point(self.x, self.y + self.height)]
+
+    def _prop_get_rotated_points(self):
+        return [Point(self.x, self.y),
+                Point(self._x1, self._y1),
+                Point(self._x2, self._y2),
+                Point(self._x3, self._y3)]
+
+    points = property(_prop_get_points)
+    rotatedPoints = property(_prop_get_rotated_points)
 
 
 class Point:
@@ -79,25 +134,26 @@ class Point:
 
     def rotate_clockwise(self, angle_radians, x=0, y=0):
         # Rotate about the point (x, y) clockwise by a given angle in radians
-        nx = math.cos(angle_radians) * (self.x - x) - math.sin(angle_radians) * (self.y - y) + x
-        ny = math.sin(angle_radians) * (self.x - x) + math.cos(angle_radians) * (self.y - y) + y
+        cos, sin = cos_sin(angle_radians)
+        nx = cos * (self.x - x) - sin * (self.y - y) + x
+        ny = sin * (self.x - x) + cos * (self.y - y) + y
 
         self.x = nx
         self.y = ny
 
-    def rotate_counterclockwise(self, x, y, angle_radians):
+    def rotate_counterclockwise(self, angle_radians, x=0, y=0):
         # Rotate about the point (x, y) counter clockwise by a given angle in radians
-        self.rotate_clockwise(x, y, -1 * angle_radians)
+        self.rotate_clockwise(-1 * angle_radians, x, y)
 
     def scale(self, x, y, scalar):
         # Scales about the point (x, y) by a constant scalar
-        self.x = math.fabs(self.x - x) * scalar + x
-        self.y = math.fabs(self.y - y) * scalar + y
+        self.x = (self.x - x) * scalar + x
+        self.y = (self.y - y) * scalar + y
 
     def reflect(self, axis):
-        if axis is 'x' or axis is 'X':
+        if axis in ('x', 'X'):
             self.x *= -1
-        elif axis is 'y' or axis is 'Y':
+        elif axis in ('y', 'Y'):
             self.y *= -1
 
 
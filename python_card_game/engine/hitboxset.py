@@ -0,0 +1,168 @@
+"""Hit-testing one point or rectangle against many hitboxes at once.
+
+A ``HitboxSet`` copies the corners and edge vectors of ``SquareHitbox``
+objects into columns, one entry per hitbox.  A point query then runs the same
+test as ``SquareHitbox.collide`` for every hitbox in one vectorized NumPy
+expression, and a rectangle query does a separating axis test between the
+rectangle and every rotated hitbox.  Hits are returned as indices sorted by
+z, bottom first, in the order hitboxes were added among equal z values.
+
+NumPy is optional.  Without it the same tests run in a plain Python loop.
+
+Example:
+  Everything under the mouse, and everything in a drag rectangle::
+
+      hitboxes = HitboxSet()
+      for card in cards:
+        hitboxes.append(card.hitbox, card.z)
+      under_mouse = hitboxes.query_point(x, y)
+      selected = hitboxes.query_rect(left, top, right, bottom)
+
+"""
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+# Columns kept per hitbox, in the order of SquareHitbox.get_edges followed by the bounds and z
+_COLUMNS = ('ax', 'ay', 'abx', 'aby', 'abab', 'adx', 'ady', 'adad', 'left', 'top', 'right', 'bottom', 'z')
+
+
+class HitboxSet(object):
+  """Hitboxes addressed by the index they were appended at.
+
+  Args:
+    hitboxes: SquareHitboxes to start with.
+    zs: Their z values, all 0 when not given.
+    use_numpy: Use NumPy arrays.  None uses them when NumPy is installed.
+  """
+
+  def __init__(self, hitboxes=(), zs=None, use_numpy=None):
+    super(HitboxSet, self).__init__()
+    if use_numpy is None:
+      use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+      raise ImportError("HitboxSet(use_numpy=True) needs numpy")
+    self.useNumpy = use_numpy
+
+    self._count = 0
+    if use_numpy:
+      self._array = numpy.empty((16, len(_COLUMNS)), dtype=numpy.float64)
+    else:
+      self._rows = []
+
+    hitboxes = list(hitboxes)
+    if zs is None:
+      zs = [0] * len(hitboxes)
+    for hitbox, z in zip(hitboxes, zs):
+      self.append(hitbox, z)
+
+  @staticmethod
+  def _row(hitbox, z):
+    return hitbox.get_edges() + hitbox.get_bounds() + (z,)
+
+  def append(self, hitbox, z=0):
+    """Add a hitbox.  Returns its index."""
+    index = self._count
+    if self.useNumpy:
+      if index == len(self._array):
+        self._array = numpy.concatenate((self._array, numpy.empty_like(self._array)))
+      self._array[index] = self._row(hitbox, z)
+    else:
+      self._rows.append(self._row(hitbox, z))
+    self._count += 1
+    return index
+
+  def set(self, index, hitbox, z=0):
+    """Replace the hitbox at ``index``, or re-read it after the hitbox was updated."""
+    if not 0 <= index < self._count:
+      raise IndexError("hitbox index out of range")
+    if self.useNumpy:
+      self._array[index] = self._row(hitbox, z)
+    else:
+      self._rows[index] = self._row(hitbox, z)
+
+  def clear(self):
+    self._count = 0
+    if not self.useNumpy:
+      del self._rows[:]
+
+  def query_point(self, x, y):
+    """Indices of the hitboxes containing (x, y), bottom first."""
+    if self.useNumpy:
+      return self._numpy_point(x, y)
+
+    hits = []
+    for index, (ax, ay, abx, aby, abab, adx, ady, adad, left, top, right, bottom, z) in enumerate(self._rows):
+      if x < left or x > right or y < top or y > bottom:
+        continue
+      amx = ax - x
+      amy = ay - y
+      if 0 <= amx * abx + amy * aby < abab and 0 <= amx * adx + amy * ady < adad:
+        hits.append(index)
+    return self._sort_by_z(hits)
+
+  def query_rect(self, left, top, right, bottom):
+    """Indices of the hitboxes overlapping the rectangle (left, top, right, bottom), bottom first."""
+    if self.useNumpy:
+      return self._numpy_rect(left, top, right, bottom)
+
+    corners = ((left, top), (right, top), (right, bottom), (left, bottom))
+    hits = []
+    for index, row in enumerate(self._rows):
+      ax, ay, abx, aby, abab, adx, ady, adad, box_left, box_top, box_right, box_bottom, z = row
+      # Separating axis test.  The x and y axes first, which is the bounds check ...
+      if box_right < left or right < box_left or box_bottom < top or bottom < box_top:
+        continue
+      # ... then the two edge axes of the hitbox, along which it spans 0 to abab and 0 to adad
+      along_ab = [(ax - x) * abx + (ay - y) * aby for x, y in corners]
+      if max(along_ab) < 0 or min(along_ab) > abab:
+        continue
+      along_ad = [(ax - x) * adx + (ay - y) * ady for x, y in corners]
+      if max(along_ad) < 0 or min(along_ad) > adad:
+        continue
+      hits.append(index)
+    return self._sort_by_z(hits)
+
+  def _sort_by_z(self, hits):
+    rows = self._rows
+    hits.sort(key=lambda index: (rows[index][-1], index))
+    return hits
+
+  def _columns(self):
+    array = self._array[:self._count]
+    return [array[:, column] for column in range(len(_COLUMNS))]
+
+  def _numpy_point(self, x, y):
+    ax, ay, abx, aby, abab, adx, ady, adad, left, top, right, bottom, z = self._columns()
+    amx = ax - x
+    amy = ay - y
+    along_ab = amx * abx + amy * aby
+    along_ad = amx * adx + amy * ady
+    inside = ((left <= x) & (x <= right) & (top <= y) & (y <= bottom) &
+              (0 <= along_ab) & (along_ab < abab) & (0 <= along_ad) & (along_ad < adad))
+    return self._numpy_sort_by_z(inside, z)
+
+  def _numpy_rect(self, left, top, right, bottom):
+    ax, ay, abx, aby, abab, adx, ady, adad, box_left, box_top, box_right, box_bottom, z = self._columns()
+    overlap = (box_left <= right) & (left <= box_right) & (box_top <= bottom) & (top <= box_bottom)
+
+    # Every rectangle corner projected on both edge axes of every hitbox, one row per corner
+    corners_x = numpy.array((left, right, right, left), dtype=numpy.float64)[:, None]
+    corners_y = numpy.array((top, top, bottom, bottom), dtype=numpy.float64)[:, None]
+    along_ab = (ax - corners_x) * abx + (ay - corners_y) * aby
+    along_ad = (ax - corners_x) * adx + (ay - corners_y) * ady
+    overlap &= (along_ab.max(axis=0) >= 0) & (along_ab.min(axis=0) <= abab)
+    overlap &= (along_ad.max(axis=0) >= 0) & (along_ad.min(axis=0) <= adad)
+    return self._numpy_sort_by_z(overlap, z)
+
+  @staticmethod
+  def _numpy_sort_by_z(mask, z):
+    hits = numpy.flatnonzero(mask)
+    # lexsort sorts by the last key first: z, then index
+    order = numpy.lexsort((hits, z[hits]))
+    return hits[order].tolist()
+
+  def __len__(self):
+    return self._count
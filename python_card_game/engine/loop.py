@@ -0,0 +1,116 @@
+"""Main loop with fixed-timestep updates, frame pacing and idle blocking.
+
+Every frame the loop handles events, runs the game logic in fixed steps of
+``1 / tick_rate`` seconds for the time that has passed, renders once, and then
+sleeps until the next frame is due.  The logic therefore behaves the same at
+any frame rate.  When a frame takes too long, up to ``max_frame_skip`` steps
+are run before rendering again, so a slow renderer drops frames instead of
+slowing the game down; beyond that the time is dropped.
+
+When nothing is animating and nothing needs redrawing the loop blocks on
+``wait`` until something happens, so an idle table costs no CPU.  Without a
+``wait`` (a headless engine, where nothing can arrive) an idle loop ends.
+
+Example:
+  Run at 30 frames per second with logic at 60 steps per second::
+
+      loop = GameLoop(fps=30, tick_rate=60)
+      loop.run(handle_events, render, tick=move_cards, idle=is_idle, wait=wait_for_event)
+
+"""
+
+import time
+import timeit
+
+
+class GameLoop(object):
+  """Paces calls to the event, logic and render steps of a game.
+
+  Args:
+    fps: Frames rendered per second at most.  None or 0 renders as fast as
+      possible.
+    tick_rate: Fixed logic steps per second.
+    max_frame_skip: Most logic steps run between two renders.
+    clock: Returns the current time in seconds.
+    sleep: Sleeps for the given number of seconds.
+  """
+
+  def __init__(self, fps=60, tick_rate=60, max_frame_skip=5, clock=timeit.default_timer, sleep=time.sleep):
+    super(GameLoop, self).__init__()
+    self.fps = fps
+    self.tickRate = tick_rate
+    self.maxFrameSkip = max_frame_skip
+    self.clock = clock
+    self.sleep = sleep
+
+    self.running = False
+    # Frames rendered, logic steps run and logic steps dropped under load since run was called
+    self.frames = 0
+    self.ticks = 0
+    self.droppedTicks = 0
+
+  def stop(self):
+    """End the loop after the current frame."""
+    self.running = False
+
+  def run(self, update, render, tick=None, idle=None, wait=None, max_frames=None):
+    """Run until stopped.
+
+    Args:
+      update: Handles events, called once per frame.
+      render: Draws the frame, called once per frame.
+      tick: Called with the step length in seconds for each fixed logic step.
+      idle: Returns True when nothing is animating or needs redrawing.
+      wait: Blocks until there is an event to handle.
+      max_frames: Stop after rendering this many frames.
+    """
+    clock = self.clock
+    step = 1.0 / self.tickRate
+    frame_time = 1.0 / self.fps if self.fps else 0.0
+
+    self.running = True
+    self.frames = 0
+    self.ticks = 0
+    self.droppedTicks = 0
+
+    previous = clock()
+    lag = 0.0
+    while self.running:
+      if idle is not None and idle():
+        if wait is None:
+          break
+        wait()
+        # Time spent waiting is not time the game logic has to catch up on
+        previous = clock()
+        lag = 0.0
+
+      frame_start = clock()
+      lag += frame_start - previous
+      previous = frame_start
+
+      update()
+      if not self.running:
+        break
+
+      ticks = 0
+      while lag >= step and ticks < self.maxFrameSkip:
+        if tick is not None:
+          tick(step)
+        lag -= step
+        ticks += 1
+      if lag >= step:
+        # Too far behind to catch up, so let the logic slow down instead of rendering never
+        self.droppedTicks += int(lag / step)
+        lag %= step
+      self.ticks += ticks
+
+      render()
+      self.frames += 1
+      if max_frames is not None and self.frames >= max_frames:
+        break
+
+      remaining = frame_time - (clock() - frame_start)
+      if remaining > 0:
+        self.sleep(remaining)
+
+    self.running = False
@@ -0,0 +1,190 @@
+"""Timing instrumentation for the engine's hot paths.
+
+A ``Profiler`` keeps the last ``window`` samples of every timed thing, grouped
+in categories: ``phase`` for the parts of a frame (``update``, ``tick``,
+``render``, ``display`` and the whole ``frame``), ``render`` for the
+render cost of each UI element class, and ``notify`` for each event handler.
+From those it reports rolling percentiles, and it can dump them as JSON or
+CSV for offline analysis.
+
+Example:
+  Profile a running engine and save the results::
+
+      profiler = CardEngine.enable_profiling()
+      CardEngine.run(max_frames=600)
+      profiler.dump_json('frames.json')
+
+"""
+
+import collections
+import csv
+import json
+import timeit
+
+from events import NOTIFY, EventHandler
+
+PHASE = 'phase'
+RENDER = 'render'
+
+
+class RollingStats(object):
+  """The last ``size`` samples of a timing, in seconds."""
+
+  def __init__(self, size=120):
+    super(RollingStats, self).__init__()
+    self.samples = collections.deque(maxlen=size)
+    # Samples ever added, not just the ones still in the window
+    self.count = 0
+
+  def add(self, seconds):
+    self.samples.append(seconds)
+    self.count += 1
+
+  def percentile(self, percent):
+    """Nearest-rank percentile of the samples in the window, or 0 without any."""
+    if not self.samples:
+      return 0.0
+    return _rank(sorted(self.samples), percent)
+
+  def mean(self):
+    if not self.samples:
+      return 0.0
+    return sum(self.samples) / len(self.samples)
+
+  def summary(self):
+    """Count, mean, percentiles and maximum, in milliseconds."""
+    if not self.samples:
+      return {'count': self.count, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(self.samples)
+    return {
+        'count': self.count,
+        'mean': sum(ordered) / len(ordered) * 1000.0,
+        'p50': _rank(ordered, 50) * 1000.0,
+        'p95': _rank(ordered, 95) * 1000.0,
+        'p99': _rank(ordered, 99) * 1000.0,
+        'max': ordered[-1] * 1000.0,
+    }
+
+
+def _rank(ordered, percent):
+  # Nearest-rank percentile of samples already sorted
+  return ordered[int(round(percent / 100.0 * (len(ordered) - 1)))]
+
+
+class Profiler(object):
+  """Collects rolling timings by category and name.
+
+  Args:
+    window: Samples kept for every timing.
+    clock: Returns the current time in seconds.
+  """
+
+  COLUMNS = ('category', 'name', 'count', 'mean', 'p50', 'p95', 'p99', 'max')
+
+  def __init__(self, window=120, clock=timeit.default_timer):
+    super(Profiler, self).__init__()
+    self.window = window
+    self.clock = clock
+    # category -> name -> RollingStats
+    self._stats = {}
+    # Start of the frame being measured
+    self._frameStart = None
+    self.frames = 0
+
+    # Notified with the profiler at the end of every frame, for overlays and logging
+    self.frameEnded = EventHandler()
+
+  def record(self, category, name, seconds):
+    names = self._stats.get(category)
+    if names is None:
+      names = self._stats[category] = {}
+    stats = names.get(name)
+    if stats is None:
+      stats = names[name] = RollingStats(self.window)
+    stats.add(seconds)
+
+  def time(self, category, name):
+    """Context manager timing its block as ``name`` in ``category``."""
+    return _Timer(self, category, name)
+
+  def end_frame(self):
+    """Mark the end of a frame.  The time between two calls is the ``frame`` phase."""
+    now = self.clock()
+    if self._frameStart is not None:
+      self.record(PHASE, 'frame', now - self._frameStart)
+    self._frameStart = now
+    self.frames += 1
+    self.frameEnded.notify(self)
+
+  def stats(self, category, name):
+    """The RollingStats of a timing, or None if it was never recorded."""
+    return self._stats.get(category, {}).get(name)
+
+  def summary(self):
+    """{category: {name: summary}} with times in milliseconds."""
+    return dict((category, dict((name, stats.summary()) for name, stats in names.items()))
+                for category, names in self._stats.items())
+
+  def rows(self):
+    """One tuple per timing with the values of COLUMNS, sorted by category then slowest mean first."""
+    rows = []
+    for category, names in sorted(self._stats.items()):
+      summaries = [(name, stats.summary()) for name, stats in names.items()]
+      summaries.sort(key=lambda item: -item[1]['mean'])
+      for name, summary in summaries:
+        rows.append((category, name) + tuple(summary[column] for column in self.COLUMNS[2:]))
+    return rows
+
+  def report(self, limit=None):
+    """Human readable lines, one per timing, for an overlay or a log."""
+    lines = []
+    for row in self.rows()[:limit]:
+      category, name, count, mean, p50, p95, p99, maximum = row
+      lines.append("%s %s: %.2f ms mean, %.2f p95, %.2f max" % (category, name, mean, p95, maximum))
+    return lines
+
+  def dump_json(self, destination):
+    """Write the summary as JSON to a path or an open file."""
+    data = {'frames': self.frames, 'window': self.window, 'timings': self.summary()}
+    if hasattr(destination, 'write'):
+      json.dump(data, destination, indent=2, sort_keys=True)
+    else:
+      with open(destination, 'w') as output:
+        json.dump(data, output, indent=2, sort_keys=True)
+
+  def dump_csv(self, destination):
+    """Write one row per timing as CSV, times in milliseconds, to a path or an open file."""
+    if hasattr(destination, 'write'):
+      self._write_csv(destination)
+    else:
+      with open(destination, 'wb') as output:
+        self._write_csv(output)
+
+  def _write_csv(self, output):
+    writer = csv.writer(output)
+    writer.writerow(self.COLUMNS)
+    writer.writerows(self.rows())
+
+  def reset(self):
+    self._stats.clear()
+    self._frameStart = None
+    self.frames = 0
+
+
+class _Timer(object):
+  # Times a with block.
+
+  __slots__ = ('profiler', 'category', 'name', 'start')
+
+  def __init__(self, profiler, category, name):
+    self.profiler = profiler
+    self.category = category
+    self.name = name
+
+  def __enter__(self):
+    self.start = self.profiler.clock()
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.profiler.record(self.category, self.name, self.profiler.clock() - self.start)
+    return False
@@ -0,0 +1,216 @@
+"""Routes events to the UI elements interested in them.
+
+Elements register for the event types they handle.  Instead of every element
+seeing every event and filtering it out again, each event only goes to:
+
+* keyboard events: the focused element.
+* mouse events: the elements under the mouse, found through a spatial index,
+  the caller's own when it passes ``query_point``, plus the elements that need to see the mouse leave them: the ones pressed by
+  the last mouse button down, the ones under the mouse at the previous mouse
+  event, and the focused element.
+* any other event: every element registered for its type.
+
+So the cost of an event depends on how many elements care about it, not on
+how many are on screen.  Focus moves to the topmost element taking keyboard
+events under a mouse button release, or to nothing when there is none.
+
+Example:
+  Route events to a text box and a button::
+
+      router = EventRouter(EventType)
+      router.register(textbox, (MOUSEBUTTONDOWN, MOUSEBUTTONUP, KEYDOWN))
+      router.register(button, (MOUSEMOTION, MOUSEBUTTONDOWN, MOUSEBUTTONUP))
+      for event in events:
+        router.dispatch(event)
+
+"""
+
+from spatial import GridIndex
+
+
+class EventRouter(object):
+  """Delivers events to the ``handle_event`` of registered elements.
+
+  Elements need ``handle_event(event)``, and for mouse events also
+  ``get_bounds()`` and ``collide(x, y)``.
+
+  Args:
+    event_types: Anything with ``KEYDOWN``, ``KEYUP``, ``MOUSEMOTION``,
+      ``MOUSEBUTTONDOWN`` and ``MOUSEBUTTONUP`` attributes, such as the
+      engine's ``EventType`` or the pygame module.
+    key: Sort key of an element, larger keys being on top.  Without one, the
+      element registered or moved last is taken to be on top.
+    cell_size: Grid cell size of the spatial index.
+    query_point: Returns the elements whose bounds contain a point (x, y),
+      such as ``GridIndex.query_point`` of an index the caller already keeps
+      of the elements.  The router then finds elements registered without a
+      region through it, and keeps no index of them itself, so ``update`` is
+      not needed for them.  Without it, the router indexes their bounds.
+  """
+
+  def __init__(self, event_types, key=None, cell_size=64, query_point=None):
+    super(EventRouter, self).__init__()
+    self.keyboardTypes = frozenset((event_types.KEYDOWN, event_types.KEYUP))
+    self.mouseTypes = frozenset((event_types.MOUSEMOTION, event_types.MOUSEBUTTONDOWN, event_types.MOUSEBUTTONUP))
+    self._mouseButtonDown = event_types.MOUSEBUTTONDOWN
+    self._mouseButtonUp = event_types.MOUSEBUTTONUP
+    self._key = key
+    # Element receiving keyboard events
+    self.focus = None
+
+    # element -> event types it handles
+    self._types = {}
+    # event type -> elements handling it, in registration order
+    self._listeners = {}
+    # element -> fixed region it was registered with, for elements not using their bounds
+    self._regions = {}
+    # Elements taking mouse events, by where they are interested in them.  Only those with a region when the
+    # caller's query_point finds the others.
+    self._index = GridIndex(cell_size)
+    self._queryPoint = query_point
+
+    # Elements pressed by the last mouse button down, and under the mouse at the last mouse event
+    self._pressed = []
+    self._hovered = []
+
+  def register(self, element, event_types, region=None):
+    """Send events of ``event_types`` to ``element``.
+
+    Mouse events are sent when they happen over ``region`` (left, top, right,
+    bottom), or over the element's own bounds when no region is given.
+    Registering again replaces the earlier registration.
+    """
+    if element in self._types:
+      self.unregister(element)
+    event_types = frozenset(event_types)
+    if not event_types:
+      return
+
+    self._types[element] = event_types
+    for event_type in event_types:
+      self._listeners.setdefault(event_type, []).append(element)
+
+    if event_types & self.mouseTypes:
+      if region is not None:
+        self._regions[element] = tuple(region)
+        self._index.insert(element, region)
+      elif self._queryPoint is None:
+        self._index.insert(element, element.get_bounds())
+
+  def unregister(self, element):
+    event_types = self._types.pop(element, None)
+    if event_types is None:
+      return
+
+    for event_type in event_types:
+      listeners = self._listeners[event_type]
+      listeners.remove(element)
+      if not listeners:
+        del self._listeners[event_type]
+
+    self._regions.pop(element, None)
+    self._index.remove(element)
+    self._pressed = [other for other in self._pressed if other is not element]
+    self._hovered = [other for other in self._hovered if other is not element]
+    if self.focus is element:
+      self.focus = None
+
+  def update(self, element):
+    """Re-read the bounds of ``element`` after it moved or changed size."""
+    if element in self._index and element not in self._regions:
+      self._index.update(element, element.get_bounds())
+
+  def set_focus(self, element):
+    """Send keyboard events to ``element``, or to nothing if it is None."""
+    self.focus = element
+
+  def listeners(self, event):
+    """Return the elements ``event`` would be delivered to, in delivery order."""
+    event_type = event.type
+    if event_type in self.keyboardTypes:
+      focus = self.focus
+      if focus is not None and event_type in self._types.get(focus, ()):
+        return [focus]
+      return []
+
+    if event_type in self.mouseTypes:
+      return self._mouse_listeners(event, self._hits(event))
+
+    return list(self._listeners.get(event_type, ()))
+
+  def dispatch(self, event):
+    """Deliver ``event``.  Returns the number of elements it was delivered to."""
+    event_type = event.type
+    if event_type not in self.mouseTypes:
+      listeners = self.listeners(event)
+      for element in listeners:
+        element.handle_event(event)
+      return len(listeners)
+
+    hits = self._hits(event)
+    listeners = self._mouse_listeners(event, hits)
+
+    # Track state before delivering, so handlers may register, unregister or move focus themselves
+    self._hovered = hits
+    if event_type == self._mouseButtonDown:
+      self._pressed = hits
+    elif event_type == self._mouseButtonUp:
+      self._pressed = []
+      self.focus = self._topmost_keyboard_element(hits)
+
+    for element in listeners:
+      element.handle_event(event)
+    return len(listeners)
+
+  def clear(self):
+    self._types.clear()
+    self._listeners.clear()
+    self._regions.clear()
+    self._index.clear()
+    self._pressed = []
+    self._hovered = []
+    self.focus = None
+
+  def _hits(self, event):
+    pos = getattr(event, 'pos', None)
+    if pos is None:
+      return []
+    x, y = pos
+    hits = [element for element in self._index.query_point(x, y)
+            if element in self._regions or element.collide(x, y)]
+    if self._queryPoint is not None:
+      # The caller's index holds every element, registered for mouse events or not
+      types = self._types
+      mouse_types = self.mouseTypes
+      regions = self._regions
+      hits.extend(element for element in self._queryPoint(x, y)
+                  if element not in regions and not types.get(element, frozenset()).isdisjoint(mouse_types)
+                  and element.collide(x, y))
+    return hits
+
+  def _mouse_listeners(self, event, hits):
+    # Elements under the mouse first, then the ones that need to see it elsewhere
+    event_type = event.type
+    listeners = []
+    seen = set()
+    for group in (hits, self._pressed, self._hovered, (self.focus,) if self.focus is not None else ()):
+      for element in group:
+        if element not in seen and event_type in self._types.get(element, ()):
+          seen.add(element)
+          listeners.append(element)
+    return listeners
+
+  def _topmost_keyboard_element(self, hits):
+    keyboard = [element for element in hits if self._types[element] & self.keyboardTypes]
+    if not keyboard:
+      return None
+    if self._key is not None:
+      return max(keyboard, key=self._key)
+    # Hits are in the order they were put in the index
+    return keyboard[-1]
+
+  def __contains__(self, element):
+    return element in self._types
+
+  def __len__(self):
+    return len(self._types)
@@ -0,0 +1,60 @@
+"""Deck shuffling for the card engine.
+
+A Shuffler owns its own random number generator, so every engine (or
+simulation worker) can be seeded independently of the global ``random``
+module and reproduce the exact same sequence of shuffles.
+
+Example:
+  Shuffle a deck in place and get a shuffled copy of another::
+
+      shuffler = Shuffler(seed=42)
+      shuffler.shuffle(deck)
+      other = shuffler.shuffled(other_deck)
+
+"""
+
+import random
+
+
+class Shuffler(object):
+  """Seedable Fisher-Yates shuffler.
+
+  Args:
+    seed: Optional seed.  ``None`` seeds from the operating system.
+  """
+
+  def __init__(self, seed=None):
+    super(Shuffler, self).__init__()
+    self.random = random.Random(seed)
+
+  def seed(self, seed=None):
+    self.random.seed(seed)
+
+  def shuffle(self, deck):
+    """Shuffle ``deck`` in place in O(n) and return it."""
+    # Fisher-Yates: walk down from the end, swapping each slot with a random
+    # slot at or below it.  Locals avoid attribute lookups in the loop.
+    rand = self.random.random
+    for i in xrange(len(deck) - 1, 0, -1):
+      j = int(rand() * (i + 1))
+      deck[i], deck[j] = deck[j], deck[i]
+    return deck
+
+  def shuffled(self, deck):
+    """Return a shuffled copy of ``deck``, leaving ``deck`` untouched."""
+    return self.shuffle(list(deck))
+
+  def shuffle_all(self, decks, in_place=True):
+    """Shuffle every deck in ``decks`` with a single call.
+
+    Returns:
+      The list of shuffled decks.  With ``in_place`` the decks themselves are
+      shuffled and returned, otherwise shuffled copies are returned.
+    """
+    shuffle = self.shuffle
+    if in_place:
+      decks = list(decks)
+      for deck in decks:
+        shuffle(deck)
+      return decks
+    return [shuffle(list(deck)) for deck in decks]
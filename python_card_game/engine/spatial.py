@@ -0,0 +1,117 @@
+"""Uniform grid spatial index for hit-testing UI elements.
+
+Items are stored by their axis-aligned bounds ``(left, top, right, bottom)``
+in every grid cell the bounds touch.  A point query only looks at the items
+of one cell, so its cost depends on how crowded that spot is rather than on
+the number of items on screen.
+
+Example:
+  Find what might be under the mouse, then do the exact test::
+
+      index = GridIndex()
+      index.insert(card, card.get_bounds())
+      hits = [item for item in index.query_point(x, y) if item.collide(x, y)]
+
+"""
+
+
+class GridIndex(object):
+  """Spatial index of items keyed by their bounds.
+
+  Args:
+    cell_size: Width and height of a grid cell in pixels.  Roughly the size
+      of a card works well.
+  """
+
+  def __init__(self, cell_size=64):
+    super(GridIndex, self).__init__()
+    self.cellSize = cell_size
+    # (column, row) -> items overlapping that cell, in insertion order
+    self._cells = {}
+    # item -> bounds it was inserted with
+    self._bounds = {}
+
+  def _cell_range(self, bounds):
+    size = self.cellSize
+    left, top, right, bottom = bounds
+    return (int(left // size), int(top // size), int(right // size), int(bottom // size))
+
+  def insert(self, item, bounds):
+    if item in self._bounds:
+      self.remove(item)
+    bounds = tuple(bounds)
+    self._bounds[item] = bounds
+
+    cells = self._cells
+    first_column, first_row, last_column, last_row = self._cell_range(bounds)
+    for column in xrange(first_column, last_column + 1):
+      for row in xrange(first_row, last_row + 1):
+        cell = cells.get((column, row))
+        if cell is None:
+          cells[(column, row)] = [item]
+        else:
+          cell.append(item)
+
+  def remove(self, item):
+    bounds = self._bounds.pop(item, None)
+    if bounds is None:
+      return
+
+    cells = self._cells
+    first_column, first_row, last_column, last_row = self._cell_range(bounds)
+    for column in xrange(first_column, last_column + 1):
+      for row in xrange(first_row, last_row + 1):
+        cell = cells[(column, row)]
+        cell.remove(item)
+        if not cell:
+          del cells[(column, row)]
+
+  def update(self, item, bounds):
+    # Moving within the same bounds is free, which is the common case.
+    if self._bounds.get(item) != tuple(bounds):
+      self.insert(item, bounds)
+
+  def get_bounds(self, item):
+    return self._bounds.get(item)
+
+  def query_point(self, x, y):
+    """Return the items whose bounds contain (x, y), in insertion order."""
+    size = self.cellSize
+    cell = self._cells.get((int(x // size), int(y // size)))
+    if cell is None:
+      return []
+    bounds = self._bounds
+    hits = []
+    for item in cell:
+      left, top, right, bottom = bounds[item]
+      if left <= x <= right and top <= y <= bottom:
+        hits.append(item)
+    return hits
+
+  def query_rect(self, left, top, right, bottom):
+    """Return the items whose bounds overlap the given rectangle."""
+    cells = self._cells
+    bounds = self._bounds
+    seen = set()
+    hits = []
+    first_column, first_row, last_column, last_row = self._cell_range((left, top, right, bottom))
+    for column in xrange(first_column, last_column + 1):
+      for row in xrange(first_row, last_row + 1):
+        for item in cells.get((column, row), ()):
+          if item in seen:
+            continue
+          seen.add(item)
+          item_left, item_top, item_right, item_bottom = bounds[item]
+          if item_left <= right and left <= item_right and item_top <= bottom and top <= item_bottom:
+            hits.append(item)
+    return hits
+
+  def clear(self):
+    self._cells.clear()
+    self._bounds.clear()
+
+  def __contains__(self, item):
+    return item in self._bounds
+
+  def __len__(self):
+    return len(self._bounds)
@@ -1,5 +1,104 @@
+import hashlib
+import os
 
-import CardEngine.Engine as Cards
+import engine as Cards
+from engine import bitboard, encoding
+from player import AI
+
+resourcePath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "res")
+imagePath = "img/Cards/"
+imageType = ".png"
+
+suits = {1: "Clubs",
+         2: "Diamonds",
+         3: "Spades",
+         4: "Hearts"}
+
+values = {1: "Ace",
+          2: "2",
+          3: "3",
+          4: "4",
+          5: "5",
+          6: "6",
+          7: "7",
+          8: "8",
+          9: "9",
+          10: "10",
+          11: "Jack",
+          12: "Queen",
+          13: "King"}
+
+CLUBS = 1
+DIAMONDS = 2
+SPADES = 3
+HEARTS = 4
+
+
+def card_image_path(suit, value):
+  # e.g. res/img/Cards/Queen of Spades.png
+  return os.path.join(resourcePath, imagePath, "%s of %s%s" % (values[value], suits[suit], imageType))
+
+
+def card_back_path(number=1):
+  return os.path.join(resourcePath, imagePath, "Card Back %d%s" % (number, imageType))
+
+
+def card_fronts():
+  # (suit, value) -> front image of every card
+  return dict(((suit, value), card_image_path(suit, value)) for suit in suits for value in values)
+
+
+def card_backs():
+  return [card_back_path(number) for number in range(1, 5)]
+
+
+def card_image_paths():
+  # Every front and back image of the card set
+  return sorted(card_fronts().values()) + card_backs()
+
+
+def atlas_path():
+  # The built atlas is cached per user, not in the package, which may be read-only.  The name depends on where the
+  # card images are, so installs with different card sets do not share a stale atlas.
+  cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+  digest = hashlib.sha1("\n".join(card_image_paths())).hexdigest()[:12]
+  return os.path.join(cache, "python_card_game", "atlas-%s%s" % (digest, imageType))
+
+
+TWO_OF_CLUBS = Cards.PlayingCard(CLUBS, 2)
+QUEEN_OF_SPADES = Cards.PlayingCard(SPADES, 12)
+
+# Bitboard masks used by legal_moves
+HEARTS_MASK = bitboard.SUIT_MASKS[HEARTS]
+TWO_OF_CLUBS_BIT = bitboard.bit(encoding.from_card(TWO_OF_CLUBS))
+POINTS_MASK = HEARTS_MASK | bitboard.bit(encoding.from_card(QUEEN_OF_SPADES))
+
+
+def legal_moves(hand, lead_suit=None, hearts_broken=False, first_trick=False):
+  """Bitboard version of Hearts.legal_cards.
+
+  Args:
+    hand: Bitboard of the cards held.
+    lead_suit: Suit led to the trick, or None when leading.
+    hearts_broken: Whether a heart has been played this round.
+    first_trick: Whether this is the first trick of the round.
+
+  Returns:
+    Bitboard of the cards that may be played.
+  """
+  if lead_suit is None:
+    if first_trick and hand & TWO_OF_CLUBS_BIT:
+      return TWO_OF_CLUBS_BIT
+    if not hearts_broken and hand & ~HEARTS_MASK:
+      return hand & ~HEARTS_MASK
+    return hand
+
+  legal = hand & bitboard.SUIT_MASKS[lead_suit]
+  if legal:
+    return legal
+  if first_trick and hand & ~POINTS_MASK:
+    return hand & ~POINTS_MASK
+  return hand
 
 
 class Player:
@@ -10,23 +109,171 @@ class Player:
     self.hand = []
     self.display = None
 
+    # Cards won in tricks this round, and the running score for the game
+    self.taken = []
+    self.score = 0
+
 
 class Hearts:
 
-  def __init__(self, width=800, height=600):
-    Cards.CardEngine.init(width, height)
+  def __init__(self, width=800, height=600, headless=False, seed=None, players=None):
+    # A headless game never opens a window, so it can run on machines without a display.
+    Cards.CardEngine.init(width, height, headless=headless, seed=seed)
     self.deck = None
     self.deck = Cards.CardEngine.create_deck(suits, values, special_cards=None)
 
+    # UI card of each card in the deck, once create_card_displays has made them
+    self.cardDisplays = {}
+
+    # The AI players share the engine's generator, so a seed reproduces a whole game.
+    self.random = Cards.CardEngine.shuffler.random
+
+    if players is None:
+      players = [Player("Player %d" % (i + 1), AI.RandomAI()) for i in range(4)]
+    self.players = players
+
+    self.rounds = 0
+    self.heartsBroken = False
+    self.firstTrick = True
+
+  @staticmethod
+  def rank(card):
+    # Aces are high in Hearts
+    if card.value == 1:
+      return 14
+    return card.value
+
+  @staticmethod
+  def points(card):
+    if card.suit == HEARTS:
+      return 1
+    if card == QUEEN_OF_SPADES:
+      return 13
+    return 0
+
+  def deal(self):
+    deck = Cards.CardEngine.shuffle(self.deck)
+    hand_size = len(deck) // len(self.players)
+    for player in self.players:
+      player.hand = []
+      player.taken = []
+      Cards.CardEngine.deal_cards(deck, player.hand, hand_size)
+
+  def legal_cards(self, player, trick):
+    hand = player.hand
+
+    if not trick:
+      # The two of clubs opens the round, and hearts cannot be led until broken.
+      if self.firstTrick and TWO_OF_CLUBS in hand:
+        return [TWO_OF_CLUBS]
+      if not self.heartsBroken:
+        legal = [card for card in hand if card.suit != HEARTS]
+        if legal:
+          return legal
+      return list(hand)
+
+    # Follow suit when possible
+    lead_suit = trick[0].suit
+    legal = [card for card in hand if card.suit == lead_suit]
+    if legal:
+      return legal
+
+    # No points may be discarded on the first trick unless nothing else is left
+    if self.firstTrick:
+      legal = [card for card in hand if self.points(card) == 0]
+      if legal:
+        return legal
+    return list(hand)
+
+  def play_trick(self, leader):
+    trick = []
+    count = len(self.players)
+    order = [(leader + i) % count for i in range(count)]
+
+    for index in order:
+      player = self.players[index]
+      card = player.ai.choose_card(self, player, self.legal_cards(player, trick))
+      Cards.CardEngine.transfer_cards([card], player.hand, trick)
+      if card.suit == HEARTS:
+        self.heartsBroken = True
+
+    # Highest card of the suit led takes the trick
+    lead_suit = trick[0].suit
+    best = 0
+    for i in range(1, count):
+      if trick[i].suit == lead_suit and self.rank(trick[i]) > self.rank(trick[best]):
+        best = i
+
+    winner = order[best]
+    self.players[winner].taken.extend(trick)
+    self.firstTrick = False
+    return winner
+
+  def play_round(self):
+    self.deal()
+    self.heartsBroken = False
+    self.firstTrick = True
+
+    leader = 0
+    for index, player in enumerate(self.players):
+      if TWO_OF_CLUBS in player.hand:
+        leader = index
+
+    while self.players[leader].hand:
+      leader = self.play_trick(leader)
+
+    points = [sum(self.points(card) for card in player.taken) for player in self.players]
+
+    # Taking every point card shoots the moon: everyone else takes the points instead.
+    total = sum(points)
+    if total in points:
+      points = [0 if p == total else total for p in points]
+
+    for player, p in zip(self.players, points):
+      player.score += p
+    self.rounds += 1
+    return points
+
+  def play_game(self, max_score=100):
+    self.rounds = 0
+    for player in self.players:
+      player.score = 0
+
+    while max(player.score for player in self.players) < max_score:
+      self.play_round()
+    return [player.score for player in self.players]
+
+  def winners(self):
+    # Lowest score wins.  Ties share the win.
+    best = min(player.score for player in self.players)
+    return [index for index, player in enumerate(self.players) if player.score == best]
+
+  def preload_art(self, assets, background=True):
+    # Start loading the whole card set with the given asset manager, e.g. ui/Assets.ASSETS
+    return assets.preload(card_image_paths(), background)
+
+  def load_atlas(self, atlas_class, cache=True):
+    # Load the card set as a single atlas, building it on first use.  atlas_class is ui/Assets.CardAtlas.  Without
+    # the cache the atlas is built in memory every time.
+    return atlas_class.load_or_build(atlas_path() if cache else None, card_fronts(), card_backs())
+
+  def create_card_displays(self, card_class, atlas, back=1):
+    # Make a hidden UI card for every card of the deck.  card_class is ui/UI.Card and atlas comes from load_atlas, so
+    # every card draws from the one atlas surface instead of loading its own image.  Returns {card: UI card}.
+    self.cardDisplays = {}
+    for card in self.deck:
+      self.cardDisplays[card] = card_class(Cards.CardEngine, card.suit, card.value,
+                                           atlas.front(card.suit, card.value), atlas.back(back), visible=False)
+    return self.cardDisplays
+
   def check_out_deck(self):
     Cards.CardEngine.print_deck(self.deck)
     # print "here I would check out the deck"
 
-  def play(self):
-    while True:
-      Cards.CardEngine.update()
-      Cards.CardEngine.render()
+  def play(self, fps=60):
+    Cards.CardEngine.run(fps)
 
-game = Hearts()
-game.check_out_deck()
-# game.play()
+if __name__ == '__main__':
+  game = Hearts()
+  game.check_out_deck()
+  # game.play()
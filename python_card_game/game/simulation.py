@@ -0,0 +1,157 @@
+"""Monte Carlo simulation of headless Hearts games.
+
+Games are played across a ``multiprocessing`` pool.  Every game gets its own
+seed, derived from the seed of the run, and each worker reseeds its engine
+with it before playing, so a run is reproducible no matter how the games are
+scheduled across processes.
+
+Example:
+  Play ten thousand games on every core and print the win rates::
+
+      $ python simulation.py 10000
+
+"""
+
+import multiprocessing
+import random
+
+import engine as Cards
+import Heart2
+
+
+def _init_worker():
+  # Each worker owns a headless engine for the lifetime of the pool.
+  Cards.CardEngine.init(headless=True)
+
+
+def play_game(task):
+  """Play one complete game.
+
+  Args:
+    task: ``(game_index, seed, max_score, ai_classes)`` tuple.
+
+  Returns:
+    A dict with the game index, seed, final scores, winners and round count.
+  """
+  index, seed, max_score, ai_classes = task
+
+  players = None
+  if ai_classes is not None:
+    players = [Heart2.Player("Player %d" % (i + 1), ai_class()) for i, ai_class in enumerate(ai_classes)]
+
+  game = Heart2.Hearts(headless=True, seed=seed, players=players)
+  scores = game.play_game(max_score)
+  return {
+      "game": index,
+      "seed": seed,
+      "scores": scores,
+      "winners": game.winners(),
+      "rounds": game.rounds,
+  }
+
+
+def iter_games(games, processes=None, seed=None, max_score=100, ai_classes=None, chunksize=16):
+  """Play ``games`` games and yield each result as soon as it is finished.
+
+  Results arrive in completion order, not game order.  With ``processes=1``
+  the games are played in this process without a pool.
+  """
+  if seed is None:
+    seed = random.SystemRandom().getrandbits(32)
+  tasks = ((i, seed + i, max_score, ai_classes) for i in xrange(games))
+
+  if processes == 1:
+    for task in tasks:
+      yield play_game(task)
+    return
+
+  pool = multiprocessing.Pool(processes, _init_worker)
+  try:
+    for result in pool.imap_unordered(play_game, tasks, chunksize):
+      yield result
+    pool.close()
+  except:
+    pool.terminate()
+    raise
+  finally:
+    pool.join()
+
+
+class SimulationResults(object):
+  """Aggregated win rates and score distributions of a simulation run."""
+
+  def __init__(self, players=4):
+    super(SimulationResults, self).__init__()
+    self.games = 0
+    self.rounds = 0
+    self.wins = [0.0] * players
+    self.totalScores = [0] * players
+    # Final score -> number of games, one dictionary per seat
+    self.scoreCounts = [{} for i in range(players)]
+
+  def add(self, result):
+    self.games += 1
+    self.rounds += result["rounds"]
+
+    # A tie splits the win, so the win rates always add up to one.
+    share = 1.0 / len(result["winners"])
+    for index in result["winners"]:
+      self.wins[index] += share
+
+    for index, score in enumerate(result["scores"]):
+      self.totalScores[index] += score
+      counts = self.scoreCounts[index]
+      counts[score] = counts.get(score, 0) + 1
+
+  def win_rates(self):
+    if self.games == 0:
+      return [0.0] * len(self.wins)
+    return [wins / self.games for wins in self.wins]
+
+  def mean_scores(self):
+    if self.games == 0:
+      return [0.0] * len(self.totalScores)
+    return [float(total) / self.games for total in self.totalScores]
+
+  def score_distribution(self, player):
+    # Sorted (score, games) pairs for one seat
+    return sorted(self.scoreCounts[player].items())
+
+  def __str__(self):
+    lines = ["%d games, %d rounds" % (self.games, self.rounds)]
+    for index, (rate, mean) in enumerate(zip(self.win_rates(), self.mean_scores())):
+      lines.append("player %d: win rate %.3f, mean score %.1f" % (index + 1, rate, mean))
+    return "\n".join(lines)
+
+
+def run_simulation(games, processes=None, seed=None, max_score=100, ai_classes=None, callback=None):
+  """Play ``games`` games and aggregate them.
+
+  Args:
+    games: Number of games to play.
+    processes: Pool size.  ``None`` uses every core, ``1`` disables the pool.
+    seed: Seed of the run.  ``None`` picks one at random.
+    max_score: A game ends when a player reaches this score.
+    ai_classes: One AI class per seat.  ``None`` seats four random players.
+    callback: Called with every result as it is streamed back.
+
+  Returns:
+    SimulationResults for the run.
+  """
+  players = 4 if ai_classes is None else len(ai_classes)
+  results = SimulationResults(players)
+  for result in iter_games(games, processes, seed, max_score, ai_classes):
+    results.add(result)
+    if callback is not None:
+      callback(result)
+  return results
+
+
+if __name__ == '__main__':
+  import sys
+  import time
+
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+  start = time.time()
+  print run_simulation(count)
+  print "%.1f games/s" % (count / (time.time() - start))
@@ -42,3 +42,17 @@ __version__ = "0.0.1"
 __maintainer__ = "Mathew Cosgrove"
 __email__ = "cosgroma@gmail.com"
 __status__ = "Development"
+
+
+class RandomAI(object):
+  """Plays a random legal card, drawing from the game's random generator."""
+
+  def choose_card(self, game, player, legal_cards):
+    return legal_cards[int(game.random.random() * len(legal_cards))]
+
+
+class LowestCardAI(object):
+  """Always plays its lowest ranked legal card."""
+
+  def choose_card(self, game, player, legal_cards):
+    return min(legal_cards, key=game.rank)
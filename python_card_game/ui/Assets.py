@@ -0,0 +1,222 @@
+import os
+import threading
+import pygame
+import Cache
+
+# Directory holding the card images and other resources
+RESOURCE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'res')
+
+
+# Loads every image once and hands out the same surface to everyone asking for it.  Images can be preloaded on a
+# background thread; they are converted to the display's pixel format the first time they are asked for with a
+# display set up, on the caller's thread, as conversion needs the display.  Images asked for while headless are
+# handed out as decoded and converted by the first load after a display exists.
+class AssetManager(object):
+    def __init__(self):
+        # Guards every dict and set below.  Waited on by loads of an image another thread is decoding.
+        self._lock = threading.Condition(threading.Lock())
+        self._threads = []
+
+        # Images ready for use, and images decoded but not yet converted.  Both keyed by absolute path.
+        self._images = {}
+        self._loaded = {}
+        # Paths being decoded right now, so no other thread decodes them again
+        self._decoding = set()
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def _has_display():
+        return pygame.display.get_surface() is not None
+
+    @staticmethod
+    def _convert(surface):
+        # Converting needs a display mode.  Without one (headless) keep the image as loaded.
+        if not AssetManager._has_display():
+            return surface
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def _decode(self, key, path):
+        # Decode path, unless another thread already has or is doing it.  Returns the decoded image, or None when
+        # the image was converted meanwhile.  Call with the lock held; it is released while decoding.
+        while key in self._decoding:
+            self._lock.wait()
+        if key in self._images:
+            return None
+        image = self._loaded.get(key)
+        if image is not None:
+            return image
+
+        self._decoding.add(key)
+        self._lock.release()
+        try:
+            image = pygame.image.load(path)
+        finally:
+            self._lock.acquire()
+            self._decoding.discard(key)
+            self._lock.notify_all()
+        self._loaded[key] = image
+        return image
+
+    def load(self, path):
+        key = self._key(path)
+        # Converted images are only ever added under the lock, so finding one needs no lock
+        image = self._images.get(key)
+        if image is not None:
+            return image
+
+        with self._lock:
+            image = self._decode(key, path)
+            if image is None:
+                return self._images[key]
+        if not self._has_display():
+            return image
+
+        converted = self._convert(image)
+        with self._lock:
+            # Another thread may have converted it first; everyone gets the same surface
+            if key not in self._images:
+                self._images[key] = converted
+                self._loaded.pop(key, None)
+            return self._images[key]
+
+    def preload(self, paths, background=True):
+        # Decode images ahead of time.  Returns the loading thread, or None when loading in the foreground.
+        paths = [path for path in paths if not self.is_loaded(path)]
+        if not background:
+            for path in paths:
+                self.load(path)
+            return None
+
+        thread = threading.Thread(target=self._preload, args=(paths,))
+        thread.daemon = True
+        thread.start()
+        self._threads.append(thread)
+        return thread
+
+    def _preload(self, paths):
+        for path in paths:
+            key = self._key(path)
+            with self._lock:
+                try:
+                    self._decode(key, path)
+                except Exception:
+                    # Skip an image that fails to decode and go on with the rest.  _decode has already released
+                    # the path to any waiters; the next load decodes it again and raises on the caller's thread.
+                    pass
+
+    def wait(self):
+        # Block until every background preload has finished
+        while self._threads:
+            self._threads.pop().join()
+
+    def is_loaded(self, path):
+        key = self._key(path)
+        with self._lock:
+            return key in self._images or key in self._loaded
+
+    def memory_usage(self):
+        # Bytes of pixel data held by loaded images
+        with self._lock:
+            images = self._images.values() + self._loaded.values()
+        return sum(Cache.SurfaceCache.surface_bytes(image) for image in images)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._loaded.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._images) + len(self._loaded)
+
+
+# Asset manager shared by the whole UI
+ASSETS = AssetManager()
+
+
+# A whole card set in one image.  Each suit is a row with its values across, and the card backs fill the last row.
+# Cards are handed out as subsurfaces, views into the single atlas surface, so the set costs one file read and one
+# decode, and every card blits from the same source surface.
+class CardAtlas(object):
+    def __init__(self, surface, suits, values, back_count):
+        self.surface = surface
+        self.suits = sorted(suits)
+        self.values = sorted(values)
+        self.backCount = back_count
+
+        columns = max(len(self.values), back_count)
+        self.cardWidth = surface.get_width() // columns
+        self.cardHeight = surface.get_height() // (len(self.suits) + 1)
+
+        # Subsurfaces are created once, so the same card is always the same surface (and shares rotation caching)
+        self._fronts = {}
+        for row, suit in enumerate(self.suits):
+            for column, value in enumerate(self.values):
+                self._fronts[(suit, value)] = surface.subsurface(self._cell(row, column))
+        back_row = len(self.suits)
+        self._backs = [surface.subsurface(self._cell(back_row, column)) for column in range(back_count)]
+
+    def _cell(self, row, column):
+        return pygame.Rect(column * self.cardWidth, row * self.cardHeight, self.cardWidth, self.cardHeight)
+
+    def front(self, suit, value):
+        return self._fronts[(suit, value)]
+
+    def back(self, number=1):
+        return self._backs[number - 1]
+
+    @classmethod
+    def build(cls, fronts, backs):
+        # fronts maps (suit, value) to an image path, backs is a list of image paths
+        suits = sorted(set(suit for suit, value in fronts))
+        values = sorted(set(value for suit, value in fronts))
+
+        images = dict((card, pygame.image.load(path)) for card, path in fronts.items())
+        back_images = [pygame.image.load(path) for path in backs]
+        width = max(image.get_width() for image in images.values() + back_images)
+        height = max(image.get_height() for image in images.values() + back_images)
+
+        columns = max(len(values), len(backs))
+        surface = pygame.Surface((columns * width, (len(suits) + 1) * height), pygame.SRCALPHA, 32)
+        for row, suit in enumerate(suits):
+            for column, value in enumerate(values):
+                surface.blit(images[(suit, value)], (column * width, row * height))
+        for column, image in enumerate(back_images):
+            surface.blit(image, (column * width, len(suits) * height))
+
+        return cls(AssetManager._convert(surface), suits, values, len(backs))
+
+    @classmethod
+    def load(cls, path, suits, values, back_count, assets=None):
+        # Load a saved atlas.  The suits, values and back count must match the ones it was built with.
+        if assets is None:
+            assets = ASSETS
+        return cls(assets.load(path), suits, values, back_count)
+
+    @classmethod
+    def load_or_build(cls, path, fronts, backs, assets=None):
+        # Use the atlas saved at path if there is one, otherwise build it from the separate images and save it there.
+        # Pass a path in a writable cache directory, not in the package.  A path of None builds in memory only.
+        suits = set(suit for suit, value in fronts)
+        values = set(value for suit, value in fronts)
+        if path is not None and os.path.isfile(path):
+            return cls.load(path, suits, values, len(backs), assets)
+
+        atlas = cls.build(fronts, backs)
+        if path is not None:
+            try:
+                directory = os.path.dirname(path)
+                if directory and not os.path.isdir(directory):
+                    os.makedirs(directory)
+                atlas.save(path)
+            except (pygame.error, IOError, OSError):
+                pass  # Without a writable cache the atlas is just built every time
+        return atlas
+
+    def save(self, path):
+        pygame.image.save(self.surface, path)
@@ -0,0 +1,88 @@
+import collections
+
+# Only RotationCache needs pygame.  SurfaceCache and TextCache work with anything shaped like a surface or a font.
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+
+# Least recently used cache of surfaces, bounded by the memory their pixels use.  Meant to be shared by every UI
+# Element that draws the same art, so a key should describe what was drawn rather than who drew it.
+class SurfaceCache(object):
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.maxBytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = collections.OrderedDict()
+
+    @staticmethod
+    def surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def get(self, key):
+        surface = self._surfaces.pop(key, None)
+        if surface is None:
+            self.misses += 1
+            return None
+
+        # Move to the most recently used end
+        self._surfaces[key] = surface
+        self.hits += 1
+        return surface
+
+    def put(self, key, surface):
+        old = self._surfaces.pop(key, None)
+        if old is not None:
+            self.bytes -= self.surface_bytes(old)
+
+        self._surfaces[key] = surface
+        self.bytes += self.surface_bytes(surface)
+
+        # Evict least recently used surfaces until under the cap, always keeping the newest one
+        while self.bytes > self.maxBytes and len(self._surfaces) > 1:
+            evicted_key, evicted = self._surfaces.popitem(last=False)
+            self.bytes -= self.surface_bytes(evicted)
+
+    def clear(self):
+        self._surfaces.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def __contains__(self, key):
+        return key in self._surfaces
+
+
+# Rotated copies of card art keyed by (art, angle).  Cards showing the same back share one rotated surface.
+class RotationCache(SurfaceCache):
+    def rotate(self, surface, angle):
+        angle %= 360
+        if angle == 0:
+            return surface
+
+        key = (surface, angle)
+        rotated = self.get(key)
+        if rotated is None:
+            rotated = pygame.transform.rotate(surface, angle)
+            self.put(key, rotated)
+        return rotated
+
+
+# Rendered text keyed by everything that affects its pixels.  The surfaces are shared, so only ever blit from them.
+class TextCache(SurfaceCache):
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        SurfaceCache.__init__(self, max_bytes)
+
+    def render(self, font, text, color, background=None, antialias=True):
+        key = (font, text, antialias, tuple(color), None if background is None else tuple(background))
+        surface = self.get(key)
+        if surface is None:
+            if background is None:
+                surface = font.render(text, antialias, color)
+            else:
+                surface = font.render(text, antialias, color, background)
+            self.put(key, surface)
+        return surface
@@ -0,0 +1,62 @@
+import pygame
+import UI
+
+# Colors of the overlay text and its translucent background
+OVERLAY_TEXT = (255, 255, 255, 255)
+OVERLAY_BACKGROUND = (0, 0, 0, 160)
+
+
+# Shows the slowest timings of a Profiler on screen, one UI Text per line, refreshed every few frames.  The profiler
+# only holds a weak reference to the overlay, so keep the overlay around for as long as it should be shown.
+class ProfilerOverlay(object):
+    def __init__(self, engine, profiler, x=5, y=5, width=390, lines=8, interval=30, z=1000, font=None):
+        self._engine = engine
+        self._profiler = profiler
+        self._interval = interval
+        self._visible = True
+
+        if font is None:
+            font = UI.UI_FONT
+        line_height = font.get_linesize() + 2
+
+        # Start every line blank.  A Text with no text shows a placeholder, so blank lines are a space.
+        self._lines = []
+        for line in range(lines):
+            rect = pygame.Rect(x, y + line * line_height, width, line_height)
+            self._lines.append(UI.Text(engine, rect=rect, z=z, text=' ', background_color=OVERLAY_BACKGROUND,
+                                       text_color=OVERLAY_TEXT, font=font))
+
+        profiler.frameEnded += self._on_frame_ended
+
+    def _on_frame_ended(self, profiler):
+        if self._visible and profiler.frames % self._interval == 0:
+            self.refresh()
+
+    def refresh(self):
+        report = self._profiler.report(limit=len(self._lines))
+        report += [' '] * (len(self._lines) - len(report))
+        for text, line in zip(self._lines, report):
+            # Setting the same text again is cheap, as the Text only redraws when its text changes
+            text.text = line
+
+    def close(self):
+        # Stop refreshing and take the lines off the screen
+        self._profiler.frameEnded -= self._on_frame_ended
+        remove = getattr(self._engine, 'remove_ui_element', None)
+        for text in self._lines:
+            text.visible = False
+            if remove is not None:
+                remove(text)
+        self._lines = []
+
+    def _prop_get_visible(self):
+        return self._visible
+
+    def _prop_set_visible(self, visible):
+        self._visible = visible
+        for text in self._lines:
+            text.visible = visible
+        if visible:
+            self.refresh()
+
+    visible = property(_prop_get_visible, _prop_set_visible)
@@ -1,6 +1,8 @@
 __author__ = 'Evan'
 import pygame
-import Hitbox
+import Assets
+import Cache
+from engine import hitbox as Hitbox
 
 pygame.font.init()
 UI_FONT = gentiumBookBasic = pygame.font.Font(pygame.font.match_font('gentiumbookbasic'), 14)
@@ -14,6 +16,10 @@ WHITE = (255, 255, 255, 255)
 TRANSPARENT = (255, 255, 255, 0)
 GREEN = (24, 119, 24, 255)
 
+# Rotated card art shared by every card, and rendered text shared by every text element
+ROTATION_CACHE = Cache.RotationCache()
+TEXT_CACHE = Cache.TextCache()
+
 
 # InheritanceError is used to ensure certain class methods are inherited.  Used for UIElement.
 class InheritanceError(Exception):
@@ -27,7 +33,15 @@ class InheritanceError(Exception):
 # Base UI Element to be used with an engine.  This should be inherited by every UI Element, as the engine
 # will expect to use the methods below.
 class UIElement(object):
+    # Engine the element is registered with.  Set last in __init__ so the engine only sees complete elements.
+    _engine = None
+
+    # Event types the engine delivers to handle_event.  Mouse events only come while over the element or while
+    # the element is pressed, hovered or focused, and keyboard events only while it is focused.
+    eventTypes = ()
+
     def __init__(self, engine):
+        self._engine = engine
         if engine is not None:
             engine.add_ui_element(self)
         return
@@ -51,6 +65,15 @@ class UIElement(object):
     def collide(self, x, y):
         raise InheritanceError('Function not defined')
 
+    # Used to get the axis-aligned bounds (left, top, right, bottom) of the UI Element.
+    def get_bounds(self):
+        raise InheritanceError('Function not defined')
+
+    # Used to tell the engine the UI Element may have moved or changed.  Called at the end of every _update.
+    def _invalidate(self):
+        if self._engine is not None:
+            self._engine.update_ui_element(self)
+
 # The following classes are used as a base for common UI Elements.  The two ways of handling the pygame events are
 # to use a callback function which will be triggered internally in reaction to pygame events and to use inheritance
 # to override several methods in the UI Element class.  As both classes share several commonalities, a base class
@@ -58,24 +81,25 @@ class UIElement(object):
 
 
 class _BaseCard(UIElement):
+    eventTypes = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
     def __init__(self, engine, suit, value, front_art, back_art,
                  x=0, y=0, z=0, angle_radians=0,
                  owner=None, visible=True, front_view=True):
 
-        UIElement.__init__(self, engine)
-
         # Set suit and value of card as a string
         self.suit = suit
         self.value = value
 
         # Art for the front and back of the card.  Can load image if input is string indication the image location.
+        # Images are shared through the asset manager, so each file is only loaded once.
         if isinstance(front_art, basestring):
-            self._surfaceFront = pygame.image.load(front_art)
+            self._surfaceFront = Assets.ASSETS.load(front_art)
         else:
             self._surfaceFront = front_art
 
-        if isinstance(front_art, basestring):
-            self._surfaceBack = pygame.image.load(back_art)
+        if isinstance(back_art, basestring):
+            self._surfaceBack = Assets.ASSETS.load(back_art)
         else:
             self._surfaceBack = back_art
 
@@ -101,29 +125,29 @@ class _BaseCard(UIElement):
 
         self._update()
 
-    def render(self, surface):
-        # As card may be rotated, the x and y positions do not correlate to the top left corner of the card.
-        dx = 0
-        dy = 0
-
-        # Point 0 is reference used for hitbox, so need to offset the display to match the hitbox
-        for point in self._hitbox.rotatedPoints:
-            if (point.x - self._x) < dx:
-                dx = point.x - self._x
-            if (point.y - self._y) < dy:
-                dy = point.y - self._y
+        # Register with the engine last, once the element is fully set up
+        UIElement.__init__(self, engine)
 
-        # Display front or back of the card
+    def render(self, surface):
+        # Display front or back of the card.  Rotations are cached, so this is a single blit.
         if self._visible:
             if self._frontView:
-                rotated_image = pygame.transform.rotate(self._surfaceFront, self._angle)
+                rotated_image = ROTATION_CACHE.rotate(self._surfaceFront, self._angle)
             else:
-                rotated_image = pygame.transform.rotate(self._surfaceBack, self._angle)
+                rotated_image = ROTATION_CACHE.rotate(self._surfaceBack, self._angle)
 
-            surface.blit(rotated_image, (self._x + dx, self._y + dy, self._angle))
+            surface.blit(rotated_image, self._blitPosition)
 
     def _update(self):
-        pass
+        # Keep the hitbox on top of the card
+        self._hitbox.update(self._x, self._y, angle=self._angle)
+
+        # As card may be rotated, the x and y positions do not correlate to the top left corner of the card.
+        # The rotated image starts at the top left of the rotated hitbox.
+        left, top, right, bottom = self._hitbox.get_bounds()
+        self._blitPosition = (left, top)
+
+        self._invalidate()
 
     def set_location(self, x, y, z):
         self._x = x
@@ -137,6 +161,18 @@ class _BaseCard(UIElement):
     def collide(self, x, y):
         return self._hitbox.collide(x, y)
 
+    def get_bounds(self):
+        return self._hitbox.get_bounds()
+
+    def _prop_get_z(self):
+        return self._z
+
+    def _prop_set_z(self, new_z):
+        self._z = new_z
+        self._update()
+
+    z = property(_prop_get_z, _prop_set_z)
+
 
 class _BaseHand(UIElement):
     def __init__(self, engine):
@@ -157,6 +193,9 @@ class _BaseHand(UIElement):
     def collide(self, x, y):
         pass
 
+    def get_bounds(self):
+        return 0, 0, 0, 0
+
     def add_card(self, card):
         pass
 
@@ -168,8 +207,6 @@ class _BaseText(UIElement):
     def __init__(self, engine, rect=None, z=0, text='',
                  background_color=TRANSPARENT, text_color=BLACK, font=None):
 
-        UIElement.__init__(self, engine)
-
         # Set location for text
         if rect is None:
             self._rect = pygame.Rect(0, 0, 60, 30)
@@ -193,28 +230,40 @@ class _BaseText(UIElement):
 
         self._visible = True
 
-        # Create standard surface for text
+        # Create standard surface for text.  _drawnState records what it shows, so it is only redrawn on change.
         self._surfaceNormal = pygame.Surface(self._rect.size).convert_alpha()
+        self._drawnState = None
         self._update()
 
+        # Register with the engine last, once the element is fully set up
+        UIElement.__init__(self, engine)
+
     def render(self, surface):
         if self._visible:
             surface.blit(self._surfaceNormal, self._rect)
 
     def _update(self):
-        # Make syntax pretty
-        w = self._rect.width
-        h = self._rect.height
+        # Moving the text or changing its visibility or z does not change what it looks like
+        state = (self._rect.size, self._text, self._font, self._textColor, self._bgColor)
+        if state != self._drawnState:
+            self._drawnState = state
 
-        # Update surface to fit size of rect
-        self._surfaceNormal = pygame.Surface(self._rect.size).convert_alpha()
-        self._surfaceNormal.fill(self._bgColor)
+            # Make syntax pretty
+            w = self._rect.width
+            h = self._rect.height
+
+            # Update surface to fit size of rect
+            if self._surfaceNormal.get_size() != self._rect.size:
+                self._surfaceNormal = pygame.Surface(self._rect.size).convert_alpha()
+            self._surfaceNormal.fill(self._bgColor)
+
+            # Draw text on surface
+            text_surf = TEXT_CACHE.render(self._font, self._text, self._textColor)
+            text_rect = text_surf.get_rect()
+            text_rect.center = int(w / 2), int(h / 2)
+            self._surfaceNormal.blit(text_surf, text_rect)
 
-        # Draw text on surface
-        text_surf = self.font.render(self._text, True, self._textColor)
-        text_rect = text_surf.get_rect()
-        text_rect.center = int(w / 2), int(h / 2)
-        self._surfaceNormal.blit(text_surf, text_rect)
+        self._invalidate()
 
     def set_location(self, x, y, z):
         self._rect.topleft = (x, y)
@@ -224,6 +273,12 @@ class _BaseText(UIElement):
     def handle_event(self, event):
         pass
 
+    def collide(self, x, y):
+        return self._rect.collidepoint(x, y)
+
+    def get_bounds(self):
+        return self._rect.left, self._rect.top, self._rect.right, self._rect.bottom
+
     def _prop_get_text(self):
         return self._text
 
@@ -273,7 +328,7 @@ class _BaseText(UIElement):
         return
 
     def _prop_get_z(self):
-        return self.z
+        return self._z
 
     def _prop_set_z(self, new_z):
         self._z = new_z
@@ -290,11 +345,11 @@ class _BaseText(UIElement):
 
 
 class _BaseTextBox(UIElement):
+    eventTypes = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN, pygame.KEYUP)
+
     def __init__(self, engine, rect=None, z=0, background_text=None, background_color=WHITE,
                  input_text_color=BLACK, background_text_color=LIGHTGRAY, font=None):
 
-        UIElement.__init__(self, engine)
-
         # Set location of TextBox
         if rect is None:
             self._rect = pygame.Rect(0, 0, 60, 30)
@@ -329,12 +384,20 @@ class _BaseTextBox(UIElement):
         self._lastMouseDownOverTextBox = False
         self._keydown = False
 
-        # Create Surface
+        # Create Surface.  The frame is the empty box the input text is drawn onto.
         self._surfaceNormal = pygame.Surface(self._rect.size)
         self._surfaceInput = pygame.Surface(self._rect.size)
+        self._surfaceFrame = pygame.Surface(self._rect.size)
+
+        # What the surfaces currently show, so they are only redrawn on change
+        self._frameState = None
+        self._drawnInputText = None
 
         self._update()
 
+        # Register with the engine last, once the element is fully set up
+        UIElement.__init__(self, engine)
+
     def render(self, surface):
         if self._visible:
             if self._inputText is not '':
@@ -343,50 +406,76 @@ class _BaseTextBox(UIElement):
                 surface.blit(self._surfaceNormal, self._rect)
 
     def _update(self):
+        # The frame and background text only change with size, colors, background text or font
+        state = (self._rect.size, self._bgColor, self._bgText, self._bgTextColor, self._inputTextColor, self._font)
+        if state != self._frameState:
+            self._frameState = state
+            self._update_frame()
+            self._drawnInputText = None
+
+        self._update_input_text()
+        self._invalidate()
+
+    def _update_frame(self):
         # Syntactic sugar for height and width for text
         w = self._rect.width
         h = self._rect.height
 
         # Start with a clean slate for the surfaces with background color
         self._surfaceNormal = pygame.Surface(self._rect.size)
+        self._surfaceFrame = pygame.Surface(self._rect.size)
         self._surfaceInput = pygame.Surface(self._rect.size)
 
         self._surfaceNormal.fill(self._bgColor)
-        self._surfaceInput.fill(self._bgColor)
+        self._surfaceFrame.fill(self._bgColor)
 
         # Create background text
-        bg_text_surf = self._font.render(self._bgText, True, self._bgTextColor, self._bgColor)
+        bg_text_surf = TEXT_CACHE.render(self._font, self._bgText, self._bgTextColor, self._bgColor)
         bg_text_rect = bg_text_surf.get_rect()
         bg_text_rect.left = 5
         bg_text_rect.centery = int(h / 2)
         self._surfaceNormal.blit(bg_text_surf, bg_text_rect)
 
-        # Create input text
+        # Draw the bevelled border on the normal surface, used when not selected and no input, and on the frame
+        # for the input surface, used for when selected or there is input
+        for frame in (self._surfaceNormal, self._surfaceFrame):
+            pygame.draw.rect(frame, BLACK, pygame.Rect((0, 0, w, h)), 1)
+            pygame.draw.line(frame, WHITE, (1, 1), (w - 2, 1))
+            pygame.draw.line(frame, WHITE, (1, 1), (1, h - 2))
+            pygame.draw.line(frame, DARKGRAY, (1, h - 1), (w - 1, h - 1))
+            pygame.draw.line(frame, DARKGRAY, (w - 1, 1), (w - 1, h - 1))
+            pygame.draw.line(frame, GRAY, (1, h - 2), (w - 2, h - 2))
+            pygame.draw.line(frame, GRAY, (w - 2, 1), (w - 2, h - 2))
+
+    def _update_input_text(self):
         self._listInputText = [y for y in self._listInputText if y != '']
         self._inputText = str(''.join(self._listInputText))
-        input_text_surf = self._font.render(self._inputText, True, self._inputTextColor, self._bgColor)
+
+        drawn = self._drawnInputText
+        if self._inputText == drawn:
+            return
+
+        h = self._rect.height
+        # Text stays inside the border
+        self._surfaceInput.set_clip(pygame.Rect(2, 2, self._rect.width - 4, h - 4))
+
+        if drawn and self._inputText.startswith(drawn):
+            # Typing appends to the text already drawn, so only the new characters are rendered
+            new_text = self._inputText[len(drawn):]
+            left = 5 + self._font.size(drawn)[0]
+        else:
+            self._surfaceInput.blit(self._surfaceFrame, (0, 0))
+            new_text = self._inputText
+            left = 5
+
+        input_text_surf = TEXT_CACHE.render(self._font, new_text, self._inputTextColor, self._bgColor)
         input_text_rect = input_text_surf.get_rect()
-        input_text_rect.left = 5
+        input_text_rect.left = left
         input_text_rect.centery = int(h / 2)
         self._surfaceInput.blit(input_text_surf, input_text_rect)
 
-        # Update normal surface used not selected and no input
-        pygame.draw.rect(self._surfaceNormal, BLACK, pygame.Rect((0, 0, w, h)), 1)
-        pygame.draw.line(self._surfaceNormal, WHITE, (1, 1), (w - 2, 1))
-        pygame.draw.line(self._surfaceNormal, WHITE, (1, 1), (1, h - 2))
-        pygame.draw.line(self._surfaceNormal, DARKGRAY, (1, h - 1), (w - 1, h - 1))
-        pygame.draw.line(self._surfaceNormal, DARKGRAY, (w - 1, 1), (w - 1, h - 1))
-        pygame.draw.line(self._surfaceNormal, GRAY, (1, h - 2), (w - 2, h - 2))
-        pygame.draw.line(self._surfaceNormal, GRAY, (w - 2, 1), (w - 2, h - 2))
-
-        # Update input surface used for when selected or there is input
-        pygame.draw.rect(self._surfaceInput, BLACK, pygame.Rect((0, 0, w, h)), 1)
-        pygame.draw.line(self._surfaceInput, WHITE, (1, 1), (w - 2, 1))
-        pygame.draw.line(self._surfaceInput, WHITE, (1, 1), (1, h - 2))
-        pygame.draw.line(self._surfaceInput, DARKGRAY, (1, h - 1), (w - 1, h - 1))
-        pygame.draw.line(self._surfaceInput, DARKGRAY, (w - 1, 1), (w - 1, h - 1))
-        pygame.draw.line(self._surfaceNormal, GRAY, (1, h - 2), (w - 2, h - 2))
-        pygame.draw.line(self._surfaceNormal, GRAY, (w - 2, 1), (w - 2, h - 2))
+        self._surfaceInput.set_clip(None)
+        self._drawnInputText = self._inputText
 
     def set_location(self, x, y, z):
         self._rect.topleft = (x, y)
@@ -396,6 +485,12 @@ class _BaseTextBox(UIElement):
     def handle_event(self, event):
         pass
 
+    def collide(self, x, y):
+        return self._rect.collidepoint(x, y)
+
+    def get_bounds(self):
+        return self._rect.left, self._rect.top, self._rect.right, self._rect.bottom
+
     def _prop_set_rect(self, new_rect):
         self._rect = pygame.Rect(new_rect)
         self._update()
@@ -472,11 +567,11 @@ class _BaseTextBox(UIElement):
 
 
 class _BaseCheckBox(UIElement):
+    eventTypes = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
     def __init__(self, engine, rect=None, z=0, background_color=WHITE):
         # Set position of element
 
-        UIElement.__init__(self, engine)
-
         if rect is None:
             self._rect = pygame.Rect(0, 0, 14, 14)
         else:
@@ -496,6 +591,9 @@ class _BaseCheckBox(UIElement):
 
         self._update()
 
+        # Register with the engine last, once the element is fully set up
+        UIElement.__init__(self, engine)
+
     def render(self, surface):
         if self._visible:
             if self._isChecked:
@@ -524,6 +622,8 @@ class _BaseCheckBox(UIElement):
         pygame.draw.line(self._surfaceChecked, GREEN, (3, int(h / 2)), (int(w / 2), h - 5), 3)
         pygame.draw.line(self._surfaceChecked, GREEN, (int(w / 2), h - 5), (w - 5, 4), 3)
 
+        self._invalidate()
+
     def set_location(self, x, y, z):
         self._rect.topleft = (x, y)
         self._z = z
@@ -532,6 +632,12 @@ class _BaseCheckBox(UIElement):
     def handle_event(self, event):
         pass
 
+    def collide(self, x, y):
+        return self._rect.collidepoint(x, y)
+
+    def get_bounds(self):
+        return self._rect.left, self._rect.top, self._rect.right, self._rect.bottom
+
     def _prop_set_rect(self, new_rect):
         self._rect = pygame.Rect(new_rect)
         self._update()
@@ -575,11 +681,11 @@ class _BaseCheckBox(UIElement):
 
 
 class _BaseButton(UIElement):
+    eventTypes = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
     def __init__(self, engine, rect=None, z=0, text='',
                  background_color=LIGHTGRAY, foreground_color=BLACK, font=None):
 
-        UIElement.__init__(self, engine)
-
         # set initial size and location
         if rect is None:
             self._rect = pygame.Rect(0, 0, 30, 60)
@@ -598,11 +704,11 @@ class _BaseButton(UIElement):
         else:
             self._font = font
 
-        # create blank surfaces to be created in update
-        pygame.Surface((200, 300))
+        # create blank surfaces to be created in update, and remember what they show so they are only redrawn on change
         self._surfaceNormal = pygame.Surface(self._rect.size)
         self._surfaceDown = pygame.Surface(self._rect.size)
         self._surfaceHighlight = pygame.Surface(self._rect.size)
+        self._drawnState = None
 
         # tracks the state of the button
         self._buttonDown = False  # is the button currently pushed down?
@@ -613,6 +719,9 @@ class _BaseButton(UIElement):
         # update graphics for the button
         self._update()
 
+        # Register with the engine last, once the element is fully set up
+        UIElement.__init__(self, engine)
+
     def render(self, surface):
         if self._visible:
             if self._buttonDown:
@@ -623,6 +732,14 @@ class _BaseButton(UIElement):
                 surface.blit(self._surfaceNormal, self._rect)
 
     def _update(self):
+        # Moving the button or changing its visibility or z does not change what it looks like
+        state = (self._rect.size, self._text, self._font, self._fgColor, self._bgColor)
+        if state != self._drawnState:
+            self._drawnState = state
+            self._update_surfaces()
+        self._invalidate()
+
+    def _update_surfaces(self):
         self._surfaceNormal = pygame.Surface(self._rect.size)
         self._surfaceDown = pygame.Surface(self._rect.size)
         self._surfaceHighlight = pygame.Surface(self._rect.size)
@@ -637,7 +754,7 @@ class _BaseButton(UIElement):
         self._surfaceHighlight.fill(self._bgColor)
 
         # draw caption text for all buttons
-        caption_surf = self._font.render(self._text, True, self._fgColor, self._bgColor)
+        caption_surf = TEXT_CACHE.render(self._font, self._text, self._fgColor, self._bgColor)
         caption_rect = caption_surf.get_rect()
         caption_rect.center = int(w / 2), int(h / 2)
         self._surfaceNormal.blit(caption_surf, caption_rect)
@@ -670,6 +787,12 @@ class _BaseButton(UIElement):
         self._update()
         return
 
+    def collide(self, x, y):
+        return self._rect.collidepoint(x, y)
+
+    def get_bounds(self):
+        return self._rect.left, self._rect.top, self._rect.right, self._rect.bottom
+
     def get_text(self):
         return self._text
 
@@ -708,7 +831,7 @@ class _BaseButton(UIElement):
         return self._visible
 
     def _prop_set_font(self, new_font):
-        self._visible = new_font
+        self._font = new_font
         self._update()
 
     def _prop_get_font(self):
@@ -766,7 +889,7 @@ class Card(_BaseCard):
         if event.type not in (pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN) or not self._visible:
             return
 
-        if self._hitbox.collide(event.pos.x, event.pos.y):
+        if self._hitbox.collide(event.pos[0], event.pos[1]):
             # clicking and releasing inside checkbox toggles check
             if event.type == pygame.MOUSEBUTTONDOWN:
                 self._lastMouseDownOverCard = True
@@ -778,8 +901,6 @@ class Card(_BaseCard):
         else:
             self._lastMouseDownOverCard = False
 
-        self._update()
-
 
 class Hand(_BaseHand):
     def __init__(self, engine, callback_function=None):
@@ -903,6 +1024,9 @@ class CheckBox(_BaseCheckBox):
         if event.type not in (pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN) or not self._visible:
             return
 
+        # The checkbox is redrawn only if it was checked or unchecked
+        was_checked = self._isChecked
+
         if self._rect.collidepoint(event.pos):
             # clicking and releasing inside checkbox toggles check
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -920,7 +1044,8 @@ class CheckBox(_BaseCheckBox):
         else:
             self._lastMouseDownOverCheckBox = False
 
-        self._update()
+        if was_checked != self._isChecked:
+            self._update()
 
     def _prop_set_callback_function(self, new_callback_function):
         self._callbackFunction = new_callback_function
@@ -956,6 +1081,9 @@ class Button(_BaseButton):
             # The button only cares bout mouse-related events (or no events, if it is invisible)
             return
 
+        # The button is redrawn only if the surface it shows changes
+        last_state = (self._mouseOverButton, self._buttonDown)
+
         if not self._mouseOverButton and self._rect.collidepoint(event.pos):
             # if mouse has entered the button:
             self._mouseOverButton = True
@@ -988,6 +1116,9 @@ class Button(_BaseButton):
                 if self._callbackFunction is not None:
                     self._callbackFunction(self)
 
+        if last_state != (self._mouseOverButton, self._buttonDown):
+            self._invalidate()
+
     def _prop_set_callback_function(self, new_callback_function):
         self._callbackFunction = new_callback_function
         self._update()
@@ -1112,6 +1243,9 @@ class PyCheckBox(_BaseCheckBox):
         if event.type not in (pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN) or not self._visible:
             return
 
+        # The checkbox is redrawn only if it was checked or unchecked
+        was_checked = self._isChecked
+
         if self._rect.collidepoint(event.pos):
             # clicking and releasing inside checkbox toggles check
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -1125,7 +1259,8 @@ class PyCheckBox(_BaseCheckBox):
         else:
             self._lastMouseDownOverCheckBox = False
 
-        self._update()
+        if was_checked != self._isChecked:
+            self._update()
 
     def mouse_click(self, event):
         pass
@@ -1162,6 +1297,9 @@ class PyButton(_BaseButton):
             # The button only cares bout mouse-related events (or no events, if it is invisible)
             return
 
+        # The button is redrawn only if the surface it shows changes
+        last_state = (self._mouseOverButton, self._buttonDown)
+
         has_exited = False
         if not self._mouseOverButton and self.rect.collidepoint(event.pos):
             # if mouse has entered the button:
@@ -1203,6 +1341,9 @@ class PyButton(_BaseButton):
         if has_exited:
             self.mouse_exit(event)
 
+        if last_state != (self._mouseOverButton, self._buttonDown):
+            self._invalidate()
+
     # Following functions are expected to be overwritten
     def mouse_click(self, event):
         pass
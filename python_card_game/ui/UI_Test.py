@@ -2,6 +2,9 @@ __author__ = 'Evan'
 import UI
 import sys
 import pygame
+from engine.dirty import DirtyRegions
+from engine.loop import GameLoop
+from engine.router import EventRouter
 
 
 def display_text_input(textbox_object):
@@ -52,11 +55,7 @@ def test():
     text3.text = 'This was an update counter'
     text4.text = 'This was blank'
 
-    while True:
-        my_test_engine.update()
-        my_test_engine.render()
-
-        pygame.time.delay(20)
+    my_test_engine.run()
 
 
 class TestEngine:
@@ -76,24 +75,69 @@ class TestEngine:
         self.screenUIElements = []
         pygame.key.set_repeat(500, 50)
 
+        # Bounds of each element as last drawn, and the parts of the screen to redraw
+        self.elementBounds = {}
+        self.dirtyRegions = DirtyRegions(width, height)
+
+        # Hands each event only to the elements interested in it
+        self.eventRouter = EventRouter(pygame)
+
+        # Event taken off the queue while waiting for one, handled by the next update
+        self.pendingEvents = []
+
+    def run(self, fps=50):
+        # Nothing in the test animates, so the loop sleeps until there is an event or something to redraw
+        GameLoop(fps).run(self.update, self.render, idle=self.is_idle, wait=self.wait_for_event)
+
+    def is_idle(self):
+        return not self.pendingEvents and not self.dirtyRegions
+
+    def wait_for_event(self):
+        self.pendingEvents.append(pygame.event.wait())
+
     def update(self):
-        for event in pygame.event.get():
+        events = self.pendingEvents + pygame.event.get()
+        del self.pendingEvents[:]
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
                 return
-            for element in self.screenUIElements:
-                element.handle_event(event)
+            if event.type == pygame.VIDEOEXPOSE:
+                self.dirtyRegions.invalidate_all()
+            self.eventRouter.dispatch(event)
 
     def render(self):
-        self.screen.blit(self.background, (0, 0))
-        for UIElement in self.screenUIElements:
-            UIElement.render(self.screen)
-
-        pygame.display.flip()
+        # Only redraw the dirty parts of the screen
+        regions = self.dirtyRegions.pop()
+        if not regions:
+            return
+
+        for region in regions:
+            x, y, w, h = region
+            self.screen.set_clip(region)
+            self.screen.blit(self.background, region, region)
+            for UIElement in self.screenUIElements:
+                left, top, right, bottom = self.elementBounds[UIElement]
+                if left <= x + w and x <= right and top <= y + h and y <= bottom:
+                    UIElement.render(self.screen)
+        self.screen.set_clip(None)
+
+        pygame.display.update(regions)
 
     def add_ui_element(self, ui_element):
         self.screenUIElements.append(ui_element)
+        self.elementBounds[ui_element] = ui_element.get_bounds()
+        self.dirtyRegions.add(self.elementBounds[ui_element])
+        self.eventRouter.register(ui_element, ui_element.eventTypes)
+
+    def update_ui_element(self, ui_element):
+        # Redraw where the element was and where it is now
+        if ui_element in self.elementBounds:
+            self.dirtyRegions.add(self.elementBounds[ui_element])
+            self.elementBounds[ui_element] = ui_element.get_bounds()
+            self.dirtyRegions.add(self.elementBounds[ui_element])
+            self.eventRouter.update(ui_element)
 
 
 # Functions for testing each UI Element to ensure element works properly
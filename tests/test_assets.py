@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_assets
+----------------------------------
+
+Tests for loading shared card art with `AssetManager` in `python_card_game/ui/Assets.py`.
+
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python_card_game', 'ui'))
+
+# Run without a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+try:
+  import pygame
+except ImportError:
+  pygame = None
+else:
+  import Assets
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestAssetManager(unittest.TestCase):
+
+  def setUp(self):
+    pygame.display.quit()
+    self.directory = tempfile.mkdtemp()
+    self.paths = []
+    for index in range(3):
+      path = os.path.join(self.directory, 'card%d.png' % index)
+      pygame.image.save(pygame.Surface((8 + index, 10)), path)
+      self.paths.append(path)
+
+    # Count every decode, slowly enough for a load to overlap a preload of the same image
+    self.decodes = []
+    self.pygameLoad = pygame.image.load
+
+    def load(path):
+      self.decodes.append(path)
+      time.sleep(0.05)
+      return self.pygameLoad(path)
+    pygame.image.load = load
+    self.assets = Assets.AssetManager()
+
+  def tearDown(self):
+    pygame.image.load = self.pygameLoad
+    pygame.display.quit()
+    shutil.rmtree(self.directory)
+
+  def test_dedup(self):
+    image = self.assets.load(self.paths[0])
+    relative = os.path.relpath(self.paths[0])
+    self.assertIs(self.assets.load(relative), image)
+    self.assertEqual(len(self.decodes), 1)
+    self.assertEqual(len(self.assets), 1)
+    self.assertEqual(self.assets.memory_usage(), image.get_width() * image.get_height() * image.get_bytesize())
+
+  def test_preload(self):
+    thread = self.assets.preload(self.paths)
+    self.assertIsNotNone(thread)
+    self.assets.wait()
+    self.assertTrue(all(self.assets.is_loaded(path) for path in self.paths))
+    for path in self.paths:
+      self.assets.load(path)
+    self.assertEqual(sorted(self.decodes), sorted(self.paths))
+    self.assertIsNone(self.assets.preload(self.paths, background=False))
+    self.assertEqual(len(self.decodes), 3)
+
+  def test_preload_unreadable(self):
+    # A file that fails to decode is skipped, the rest are still preloaded, and loading it raises on this thread
+    broken = os.path.join(self.directory, 'broken.png')
+    with open(broken, 'w') as image:
+      image.write('not an image')
+    self.assets.preload([broken] + self.paths)
+    self.assets.wait()
+    self.assertTrue(all(self.assets.is_loaded(path) for path in self.paths))
+    self.assertFalse(self.assets.is_loaded(broken))
+    self.assertRaises(pygame.error, self.assets.load, broken)
+    self.assertEqual(self.decodes.count(broken), 2)
+
+  def test_load_during_preload(self):
+    # A load of an image the preload thread is decoding waits for it instead of decoding it again
+    self.assets.preload(self.paths[:1])
+    images = []
+    loaders = [threading.Thread(target=lambda: images.append(self.assets.load(self.paths[0]))) for i in range(3)]
+    for loader in loaders:
+      loader.start()
+    for loader in loaders:
+      loader.join()
+    self.assets.wait()
+    self.assertEqual(self.decodes, self.paths[:1])
+    self.assertTrue(images[0] is images[1] is images[2])
+
+  def test_headless_then_display(self):
+    raw = self.assets.load(self.paths[0])
+    self.assertIs(self.assets.load(self.paths[0]), raw)
+
+    # Once there is a display, the image is converted on its next load and stays converted
+    display = pygame.display.set_mode((16, 16))
+    converted = self.assets.load(self.paths[0])
+    self.assertIsNot(converted, raw)
+    self.assertEqual(converted.get_bitsize(), display.get_bitsize())
+    self.assertIs(self.assets.load(self.paths[0]), converted)
+    self.assertEqual(len(self.decodes), 1)
+    self.assertEqual(len(self.assets), 1)
+
+  def test_clear(self):
+    self.assets.load(self.paths[0])
+    self.assets.clear()
+    self.assertFalse(self.assets.is_loaded(self.paths[0]))
+    self.assets.load(self.paths[0])
+    self.assertEqual(len(self.decodes), 2)
+
+
+if __name__ == '__main__':
+  sys.exit(unittest.main())
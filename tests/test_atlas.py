@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_atlas
+----------------------------------
+
+Tests for packing and looking up card art with `CardAtlas` in `python_card_game/ui/Assets.py`.
+
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python_card_game', 'ui'))
+
+# Run without a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+try:
+  import pygame
+except ImportError:
+  pygame = None
+else:
+  import Assets
+
+SUITS = (1, 2)
+VALUES = (1, 2, 3)
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestCardAtlas(unittest.TestCase):
+
+  def setUp(self):
+    pygame.display.quit()
+    self.directory = tempfile.mkdtemp()
+
+    # Every card a different solid color, so its cell in the atlas can be told apart
+    self.colors = {}
+    self.fronts = {}
+    for suit in SUITS:
+      for value in VALUES:
+        color = (suit * 60, value * 60, 30, 255)
+        self.colors[(suit, value)] = color
+        self.fronts[(suit, value)] = self.image('front %d %d.png' % (suit, value), color)
+    self.backs = [self.image('back %d.png' % number, (10 * number, 0, 200, 255)) for number in (1, 2)]
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def image(self, name, color, size=(12, 16)):
+    surface = pygame.Surface(size, pygame.SRCALPHA, 32)
+    surface.fill(color)
+    path = os.path.join(self.directory, name)
+    pygame.image.save(surface, path)
+    return path
+
+  def test_packing(self):
+    atlas = Assets.CardAtlas.build(self.fronts, self.backs)
+    # A row per suit plus one for the backs, a column per value
+    self.assertEqual(atlas.surface.get_size(), (3 * 12, 3 * 16))
+    self.assertEqual((atlas.cardWidth, atlas.cardHeight), (12, 16))
+    self.assertEqual(atlas.suits, list(SUITS))
+    self.assertEqual(atlas.values, list(VALUES))
+
+  def test_lookup(self):
+    atlas = Assets.CardAtlas.build(self.fronts, self.backs)
+    for card, color in self.colors.items():
+      front = atlas.front(*card)
+      self.assertEqual(front.get_size(), (12, 16))
+      self.assertEqual(tuple(front.get_at((6, 8))), color)
+      self.assertIs(front.get_parent(), atlas.surface)
+      self.assertIs(atlas.front(*card), front)
+    self.assertEqual(tuple(atlas.back(2).get_at((0, 0))), (20, 0, 200, 255))
+    self.assertEqual(tuple(atlas.back().get_at((0, 0))), (10, 0, 200, 255))
+    self.assertRaises(KeyError, atlas.front, 3, 1)
+
+  def test_load_or_build_caches(self):
+    path = os.path.join(self.directory, 'cache', 'atlas.png')
+    built = Assets.CardAtlas.load_or_build(path, self.fronts, self.backs, Assets.AssetManager())
+    self.assertTrue(os.path.isfile(path))
+    loaded = Assets.CardAtlas.load_or_build(path, self.fronts, self.backs, Assets.AssetManager())
+    self.assertIsNot(loaded.surface, built.surface)
+    for card, color in self.colors.items():
+      self.assertEqual(tuple(loaded.front(*card).get_at((6, 8))), color)
+
+  def test_build_in_memory(self):
+    before = set(os.listdir(self.directory))
+    atlas = Assets.CardAtlas.load_or_build(None, self.fronts, self.backs)
+    self.assertEqual(set(os.listdir(self.directory)), before)
+    self.assertEqual(tuple(atlas.front(2, 3).get_at((0, 0))), self.colors[(2, 3)])
+
+
+if __name__ == '__main__':
+  sys.exit(unittest.main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_bitboard
+----------------------------------
+
+Tests for bitboard hands in `python_card_game.engine.bitboard`.
+
+"""
+
+import unittest
+
+from python_card_game.engine import PlayingCard, bitboard, encoding
+
+
+class TestHand(unittest.TestCase):
+
+  def test_add_remove_contains(self):
+    hand = bitboard.Hand()
+    hand.add(5)
+    hand.add(51)
+    self.assertIn(5, hand)
+    self.assertIn(51, hand)
+    self.assertNotIn(6, hand)
+    self.assertEqual(len(hand), 2)
+
+    hand.remove(5)
+    self.assertNotIn(5, hand)
+    self.assertRaises(KeyError, hand.remove, 5)
+    hand.discard(5)
+    self.assertEqual(list(hand), [51])
+
+  def test_suits(self):
+    self.assertEqual(bitboard.SUIT_MASKS[1] | bitboard.SUIT_MASKS[2] |
+                     bitboard.SUIT_MASKS[3] | bitboard.SUIT_MASKS[4], bitboard.FULL_DECK)
+    hand = bitboard.Hand.from_cards([PlayingCard(4, 1), PlayingCard(4, 13), PlayingCard(1, 2)])
+    self.assertEqual(hand.count(), 3)
+    self.assertEqual(hand.count(4), 2)
+    self.assertEqual(hand.count(2), 0)
+    self.assertEqual(hand.suit(1), bitboard.bit(encoding.encode(1, 2)))
+
+  def test_cards_round_trip(self):
+    cards = [PlayingCard(1, 2), PlayingCard(3, 12), PlayingCard(4, 13)]
+    hand = bitboard.Hand.from_cards(cards)
+    self.assertEqual(hand.to_cards(), cards)
+    self.assertEqual(hand, bitboard.Hand(hand.mask))
+    self.assertEqual(bitboard.popcount(bitboard.FULL_DECK), 52)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
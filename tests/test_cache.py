@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_cache
+----------------------------------
+
+Tests for the shared surface caches in `python_card_game/ui/Cache.py`.
+
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python_card_game', 'ui'))
+
+import Cache
+
+
+class FakeSurface(object):
+  # Just enough of a pygame Surface for the caches: its size in bytes is width * height * bytesize.
+
+  def __init__(self, width, height=1, bytesize=1):
+    self.width = width
+    self.height = height
+    self.bytesize = bytesize
+
+  def get_width(self):
+    return self.width
+
+  def get_height(self):
+    return self.height
+
+  def get_bytesize(self):
+    return self.bytesize
+
+
+class FakeFont(object):
+  # Renders text to a FakeSurface as wide as the text, recording every render.
+
+  def __init__(self):
+    self.rendered = []
+
+  def render(self, text, antialias, color, background=None):
+    self.rendered.append((text, antialias, color, background))
+    return FakeSurface(len(text))
+
+
+class TestSurfaceCache(unittest.TestCase):
+
+  def test_insert_and_hit(self):
+    cache = Cache.SurfaceCache(max_bytes=100)
+    surface = FakeSurface(10, 2, 4)
+    self.assertIsNone(cache.get('a'))
+    cache.put('a', surface)
+    self.assertIs(cache.get('a'), surface)
+    self.assertIn('a', cache)
+    self.assertEqual((len(cache), cache.bytes, cache.hits, cache.misses), (1, 80, 1, 1))
+
+  def test_replace(self):
+    cache = Cache.SurfaceCache(max_bytes=100)
+    cache.put('a', FakeSurface(10))
+    cache.put('a', FakeSurface(30))
+    self.assertEqual((len(cache), cache.bytes), (1, 30))
+
+  def test_eviction_order(self):
+    cache = Cache.SurfaceCache(max_bytes=30)
+    for key in 'abc':
+      cache.put(key, FakeSurface(10))
+    # Using 'a' makes 'b' the least recently used
+    cache.get('a')
+    cache.put('d', FakeSurface(10))
+    self.assertNotIn('b', cache)
+    self.assertEqual([key for key in 'acd' if key in cache], ['a', 'c', 'd'])
+    cache.put('e', FakeSurface(20))
+    self.assertEqual([key for key in 'acde' if key in cache], ['d', 'e'])
+    self.assertEqual(cache.bytes, 30)
+
+  def test_capacity(self):
+    cache = Cache.SurfaceCache(max_bytes=25)
+    for index in range(10):
+      cache.put(index, FakeSurface(10))
+      self.assertLessEqual(cache.bytes, 25)
+    self.assertEqual(len(cache), 2)
+
+    # A surface bigger than the cap is still kept, alone, as the newest entry
+    cache.put('big', FakeSurface(100))
+    self.assertEqual((len(cache), cache.bytes), (1, 100))
+    self.assertIs(cache.get('big').width, 100)
+
+    cache.clear()
+    self.assertEqual((len(cache), cache.bytes), (0, 0))
+
+
+class TestTextCache(unittest.TestCase):
+
+  def setUp(self):
+    self.cache = Cache.TextCache()
+    self.font = FakeFont()
+
+  def test_key(self):
+    first = self.cache.render(self.font, 'hello', [0, 0, 0])
+    self.assertIs(self.cache.render(self.font, 'hello', (0, 0, 0)), first)
+    self.assertEqual(len(self.font.rendered), 1)
+
+    # Everything that changes the pixels renders again
+    self.cache.render(self.font, 'hello', (0, 0, 0), background=(255, 255, 255))
+    self.cache.render(self.font, 'hello', (255, 0, 0))
+    self.cache.render(self.font, 'hello', (0, 0, 0), antialias=False)
+    self.cache.render(self.font, 'hello!', (0, 0, 0))
+    self.cache.render(FakeFont(), 'hello', (0, 0, 0))
+    self.assertEqual(len(self.font.rendered), 5)
+    self.assertEqual(len(self.cache), 6)
+
+  def test_background_passed_only_when_given(self):
+    self.cache.render(self.font, 'a', (1, 2, 3))
+    self.cache.render(self.font, 'b', (1, 2, 3), (4, 5, 6))
+    self.assertEqual(self.font.rendered, [('a', True, (1, 2, 3), None), ('b', True, (1, 2, 3), (4, 5, 6))])
+
+  def test_invalidation(self):
+    cache = Cache.TextCache(max_bytes=10)
+    cache.render(self.font, 'abcde', (0, 0, 0))
+    cache.render(self.font, 'fghij', (0, 0, 0))
+    cache.render(self.font, 'klmno', (0, 0, 0))
+    # The oldest text was evicted, so it is rendered again
+    cache.render(self.font, 'abcde', (0, 0, 0))
+    self.assertEqual([text for text, antialias, color, background in self.font.rendered],
+                     ['abcde', 'fghij', 'klmno', 'abcde'])
+    cache.clear()
+    cache.render(self.font, 'klmno', (0, 0, 0))
+    self.assertEqual(len(self.font.rendered), 5)
+
+
+@unittest.skipIf(Cache.pygame is None, "pygame is not installed")
+class TestRotationCache(unittest.TestCase):
+
+  def setUp(self):
+    self.cache = Cache.RotationCache()
+    self.surface = Cache.pygame.Surface((20, 10))
+
+  def test_rotate(self):
+    self.assertIs(self.cache.rotate(self.surface, 0), self.surface)
+    self.assertIs(self.cache.rotate(self.surface, 360), self.surface)
+    rotated = self.cache.rotate(self.surface, 90)
+    self.assertEqual(rotated.get_size(), (10, 20))
+    self.assertIs(self.cache.rotate(self.surface, 450), rotated)
+    self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+
+if __name__ == '__main__':
+  sys.exit(unittest.main())
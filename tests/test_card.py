@@ -13,9 +13,14 @@ https://cgoldberg.github.io/python-unittest-tutorial/
 
 """
 
+import copy
+import gc
+import itertools
+import pickle
 import unittest
 
 from python_card_game.engine import Card, BadCardParamsExepction
+from python_card_game.engine.card import CARD_ATTRIBUTES, VALID_CARDS, card_constraints, card_rejection
 
 
 class TestCard(unittest.TestCase):
@@ -118,6 +123,86 @@ class TestCard(unittest.TestCase):
     }
     # TODO: DREW you fill in this one
 
+  def assertRejected(self, reason, **card_setup):
+    with self.assertRaises(BadCardParamsExepction) as context:
+      Card(**card_setup)
+    self.assertEqual(context.exception.args, (reason,))
+
+  def test_rejection_reasons(self):
+    self.assertRejected("attributes_are_bad")
+    self.assertRejected("attributes_are_bad", stealth=10, victory_point=2)
+    self.assertRejected("attributes_are_bad", gold=-1, victory_point=1)
+    self.assertRejected("non_zero_count", diplomacy=1, stealth=2, might=1, victory_point=2)
+    self.assertRejected("card_sum", diplomacy=3, stealth=2, victory_point=2)
+    self.assertRejected("odd_sum", stealth=1, victory_point=2)
+
+  def test_table_matches_constraints(self):
+    # Every tuple in range is legal exactly when the card rules allow it, and is otherwise rejected with the
+    # first rule it breaks
+    ranges = [range(card_constraints[name][0], card_constraints[name][1] + 1) for name in CARD_ATTRIBUTES]
+    legal = 0
+    for values in itertools.product(*ranges):
+      resources = sum(values[:-1])
+      if sum(1 for value in values if value) > 3:
+        expected = "non_zero_count"
+      elif sum(values) > 6:
+        expected = "card_sum"
+      elif resources % 2:
+        expected = "odd_sum"
+      else:
+        expected = None
+        legal += 1
+      self.assertEqual(card_rejection(values), expected)
+      self.assertEqual(values in VALID_CARDS, expected is None)
+    self.assertEqual(len(VALID_CARDS), legal)
+
+  def test_rejection_outside_table(self):
+    self.assertEqual(card_rejection((0, 0, 10, 0, 2)), "attributes_are_bad")
+    self.assertEqual(card_rejection((2.0, 0, 0, 2, 2)), None)
+
+  def test_attributes(self):
+    card = Card(gold=2, might=2, victory_point=1, effect="draw")
+    self.assertEqual((card.gold, card.diplomacy, card.stealth, card.might, card.victory_point, card.effect),
+                     (2, 0, 0, 2, 1, "draw"))
+
+  def test_fractional_values(self):
+    # Values that are not whole numbers miss the table and are checked the long way
+    card = Card(gold=1.5, diplomacy=0.5, victory_point=1)
+    self.assertEqual(card.gold, 1.5)
+
+  def test_interned(self):
+    card = Card(gold=2, might=2, victory_point=2)
+    self.assertIs(Card(2, 0, 0, 2, 2), card)
+    self.assertIsNot(Card(gold=2, might=2, victory_point=2, effect="draw"), card)
+    self.assertEqual(len(set([card, Card(2, 0, 0, 2, 2), Card(0, 2, 0, 2, 2)])), 2)
+
+  def test_interned_cards_are_released(self):
+    # Only live cards stay interned
+    key = (Card, 0, 0, 2, 2, 2, "released")
+    card = Card(stealth=2, might=2, victory_point=2, effect="released")
+    self.assertIn(key, Card._interned)
+    del card
+    gc.collect()
+    self.assertNotIn(key, Card._interned)
+
+  def test_immutable(self):
+    card = Card(gold=2, might=2, victory_point=2)
+    with self.assertRaises(AttributeError):
+      card.gold = 4
+    with self.assertRaises(AttributeError):
+      del card.gold
+    with self.assertRaises(AttributeError):
+      card.name = "gold"
+    self.assertEqual(card.gold, 2)
+
+  def test_pickle_and_copy(self):
+    card = Card(diplomacy=1, stealth=1, victory_point=3, effect="steal")
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+      self.assertIs(pickle.loads(pickle.dumps(card, protocol)), card)
+    self.assertIs(copy.copy(card), card)
+    self.assertIs(copy.deepcopy(card), card)
+    self.assertEqual(repr(card), "Card(gold=0, diplomacy=1, stealth=1, might=0, victory_point=3, effect='steal')")
+
 if __name__ == '__main__':
   import sys
   sys.exit(unittest.main())
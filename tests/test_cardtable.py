@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_cardtable
+----------------------------------
+
+Tests for deck statistics with `CardTable`, with and without NumPy.
+
+"""
+
+import random
+import unittest
+
+from python_card_game.engine import Card
+from python_card_game.engine import cardtable
+from python_card_game.engine.card import VALID_CARDS
+from python_card_game.engine.cardtable import CardTable
+
+
+class CardTableTests(object):
+  # Every statistic matches the same thing worked out card by card.  Run with and without NumPy below.
+  useNumpy = False
+
+  def setUp(self):
+    generator = random.Random(3)
+    legal = sorted(VALID_CARDS)
+    self.cards = [Card(*(generator.choice(legal) + (generator.choice(("None", "draw", "steal")),)))
+                  for i in range(200)]
+    self.table = CardTable.from_cards(self.cards, self.useNumpy)
+
+  def test_round_trip(self):
+    self.assertEqual(len(self.table), 200)
+    cards = self.table.to_cards()
+    self.assertEqual(cards, self.cards)
+    self.assertIs(cards[0], self.cards[0])
+    self.assertEqual(CardTable(use_numpy=self.useNumpy).to_cards(), [])
+
+  def test_totals(self):
+    for name in ("gold", "diplomacy", "stealth", "might", "victory_point"):
+      self.assertEqual(self.table.total(name), sum(getattr(card, name) for card in self.cards))
+    self.assertEqual(self.table.totals()["gold"], self.table.total("gold"))
+
+  def test_histogram(self):
+    histogram = self.table.histogram("might")
+    self.assertEqual(len(histogram), 7)
+    self.assertEqual(histogram, [sum(1 for card in self.cards if card.might == value) for value in range(7)])
+    self.assertEqual(len(self.table.histogram("victory_point")), 4)
+
+  def test_filter(self):
+    expensive = self.table.filter(gold=(4, 6), effect="draw")
+    expected = [card for card in self.cards if 4 <= card.gold <= 6 and card.effect == "draw"]
+    self.assertTrue(expected)
+    self.assertEqual(expensive.to_cards(), expected)
+    self.assertEqual(self.table.filter(victory_point=3).to_cards(),
+                     [card for card in self.cards if card.victory_point == 3])
+    self.assertEqual(self.table.mask(), [True] * 200)
+    self.assertEqual(len(self.table.filter(gold=7)), 0)
+    self.assertRaises(KeyError, self.table.filter, luck=1)
+
+  def test_sample_hand(self):
+    hand = self.table.sample_hand(5, random.Random(9))
+    indices = random.Random(9).sample(xrange(200), 5)
+    self.assertEqual(hand.to_cards(), [self.cards[index] for index in indices])
+    self.assertRaises(ValueError, self.table.sample_hand, 201)
+
+  def test_columns_checked(self):
+    self.assertRaises(ValueError, CardTable, dict((name, [1]) for name in cardtable.CARD_ATTRIBUTES), [],
+                      self.useNumpy)
+
+    # Card takes fractional values the table can't hold
+    with self.assertRaises(ValueError) as raised:
+      CardTable.from_cards([Card(gold=1.5, diplomacy=0.5, victory_point=1)], self.useNumpy)
+    self.assertIn("'gold' has 1.5", str(raised.exception))
+    table = CardTable.from_cards([Card(gold=2.0, might=2, victory_point=1)], self.useNumpy)
+    self.assertEqual(table.total("gold"), 2)
+
+    # Values a histogram could not count
+    columns = dict((name, [0]) for name in cardtable.CARD_ATTRIBUTES)
+    columns["victory_point"] = [1]
+    columns["gold"] = [-1]
+    self.assertRaises(ValueError, CardTable, columns, ["None"], self.useNumpy)
+    columns["gold"] = [7]
+    self.assertRaises(ValueError, CardTable, columns, ["None"], self.useNumpy)
+    columns["gold"] = [200]
+    self.assertRaises(ValueError, CardTable, columns, ["None"], self.useNumpy)
+    columns["gold"] = [6]
+    self.assertEqual(CardTable(columns, ["None"], self.useNumpy).histogram("gold"), [0] * 6 + [1])
+
+
+class TestPythonCardTable(CardTableTests, unittest.TestCase):
+  useNumpy = False
+
+
+@unittest.skipIf(cardtable.numpy is None, "numpy is not installed")
+class TestNumpyCardTable(CardTableTests, unittest.TestCase):
+  useNumpy = True
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_catalog
+----------------------------------
+
+Tests for loading card catalogs with `CatalogLoader` and `CardEngine.load_deck`.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from python_card_game.engine import Card, CardEngine
+from python_card_game.engine.catalog import CSV, JSON_LINES, CatalogLoader, RowError
+from python_card_game.engine.effects import NO_EFFECT, EffectRegistry
+
+JSON_CATALOG = """{"gold": 2, "might": 2, "victory_point": 2, "effect": "draw"}
+{"diplomacy": 1, "stealth": 1, "victory_point": 1}
+
+{"gold": 7, "victory_point": 1}
+not json
+[1, 2]
+{"gold": 1, "victory_point": 1}
+{"gold": 2.5, "might": 2, "victory_point": 1}
+{"gold": 2.0, "might": 2, "victory_point": 1}
+{"gold": 2, "luck": 2, "victory_point": 1}
+{"gold": 1, "diplomacy": 1, "stealth": 1, "might": 1, "victory_point": 1}
+{"gold": "2", "might": 2, "victory_point": 1}
+{"gold": true, "might": 2, "victory_point": 1}
+{"gold": 2, "might": 2, "victory_point": 2, "effect": "drwa"}
+"""
+
+CSV_CATALOG = """gold,diplomacy,stealth,might,victory_point,effect
+2,0,0,2,2,draw
+0,1,1,0,1,
+4,2,0,0,2,
+x,0,0,0,1,
+
+1,1
+2.0,0,0,2,2,
+"""
+
+
+class CatalogCard(Card):
+  # Cards whose effects are looked up in a registry of their own
+  effects = EffectRegistry()
+  effects.register("draw", lambda state, card: None)
+
+
+class TestCatalogLoader(unittest.TestCase):
+
+  def setUp(self):
+    self.errors = []
+
+  def load(self, text, format, batch_size=1024):
+    loader = CatalogLoader(batch_size=batch_size, on_error=self.errors.append, card_class=CatalogCard)
+    stream = loader.load(StringIO(text), format)
+    return stream, list(stream)
+
+  def test_json_lines(self):
+    stream, cards = self.load(JSON_CATALOG, JSON_LINES)
+    self.assertEqual(cards, [CatalogCard(2, 0, 0, 2, 2, "draw"), CatalogCard(0, 1, 1, 0, 1),
+                             CatalogCard(2, 0, 0, 2, 1)])
+    self.assertEqual([(error.line, error.reason) for error in self.errors], [
+        (4, "attributes_are_bad"),
+        (5, "invalid_json"),
+        (6, "not_an_object"),
+        (7, "odd_sum"),
+        (8, "not_an_integer"),
+        (10, "unknown_field"),
+        (11, "non_zero_count"),
+        (12, "not_an_integer"),
+        (13, "not_an_integer"),
+        (14, "unknown_effect"),
+    ])
+    self.assertEqual((stream.rows, stream.cards, stream.errors), (13, 3, 10))
+    self.assertNotIn("drwa", CatalogCard.effects)
+
+  def test_csv(self):
+    stream, cards = self.load(CSV_CATALOG, CSV)
+    self.assertEqual(cards, [CatalogCard(2, 0, 0, 2, 2, "draw"), CatalogCard(0, 1, 1, 0, 1)])
+    self.assertEqual(self.errors[0], RowError(4, "card_sum", {"gold": "4", "diplomacy": "2", "stealth": "0",
+                                                              "might": "0", "victory_point": "2"}))
+    self.assertEqual([(error.line, error.reason) for error in self.errors[1:]],
+                     [(5, "not_an_integer"), (7, "wrong_column_count"), (8, "not_an_integer")])
+    self.assertEqual((stream.rows, stream.cards, stream.errors), (6, 2, 4))
+
+  def test_unregistered_effect(self):
+    registry = EffectRegistry()
+    registry.register("steal", lambda state, card: None)
+    registry.unregister("steal")
+
+    class UnregisteredCard(Card):
+      effects = registry
+
+    loader = CatalogLoader(on_error=self.errors.append, card_class=UnregisteredCard)
+    text = '{"stealth": 2, "might": 2, "victory_point": 1, "effect": "steal"}\n'
+    self.assertEqual(list(loader.load(StringIO(text), JSON_LINES)), [])
+    self.assertEqual([(error.line, error.reason) for error in self.errors], [(1, "unknown_effect")])
+
+  def test_null_effect(self):
+    stream, cards = self.load('{"gold": 1, "diplomacy": 1, "victory_point": 1, "effect": null}\n'
+                              '{"gold": 1, "diplomacy": 1, "victory_point": 1, "effect": 3}\n', JSON_LINES)
+    self.assertEqual(cards, [CatalogCard(1, 1, 0, 0, 1, None)])
+    self.assertEqual(cards[0].effect_code, NO_EFFECT)
+    self.assertEqual([(error.line, error.reason) for error in self.errors], [(2, "bad_effect")])
+
+  def test_interleaved_loads(self):
+    # Each load counts its own rows, however the loads are interleaved
+    loader = CatalogLoader(batch_size=1, card_class=CatalogCard)
+    first = loader.load(StringIO(JSON_CATALOG), JSON_LINES)
+    second = loader.load(StringIO(CSV_CATALOG), CSV)
+    for card in second:
+      next(first, None)
+    self.assertEqual(len(list(first)), 1)
+    self.assertEqual((first.rows, first.cards, first.errors), (13, 3, 10))
+    self.assertEqual((second.rows, second.cards, second.errors), (6, 2, 4))
+
+  def test_batches(self):
+    # The same cards and errors whatever the batch size, in file order
+    expected = self.load(JSON_CATALOG, JSON_LINES)[1], list(self.errors)
+    for batch_size in (1, 2, 3, 100):
+      self.errors = []
+      self.assertEqual((self.load(JSON_CATALOG, JSON_LINES, batch_size)[1], self.errors), expected)
+    self.assertRaises(ValueError, CatalogLoader, batch_size=0)
+
+  def test_streams(self):
+    # Cards come out a batch at a time, before the rest of the file is read
+    lines = iter(['{"gold": 1, "diplomacy": 1, "victory_point": 1}\n'] * 5)
+    read = []
+
+    class Catalog(object):
+      def read(self):
+        raise AssertionError("the catalog is read line by line")
+
+      def __iter__(self):
+        for line in lines:
+          read.append(line)
+          yield line
+
+    cards = CatalogLoader(batch_size=2).load(Catalog(), JSON_LINES)
+    next(cards)
+    self.assertEqual(len(read), 2)
+    self.assertEqual(len(list(cards)), 4)
+
+  def test_format(self):
+    loader = CatalogLoader()
+    self.assertRaises(ValueError, loader.load, StringIO(""))
+    self.assertRaises(ValueError, loader.load, StringIO(""), "xml")
+    self.assertRaises(ValueError, loader.load, "catalog.txt")
+
+
+class TestLoadDeck(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def write(self, name, text):
+    path = os.path.join(self.directory, name)
+    with open(path, 'w') as catalog:
+      catalog.write(text)
+    return path
+
+  def test_load_deck(self):
+    errors = []
+    deck = CardEngine.load_deck(self.write('catalog.jsonl', JSON_CATALOG), on_error=errors.append,
+                                card_class=CatalogCard)
+    self.assertEqual(len(deck), 3)
+    self.assertEqual(len(errors), 10)
+
+    deck = CardEngine.load_deck(self.write('catalog.csv', CSV_CATALOG), card_class=CatalogCard)
+    self.assertEqual(deck, [CatalogCard(2, 0, 0, 2, 2, "draw"), CatalogCard(0, 1, 1, 0, 1)])
+
+    deck = CardEngine.load_deck(self.write('catalog.txt', CSV_CATALOG), format=CSV, card_class=CatalogCard)
+    self.assertEqual(len(deck), 2)
+
+    # "draw" is not registered for plain Cards
+    deck = CardEngine.load_deck(self.write('catalog.csv', CSV_CATALOG))
+    self.assertEqual(deck, [Card(0, 1, 1, 0, 1)])
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_dirty
+----------------------------------
+
+Tests for `DirtyRegions` and dirty tracking in `CardEngine`.
+
+"""
+
+import unittest
+
+from python_card_game.engine import CardEngine
+from python_card_game.engine.dirty import DirtyRegions
+
+
+class Element(object):
+
+  def __init__(self, bounds, z=0):
+    self.bounds = bounds
+    self.z = z
+
+  def get_bounds(self):
+    return self.bounds
+
+  def render(self, surface):
+    pass
+
+
+class TestDirtyRegions(unittest.TestCase):
+
+  def setUp(self):
+    self.regions = DirtyRegions(800, 600)
+    self.assertEqual(self.regions.pop(), [(0, 0, 800, 600)])
+
+  def test_idle(self):
+    self.assertFalse(self.regions)
+    self.assertEqual(self.regions.pop(), [])
+
+  def test_merge(self):
+    self.regions.add((10, 10, 20, 20))
+    self.regions.add((15, 15, 30, 30))
+    self.regions.add((100, 100, 110, 110))
+    self.assertEqual(sorted(self.regions.pop()), [(10, 10, 21, 21), (100, 100, 11, 11)])
+
+  def test_merge_chain(self):
+    # The last region joins the first two, which are apart until then
+    self.regions.add((0, 0, 10, 10))
+    self.regions.add((50, 0, 60, 10))
+    self.regions.add((5, 0, 55, 10))
+    self.assertEqual(self.regions.pop(), [(0, 0, 61, 11)])
+
+  def test_clipped_and_rounded(self):
+    self.regions.add((-5.5, 10.2, 20.7, 30))
+    self.regions.add((900, 900, 950, 950))
+    self.assertEqual(self.regions.pop(), [(0, 10, 22, 21)])
+
+  def test_large_area_is_full_screen(self):
+    self.regions.add((0, 0, 700, 500))
+    self.assertEqual(self.regions.pop(), [(0, 0, 800, 600)])
+
+
+class TestEngineDirtyTracking(unittest.TestCase):
+
+  def setUp(self):
+    CardEngine.init(800, 600, headless=True)
+    CardEngine.dirtyRegions.pop()
+
+  def tearDown(self):
+    CardEngine.remove_all_ui_elements()
+
+  def test_add_move_remove(self):
+    element = Element((10, 10, 50, 50))
+    CardEngine.add_ui_element(element)
+    self.assertEqual(CardEngine.dirtyRegions.pop(), [(10, 10, 41, 41)])
+
+    element.bounds = (200, 200, 240, 240)
+    CardEngine.update_ui_element(element)
+    self.assertEqual(sorted(CardEngine.dirtyRegions.pop()), [(10, 10, 41, 41), (200, 200, 41, 41)])
+
+    CardEngine.remove_ui_element(element)
+    self.assertEqual(CardEngine.dirtyRegions.pop(), [(200, 200, 41, 41)])
+
+  def test_render_clears(self):
+    CardEngine.add_ui_element(Element((10, 10, 50, 50)))
+    CardEngine.render()
+    self.assertFalse(CardEngine.dirtyRegions)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
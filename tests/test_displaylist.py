@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_displaylist
+----------------------------------
+
+Tests for the z-ordered `DisplayList`.
+
+"""
+
+import unittest
+
+from python_card_game.engine import CardEngine
+from python_card_game.engine.displaylist import DisplayList
+
+
+class Element(object):
+
+  def __init__(self, name, z):
+    self.name = name
+    self.z = z
+
+  def __eq__(self, other):
+    # Equal names must not confuse membership, which goes by identity
+    return self.name == other.name
+
+
+class TestDisplayList(unittest.TestCase):
+
+  def setUp(self):
+    self.display = DisplayList()
+    self.a = Element('a', 5)
+    self.b = Element('b', 1)
+    self.c = Element('c', 5)
+    for element in (self.a, self.b, self.c):
+      self.display.add(element)
+
+  def names(self):
+    return [element.name for element in self.display]
+
+  def test_sorted_on_add(self):
+    self.assertEqual(self.names(), ['b', 'a', 'c'])
+    self.assertFalse(self.display.add(self.a))
+    self.assertEqual(len(self.display), 3)
+
+  def test_membership_by_identity(self):
+    self.assertIn(self.a, self.display)
+    self.assertNotIn(Element('a', 5), self.display)
+
+  def test_update_z(self):
+    self.b.z = 10
+    self.display.update(self.b)
+    self.assertEqual(self.names(), ['a', 'c', 'b'])
+
+    # Returning to an equal z keeps the original insertion order
+    self.b.z = 5
+    self.display.update(self.b)
+    self.assertEqual(self.names(), ['a', 'b', 'c'])
+
+  def test_remove(self):
+    self.assertTrue(self.display.remove(self.a))
+    self.assertFalse(self.display.remove(self.a))
+    self.assertEqual(self.names(), ['b', 'c'])
+
+  def test_resort(self):
+    self.a.z = 0
+    self.c.z = -1
+    self.display.resort()
+    self.assertEqual(self.names(), ['c', 'a', 'b'])
+    self.assertTrue(self.display.key(self.b) > self.display.key(self.a))
+
+  def test_engine_render_order(self):
+    CardEngine.init(headless=True)
+    try:
+      for element in (self.a, self.b, self.c):
+        element.get_bounds = lambda: (0, 0, 1, 1)
+        CardEngine.add_ui_element(element)
+      self.b.z = 7
+      CardEngine.update_ui_element(self.b)
+      self.assertEqual([element.name for element in CardEngine.UIElements], ['a', 'c', 'b'])
+    finally:
+      CardEngine.remove_all_ui_elements()
+    self.assertEqual(len(CardEngine.UIElements), 0)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_effects
+----------------------------------
+
+Tests for dispatching card effects by opcode with `EffectRegistry` and `EffectQueue`.
+
+"""
+
+import unittest
+
+from python_card_game.engine import Card
+from python_card_game.engine.effects import EFFECTS, NO_EFFECT, UNKNOWN_EFFECT, EffectQueue, EffectRegistry
+
+
+class TestEffectRegistry(unittest.TestCase):
+
+  def setUp(self):
+    self.registry = EffectRegistry()
+    self.state = []
+
+  def test_opcodes(self):
+    self.assertEqual(self.registry.opcode("None"), NO_EFFECT)
+    self.assertEqual(self.registry.opcode(None), NO_EFFECT)
+    draw = self.registry.register("draw", self.state.append)
+    self.assertEqual(self.registry.opcode("draw"), draw)
+    self.assertNotEqual(self.registry.register("steal", self.state.append), draw)
+    self.assertEqual(self.registry.names[draw], "draw")
+    self.assertIn("draw", self.registry)
+    self.assertEqual(len(self.registry), 4)
+    self.assertRaises(ValueError, self.registry.register, "None", self.state.append)
+
+  def test_lookup_does_not_add(self):
+    # Unregistered names, typos included, share one opcode and are never added
+    self.assertIsNone(self.registry.find("drwa"))
+    self.assertEqual(self.registry.opcode("drwa"), UNKNOWN_EFFECT)
+    self.assertNotIn("drwa", self.registry)
+    self.assertEqual(len(self.registry), 2)
+
+  def test_register_replaces_handler(self):
+    code = self.registry.register("draw", lambda state, card: state.append(("draw", card)))
+    self.assertEqual(self.registry.opcode("draw"), code)
+    self.registry.handlers[code](self.state, 1)
+    self.registry.register("draw", lambda state, card: state.append(("draw twice", card)))
+    self.registry.handlers[code](self.state, 2)
+    self.assertEqual(self.state, [("draw", 1), ("draw twice", 2)])
+
+  def test_missing_handler(self):
+    self.assertRaises(LookupError, self.registry.handler("steal"), self.state, None)
+    code = self.registry.register("steal", lambda state, card: state.append(card))
+    self.registry.unregister("steal")
+    self.assertIsNone(self.registry.find("steal"))
+    self.assertNotIn("steal", self.registry)
+    self.assertRaises(LookupError, self.registry.handler("steal"), self.state, None)
+    self.assertEqual(self.registry.register("steal", self.state.append), code)
+    self.assertIn("steal", self.registry)
+
+
+class TestCardEffects(unittest.TestCase):
+
+  def setUp(self):
+    self.state = []
+    EFFECTS.register("test draw", lambda state, card: state.append(("draw", card.victory_point)))
+    EFFECTS.register("test steal", lambda state, card: state.append(("steal", card.stealth)))
+
+  def tearDown(self):
+    EFFECTS.unregister("test draw")
+    EFFECTS.unregister("test steal")
+
+  def test_card_effect_code(self):
+    card = Card(gold=2, might=2, victory_point=2, effect="test draw")
+    self.assertEqual(card.effect_code, EFFECTS.opcode("test draw"))
+    self.assertEqual(Card(gold=2, might=2, victory_point=2).effect_code, NO_EFFECT)
+    with self.assertRaises(AttributeError):
+      card.effect_code = NO_EFFECT
+
+  def test_apply(self):
+    draw = Card(gold=2, might=2, victory_point=2, effect="test draw")
+    steal = Card(stealth=2, might=2, victory_point=1, effect="test steal")
+    plain = Card(gold=1, diplomacy=1, victory_point=1)
+    EFFECTS.apply(self.state, draw)
+    EFFECTS.apply_all(self.state, [steal, plain, draw])
+    self.assertEqual(self.state, [("draw", 2), ("steal", 2), ("draw", 2)])
+
+  def test_queue(self):
+    draw = Card(gold=2, might=2, victory_point=2, effect="test draw")
+    steal = Card(stealth=2, might=2, victory_point=1, effect="test steal")
+    queue = EffectQueue()
+    queue.push(draw)
+    queue.extend([steal, draw])
+    self.assertEqual(len(queue), 3)
+    self.assertEqual(queue.run(self.state), 3)
+    self.assertEqual(self.state, [("draw", 2), ("steal", 2), ("draw", 2)])
+    self.assertEqual(len(queue), 0)
+
+  def test_queue_from_handler(self):
+    # Effects queued while the queue runs are applied in the same pass
+    queue = EffectQueue()
+    draw = Card(gold=2, might=2, victory_point=2, effect="test draw")
+    EFFECTS.register("test chain", lambda state, card: queue.push(draw))
+    try:
+      queue.push(Card(gold=2, might=2, victory_point=1, effect="test chain"))
+      self.assertEqual(queue.run(self.state), 2)
+    finally:
+      EFFECTS.unregister("test chain")
+    self.assertEqual(self.state, [("draw", 2)])
+
+  def test_registered_after_card(self):
+    card = Card(gold=2, might=2, victory_point=2, effect="test late")
+    self.assertEqual(card.effect_code, UNKNOWN_EFFECT)
+    self.assertRaises(LookupError, EFFECTS.apply, self.state, card)
+    EFFECTS.register("test late", lambda state, card: state.append("late"))
+    try:
+      EFFECTS.apply_all(self.state, [card])
+    finally:
+      EFFECTS.unregister("test late")
+    self.assertEqual(self.state, ["late"])
+
+  def test_private_registry(self):
+    registry = EffectRegistry()
+    registry.register("private draw", lambda state, card: state.append(card.victory_point))
+
+    class PrivateCard(Card):
+      effects = registry
+
+    card = PrivateCard(gold=2, might=2, victory_point=2, effect="private draw")
+    self.assertEqual(card.effect_code, registry.find("private draw"))
+    self.assertNotIn("private draw", EFFECTS)
+    queue = EffectQueue(registry)
+    queue.extend([card, card])
+    queue.run(self.state)
+    self.assertEqual(self.state, [2, 2])
+
+  def test_queue_keeps_rest_after_error(self):
+    queue = EffectQueue()
+    draw = Card(gold=2, might=2, victory_point=2, effect="test draw")
+    queue.extend([draw, Card(gold=2, might=2, victory_point=2, effect="test unknown"), draw])
+    self.assertRaises(LookupError, queue.run, self.state)
+    self.assertEqual(len(queue), 1)
+    queue.run(self.state)
+    self.assertEqual(self.state, [("draw", 2), ("draw", 2)])
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_encoding
+----------------------------------
+
+Tests for the integer card encoding in `python_card_game.engine.encoding`.
+
+"""
+
+import unittest
+
+from python_card_game.engine import CardEngine, PlayingCard, encoding
+
+
+class TestEncoding(unittest.TestCase):
+
+  def test_table(self):
+    self.assertEqual(len(encoding.CARDS), 52)
+    self.assertEqual(encoding.encode(1, 1), 0)
+    self.assertEqual(encoding.encode(4, 13), 51)
+    self.assertEqual(encoding.encode(2, 5), 17)
+    self.assertEqual((encoding.suit_of(17), encoding.value_of(17)), (2, 5))
+
+  def test_round_trip(self):
+    deck = CardEngine.create_deck((1, 2, 3, 4), range(1, 14))
+    codes = encoding.encode_cards(deck)
+    self.assertEqual(list(codes), range(52))
+    self.assertEqual(encoding.decode_cards(codes), deck)
+    self.assertEqual(codes.tostring(), ''.join(chr(i) for i in range(52)))
+
+  def test_interned(self):
+    card = PlayingCard(3, 12)
+    code = encoding.from_card(card)
+    self.assertIs(encoding.to_card(code), encoding.to_card(code))
+    self.assertEqual(encoding.to_card(code), card)
+
+  def test_invalid(self):
+    self.assertRaises(ValueError, encoding.encode, 5, 1)
+    self.assertRaises(ValueError, encoding.from_card, PlayingCard(1, 14))
+    for code in (-1, 52):
+      self.assertRaises(ValueError, encoding.to_card, code)
+      self.assertRaises(ValueError, encoding.suit_of, code)
+      self.assertRaises(ValueError, encoding.value_of, code)
+      self.assertRaises(ValueError, encoding.decode_cards, [0, code])
+
+  def test_select_cards(self):
+    class UICard(object):
+      def __init__(self, suit, value):
+        self.suit = suit
+        self.value = value
+
+    hand = [UICard(2, 5), UICard(1, 1), UICard(4, 13)]
+    self.assertEqual(encoding.index_cards(hand), {17: hand[0], 0: hand[1], 51: hand[2]})
+    self.assertEqual(encoding.select_cards([51, 17], hand), [hand[2], hand[0]])
+    self.assertRaises(ValueError, encoding.select_cards, [3], hand)
+    self.assertRaises(ValueError, encoding.select_cards, [-1], hand)
+
+  def test_new_deck(self):
+    shoe = encoding.new_deck(2)
+    self.assertEqual(len(shoe), 104)
+    self.assertEqual(shoe.typecode, 'B')
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
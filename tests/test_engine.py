@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_engine
+----------------------------------
+
+Tests for `CardEngine` running headless, driven by synthetic events.
+
+"""
+
+import unittest
+
+from python_card_game.engine import Card, CardEngine, Event, EventType, MouseButton, PlayingCard
+
+
+class TestHeadlessEngine(unittest.TestCase):
+
+  def setUp(self):
+    CardEngine.init(320, 240, headless=True, seed=5)
+    self.received = []
+
+  def tearDown(self):
+    CardEngine.keyPress -= self._record
+    CardEngine.mouseMovement -= self._record
+    CardEngine.gameQuit -= self._record_quit
+    CardEngine.remove_all_ui_elements()
+
+  def _record(self, event):
+    self.received.append(event)
+
+  def _record_quit(self):
+    self.received.append('quit')
+
+  def test_init_headless(self):
+    self.assertTrue(CardEngine.headless)
+    self.assertEqual((CardEngine.width, CardEngine.height), (320, 240))
+
+  def test_synthetic_events(self):
+    CardEngine.keyPress += self._record
+    CardEngine.mouseMovement += self._record
+    key = Event(EventType.KEYDOWN, key=32)
+    motion = Event(EventType.MOUSEMOTION, pos=(4, 5))
+    CardEngine.post_event(key)
+    CardEngine.post_event(motion)
+    CardEngine.update()
+    self.assertEqual(self.received, [key, motion])
+
+    # Events are consumed by the update that handles them.
+    CardEngine.update()
+    self.assertEqual(len(self.received), 2)
+
+  def test_quit_does_not_exit(self):
+    CardEngine.gameQuit += self._record_quit
+    CardEngine.post_event(Event(EventType.QUIT))
+    CardEngine.update()
+    self.assertEqual(self.received, ['quit'])
+
+  def test_events_after_quit_are_kept(self):
+    CardEngine.gameQuit += self._record_quit
+    CardEngine.keyPress += self.received.append
+    key = Event(EventType.KEYDOWN, key=32)
+    CardEngine.post_event(Event(EventType.QUIT))
+    CardEngine.post_event(key)
+    CardEngine.update()
+    self.assertEqual(self.received, ['quit'])
+    self.assertEqual(CardEngine.eventQueue, [key])
+    CardEngine.update()
+    self.assertEqual(self.received, ['quit', key])
+    CardEngine.keyPress -= self.received.append
+
+  def test_click_without_elements(self):
+    CardEngine.post_event(Event(EventType.MOUSEBUTTONDOWN, button=MouseButton.LEFT, pos=(1, 1)))
+    CardEngine.update()
+    CardEngine.render()
+
+  def test_create_deck(self):
+    deck = CardEngine.create_deck((1, 2, 3, 4), range(1, 14))
+    self.assertEqual(len(deck), 52)
+    self.assertEqual(deck[0], PlayingCard(1, 1))
+    self.assertEqual(len(set(deck)), 52)
+
+  def test_transfer_cards(self):
+    special = [Card(gold=2, might=2, victory_point=2), Card(gold=2, might=2, victory_point=2)]
+    deck = CardEngine.create_deck((1,), range(1, 4), special_cards=special)
+    self.assertEqual(len(deck), 5)
+
+    hand = []
+    CardEngine.transfer_card(PlayingCard(1, 2), deck, hand)
+    CardEngine.transfer_card(special[0], deck, hand)
+    self.assertEqual(hand, [PlayingCard(1, 2), special[0]])
+    self.assertEqual(deck, [PlayingCard(1, 1), PlayingCard(1, 3), special[1]])
+
+    CardEngine.transfer_cards([special[1], PlayingCard(1, 1), PlayingCard(4, 4)], deck, hand)
+    self.assertEqual(deck, [PlayingCard(1, 3)])
+    self.assertEqual(len(hand), 4)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_events
+----------------------------------
+
+Tests for the `EventHandler` event bus.
+
+"""
+
+import gc
+import unittest
+
+from python_card_game.engine import CardEngine, EventHandler
+
+
+class Listener(object):
+
+  def __init__(self, calls, name):
+    self.calls = calls
+    self.name = name
+
+  def on_event(self, *args):
+    self.calls.append((self.name, args))
+
+
+class SlottedListener(object):
+  # No __weakref__ slot, so it can't be weakly referenced
+  __slots__ = ('calls',)
+
+  def __init__(self, calls):
+    self.calls = calls
+
+  def on_event(self, *args):
+    self.calls.append(args)
+
+
+class TestEventHandler(unittest.TestCase):
+
+  def setUp(self):
+    self.handler = EventHandler()
+    self.calls = []
+
+  def test_notify_and_remove(self):
+    listener = Listener(self.calls, 'a')
+    self.handler += listener.on_event
+    self.handler += listener.on_event
+    self.assertEqual(len(self.handler), 1)
+    self.assertIn(listener.on_event, self.handler)
+
+    self.handler.notify(1, 2)
+    self.assertEqual(self.calls, [('a', (1, 2))])
+
+    self.handler -= listener.on_event
+    self.assertNotIn(listener.on_event, self.handler)
+    self.handler.notify(3)
+    self.assertEqual(len(self.calls), 1)
+
+  def test_functions_are_kept_alive(self):
+    calls = self.calls
+    self.handler += lambda value: calls.append(value)
+    gc.collect()
+    self.handler.notify(5)
+    self.assertEqual(calls, [5])
+
+  def test_methods_are_weak(self):
+    listener = Listener(self.calls, 'a')
+    self.handler += listener.on_event
+    del listener
+    gc.collect()
+    self.assertEqual(len(self.handler), 0)
+    self.handler.notify()
+    self.assertEqual(self.calls, [])
+
+  def test_methods_of_slotted_objects(self):
+    listener = SlottedListener(self.calls)
+    self.handler += listener.on_event
+    self.assertIn(listener.on_event, self.handler)
+    gc.collect()
+    self.handler.notify(1)
+    self.assertEqual(self.calls, [(1,)])
+
+    self.handler -= listener.on_event
+    self.assertEqual(len(self.handler), 0)
+    self.handler.notify(2)
+    self.assertEqual(self.calls, [(1,)])
+
+  def test_priority(self):
+    self.handler.add(lambda: self.calls.append('low'), priority=-1)
+    self.handler.add(lambda: self.calls.append('first'))
+    self.handler.add(lambda: self.calls.append('high'), priority=5)
+    self.handler.add(lambda: self.calls.append('second'))
+    self.handler.notify()
+    self.assertEqual(self.calls, ['high', 'first', 'second', 'low'])
+
+  def test_remove_during_notify(self):
+    second = Listener(self.calls, 'second')
+    third = Listener(self.calls, 'third')
+
+    def first():
+      # Removing itself must not skip the next handler, removing a later one stops it being called
+      self.calls.append('first')
+      self.handler -= first
+      self.handler -= third.on_event
+
+    self.handler += first
+    self.handler += second.on_event
+    self.handler += third.on_event
+    self.handler.notify()
+    self.assertEqual(self.calls, ['first', ('second', ())])
+
+  def test_add_during_notify(self):
+    def late():
+      self.calls.append('late')
+
+    def first():
+      self.calls.append('first')
+      self.handler += late
+
+    self.handler += first
+    self.handler.notify()
+    self.assertEqual(self.calls, ['first'])
+    self.handler.notify()
+    self.assertEqual(self.calls, ['first', 'first', 'late'])
+
+  def test_clear(self):
+    self.handler += lambda: self.calls.append('a')
+    self.handler.clear()
+    self.handler.notify()
+    self.assertEqual(self.calls, [])
+    self.assertEqual(len(self.handler), 0)
+
+
+class TestEngineHandlers(unittest.TestCase):
+
+  def test_init_replaces_handlers(self):
+    CardEngine.init(100, 100, headless=True)
+    calls = []
+    CardEngine.keyPress += calls.append
+    self.assertIn(calls.append, CardEngine.keyPress)
+
+    CardEngine.init(100, 100, headless=True)
+    self.assertNotIn(calls.append, CardEngine.keyPress)
+    self.assertEqual(len(CardEngine.mouseClick), 1)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
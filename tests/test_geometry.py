@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_geometry
+----------------------------------
+
+Tests for batch transforms with `PointArray`, `fan_layout`, and the `Point` transforms they mirror.
+
+"""
+
+import math
+import random
+import unittest
+
+from python_card_game.engine import geometry, hitbox
+from python_card_game.engine.geometry import PointArray, cos_sin, fan_layout
+from python_card_game.engine.hitbox import Point, SquareHitbox
+
+
+class TestPoint(unittest.TestCase):
+
+  def test_rotate_counterclockwise(self):
+    point = Point(10, 0)
+    point.rotate_counterclockwise(math.pi / 2, 0, 0)
+    self.assertAlmostEqual(point.x, 0)
+    self.assertAlmostEqual(point.y, -10)
+
+    # Undoes a clockwise rotation about the same point
+    point = Point(3, 4)
+    point.rotate_clockwise(0.5, 1, 1)
+    point.rotate_counterclockwise(0.5, 1, 1)
+    self.assertAlmostEqual(point.x, 3)
+    self.assertAlmostEqual(point.y, 4)
+
+  def test_scale_keeps_side(self):
+    point = Point(-4, 2)
+    point.scale(0, 0, 2)
+    self.assertEqual((point.x, point.y), (-8, 4))
+
+  def test_reflect(self):
+    point = Point(1, 2)
+    point.reflect('x')
+    point.reflect('Y')
+    self.assertEqual((point.x, point.y), (-1, -2))
+
+
+class PointArrayTests(object):
+  # Every batch transform matches doing the same to each Point.  Run with and without NumPy below.
+  useNumpy = False
+
+  def setUp(self):
+    generator = random.Random(5)
+    self.pairs = [(generator.uniform(-100, 100), generator.uniform(-100, 100)) for i in range(50)]
+
+  def check(self, transform_array, transform_point):
+    array = PointArray.from_pairs(self.pairs, self.useNumpy)
+    transform_array(array)
+    for (x, y), (px, py) in zip(array, self.pairs):
+      point = Point(px, py)
+      transform_point(point)
+      self.assertAlmostEqual(x, point.x)
+      self.assertAlmostEqual(y, point.y)
+
+  def test_translate(self):
+    self.check(lambda array: array.translate(3, -2), lambda point: point.translate(3, -2))
+
+  def test_rotate(self):
+    for angle in (0.3, math.radians(30), math.radians(-90)):
+      self.check(lambda array: array.rotate_clockwise(angle, 5, 7),
+                 lambda point: point.rotate_clockwise(angle, 5, 7))
+      self.check(lambda array: array.rotate_counterclockwise(angle, 5, 7),
+                 lambda point: point.rotate_counterclockwise(angle, 5, 7))
+
+  def test_scale(self):
+    self.check(lambda array: array.scale(1, 2, 1.5), lambda point: point.scale(1, 2, 1.5))
+
+  def test_reflect(self):
+    self.check(lambda array: array.reflect('x').reflect('y'), lambda point: (point.reflect('x'), point.reflect('y')))
+
+  def test_rotate_each(self):
+    angles = [i * 0.1 for i in range(len(self.pairs))]
+    array = PointArray.from_pairs(self.pairs, self.useNumpy).rotate_each_clockwise(angles, 2, 3)
+    for (x, y), (px, py), angle in zip(array, self.pairs, angles):
+      point = Point(px, py)
+      point.rotate_clockwise(angle, 2, 3)
+      self.assertAlmostEqual(x, point.x)
+      self.assertAlmostEqual(y, point.y)
+    self.assertRaises(ValueError, array.rotate_each_clockwise, [0.0], 0, 0)
+
+  def test_conversions(self):
+    points = [Point(1, 2), Point(3, 4)]
+    array = PointArray.from_points(points, self.useNumpy)
+    self.assertEqual(len(array), 2)
+    self.assertEqual(array.to_pairs(), [(1, 2), (3, 4)])
+    self.assertEqual([(point.x, point.y) for point in array.to_points()], [(1, 2), (3, 4)])
+    self.assertEqual(array.bounds(), (1, 2, 3, 4))
+    copy = array.copy().translate(1, 1)
+    self.assertEqual(array.to_pairs(), [(1, 2), (3, 4)])
+    self.assertEqual(copy.to_pairs(), [(2, 3), (4, 5)])
+
+
+class TestPythonPointArray(PointArrayTests, unittest.TestCase):
+  useNumpy = False
+
+
+@unittest.skipIf(geometry.numpy is None, "numpy is not installed")
+class TestNumpyPointArray(PointArrayTests, unittest.TestCase):
+  useNumpy = True
+
+
+class TestTrig(unittest.TestCase):
+
+  def test_exact(self):
+    for angle in (0, math.radians(30), math.radians(-30), math.radians(720), 0.123):
+      self.assertEqual(cos_sin(angle), (math.cos(angle), math.sin(angle)))
+      self.assertEqual(cos_sin(angle), (math.cos(angle), math.sin(angle)))
+
+  def test_shared_with_hitbox(self):
+    self.assertIs(cos_sin, hitbox.cos_sin)
+
+
+class TestFanLayout(unittest.TestCase):
+
+  def test_symmetric(self):
+    layout = fan_layout(5, 400, 500, 200, spread_degrees=40, card_width=72)
+    self.assertEqual(len(layout), 5)
+    self.assertEqual([angle for x, y, angle in layout], [20, 10, 0, -10, -20])
+
+    # The middle card stands upright above the pivot
+    x, y, angle = layout[2]
+    self.assertAlmostEqual(x, 400 - 36)
+    self.assertAlmostEqual(y, 300)
+
+    # Mirror images either side of the middle
+    for (left_x, left_y, left_angle), (right_x, right_y, right_angle) in zip(layout, reversed(layout)):
+      self.assertEqual(left_angle, -right_angle)
+
+  def test_top_middle_on_arc(self):
+    width = 72
+    for x, y, angle in fan_layout(7, 400, 500, 250, spread_degrees=90, card_width=width):
+      hitbox = SquareHitbox(x, y, width, 100, angle)
+      a, b = hitbox.rotatedPoints[0], hitbox.rotatedPoints[1]
+      middle_x, middle_y = (a.x + b.x) / 2, (a.y + b.y) / 2
+      self.assertAlmostEqual(math.hypot(middle_x - 400, middle_y - 500), 250)
+
+  def test_small_hands(self):
+    self.assertEqual(fan_layout(0, 0, 0, 10), [])
+    self.assertEqual(len(fan_layout(1, 0, 0, 10)), 1)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
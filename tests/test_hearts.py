@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_hearts
+----------------------------------
+
+Tests for headless `Hearts` games and the simulation runner.
+
+"""
+
+import unittest
+
+import os
+import random
+import sys
+
+from engine import bitboard
+from game import Heart2, simulation
+from player import AI
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python_card_game', 'ui'))
+
+# Run without a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+try:
+  import pygame
+except ImportError:
+  pygame = None
+else:
+  import Assets
+  import UI
+
+
+class TestHearts(unittest.TestCase):
+
+  def setUp(self):
+    self.game = Heart2.Hearts(headless=True, seed=3)
+
+  def tearDown(self):
+    pass
+
+  def test_deal(self):
+    self.game.deal()
+    hands = [player.hand for player in self.game.players]
+    self.assertEqual([len(hand) for hand in hands], [13] * 4)
+    self.assertEqual(len(set(card for hand in hands for card in hand)), 52)
+    self.assertEqual(len(self.game.deck), 52)
+
+  def test_card_image_paths(self):
+    paths = Heart2.card_image_paths()
+    self.assertEqual(len(paths), 56)
+    for path in paths:
+      self.assertTrue(os.path.isfile(path), path)
+    self.assertTrue(Heart2.card_image_path(Heart2.SPADES, 12).endswith("Queen of Spades.png"))
+
+  def test_atlas_path_outside_package(self):
+    old = os.environ.get("XDG_CACHE_HOME")
+    os.environ["XDG_CACHE_HOME"] = os.path.join(os.sep, "tmp", "cache")
+    try:
+      path = Heart2.atlas_path()
+    finally:
+      if old is None:
+        del os.environ["XDG_CACHE_HOME"]
+      else:
+        os.environ["XDG_CACHE_HOME"] = old
+    self.assertTrue(path.startswith(os.path.join(os.sep, "tmp", "cache", "python_card_game")), path)
+    self.assertFalse(path.startswith(Heart2.resourcePath))
+
+  def test_legal_cards_first_lead(self):
+    player = Heart2.Player("test", None)
+    player.hand = [Heart2.Cards.PlayingCard(Heart2.HEARTS, 5), Heart2.TWO_OF_CLUBS]
+    self.assertEqual(self.game.legal_cards(player, []), [Heart2.TWO_OF_CLUBS])
+
+  def test_legal_cards_follow_suit(self):
+    self.game.firstTrick = False
+    player = Heart2.Player("test", None)
+    spade = Heart2.Cards.PlayingCard(Heart2.SPADES, 4)
+    heart = Heart2.Cards.PlayingCard(Heart2.HEARTS, 9)
+    player.hand = [spade, heart]
+    self.assertEqual(self.game.legal_cards(player, [Heart2.Cards.PlayingCard(Heart2.SPADES, 10)]), [spade])
+    self.assertEqual(self.game.legal_cards(player, [Heart2.TWO_OF_CLUBS]), [spade, heart])
+
+    # Hearts may not be led until broken
+    self.assertEqual(self.game.legal_cards(player, []), [spade])
+    self.game.heartsBroken = True
+    self.assertEqual(self.game.legal_cards(player, []), [spade, heart])
+
+  def test_legal_moves_matches_legal_cards(self):
+    rng = random.Random(0)
+    player = Heart2.Player("test", None)
+    for i in range(500):
+      self.game.firstTrick = rng.random() < 0.2
+      self.game.heartsBroken = rng.random() < 0.5
+      deck = rng.sample(self.game.deck, 14)
+      player.hand = deck[1:rng.randint(2, 14)]
+      trick = [deck[0]] if rng.random() < 0.7 else []
+      lead_suit = trick[0].suit if trick else None
+
+      expected = bitboard.mask_from_cards(self.game.legal_cards(player, trick))
+      mask = Heart2.legal_moves(bitboard.mask_from_cards(player.hand), lead_suit,
+                                self.game.heartsBroken, self.game.firstTrick)
+      self.assertEqual(mask, expected)
+
+  def test_play_round(self):
+    points = self.game.play_round()
+    self.assertIn(sum(points), (26, 78))
+    self.assertTrue(all(not player.hand for player in self.game.players))
+
+  def test_play_game_is_reproducible(self):
+    scores = self.game.play_game()
+    self.assertTrue(max(scores) >= 100)
+    self.assertEqual(Heart2.Hearts(headless=True, seed=3).play_game(), scores)
+
+  def test_lowest_card_ai(self):
+    players = [Heart2.Player(str(i), AI.LowestCardAI()) for i in range(4)]
+    game = Heart2.Hearts(headless=True, seed=1, players=players)
+    game.play_round()
+    self.assertEqual(game.rounds, 1)
+
+
+class TestSimulation(unittest.TestCase):
+
+  def test_in_process(self):
+    streamed = []
+    results = simulation.run_simulation(6, processes=1, seed=10, callback=streamed.append)
+    self.assertEqual(results.games, 6)
+    self.assertEqual(len(streamed), 6)
+    self.assertAlmostEqual(sum(results.win_rates()), 1.0)
+    self.assertEqual(sum(count for score, count in results.score_distribution(0)), 6)
+
+  def test_pool_matches_in_process(self):
+    serial = sorted(simulation.iter_games(4, processes=1, seed=20), key=lambda r: r["game"])
+    pooled = sorted(simulation.iter_games(4, processes=2, seed=20, chunksize=1), key=lambda r: r["game"])
+    self.assertEqual(serial, pooled)
+
+  def test_ai_classes(self):
+    results = simulation.run_simulation(2, processes=1, seed=1, ai_classes=[AI.LowestCardAI, AI.RandomAI])
+    self.assertEqual(len(results.win_rates()), 2)
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestHeartsDisplay(unittest.TestCase):
+
+  def setUp(self):
+    self.game = Heart2.Hearts(headless=True, seed=3)
+    pygame.display.set_mode((1, 1), 0, 32)
+
+  def tearDown(self):
+    Heart2.Cards.CardEngine.remove_all_ui_elements()
+    pygame.display.quit()
+
+  def test_card_displays_share_atlas(self):
+    atlas = self.game.load_atlas(Assets.CardAtlas, cache=False)
+
+    # No card may load an image of its own
+    loads = []
+    Assets.ASSETS.load = lambda path: loads.append(path)
+    try:
+      displays = self.game.create_card_displays(UI.Card, atlas)
+    finally:
+      del Assets.ASSETS.load
+
+    self.assertEqual(loads, [])
+    self.assertEqual(set(displays), set(self.game.deck))
+    for card, display in displays.items():
+      self.assertEqual((display.suit, display.value), (card.suit, card.value))
+      self.assertIs(display._surfaceFront, atlas.front(card.suit, card.value))
+      self.assertIs(display._surfaceFront.get_parent(), atlas.surface)
+      self.assertIs(display._surfaceBack, atlas.back())
+
+
+if __name__ == '__main__':
+  sys.exit(unittest.main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_hitbox
+----------------------------------
+
+Tests for `SquareHitbox` collision, bounds and its Point based attributes.
+
+"""
+
+import math
+import random
+import unittest
+
+from python_card_game.engine.hitbox import Point, SquareHitbox, Vector
+
+
+def reference_collide(hitbox, x, y):
+  # The original Vector based test, worked out from the rotated corner Points.
+  points = hitbox.rotatedPoints
+  vector_am = Vector(points[0].x - x, points[0].y - y)
+  vector_ab = Vector(points[0].x - points[1].x, points[0].y - points[1].y)
+  vector_ad = Vector(points[0].x - points[3].x, points[0].y - points[3].y)
+  return (0 <= vector_am * vector_ab < vector_ab * vector_ab and
+          0 <= vector_am * vector_ad < vector_ad * vector_ad)
+
+
+class TestSquareHitbox(unittest.TestCase):
+
+  def test_unrotated(self):
+    hitbox = SquareHitbox(10, 20, 30, 40, 0)
+    self.assertEqual(hitbox.get_bounds(), (10, 20, 40, 60))
+    self.assertTrue(hitbox.collide(10, 20))
+    self.assertTrue(hitbox.collide(39, 59))
+    # The far edges are outside
+    self.assertFalse(hitbox.collide(40, 30))
+    self.assertFalse(hitbox.collide(20, 60))
+    self.assertFalse(hitbox.collide(9, 30))
+
+  def test_rotated_bounds(self):
+    hitbox = SquareHitbox(0, 0, 10, 20, 90)
+    left, top, right, bottom = hitbox.get_bounds()
+    self.assertAlmostEqual(left, 0)
+    self.assertAlmostEqual(top, -10)
+    self.assertAlmostEqual(right, 20)
+    self.assertAlmostEqual(bottom, 0)
+    self.assertTrue(hitbox.collide(5, -5))
+    self.assertFalse(hitbox.collide(5, 5))
+
+  def test_update(self):
+    hitbox = SquareHitbox(0, 0, 10, 10, 0)
+    hitbox.update(100, 100)
+    self.assertFalse(hitbox.collide(5, 5))
+    self.assertTrue(hitbox.collide(105, 105))
+    hitbox.update(width=50, angle=45)
+    self.assertEqual((hitbox.x, hitbox.y, hitbox.width, hitbox.height), (100, 100, 50, 10))
+    self.assertAlmostEqual(hitbox.angle, math.radians(45))
+
+  def test_points(self):
+    hitbox = SquareHitbox(1, 2, 3, 4, 0)
+    self.assertEqual([(point.x, point.y) for point in hitbox.points], [(1, 2), (4, 2), (4, 6), (1, 6)])
+    rotated = hitbox.rotatedPoints
+    self.assertEqual(len(rotated), 4)
+    self.assertTrue(all(isinstance(point, Point) for point in rotated))
+    self.assertEqual([(point.x, point.y) for point in rotated], [(1, 2), (4, 2), (4, 6), (1, 6)])
+
+  def test_matches_vector_test(self):
+    generator = random.Random(3)
+    for i in range(500):
+      hitbox = SquareHitbox(generator.uniform(-50, 500), generator.uniform(-50, 500),
+                            generator.uniform(1, 120), generator.uniform(1, 120),
+                            generator.choice((0, 90, 180, 270, generator.uniform(-720, 720))))
+      corners = hitbox.rotatedPoints
+      for j in range(20):
+        if j < 4:
+          x, y = corners[j].x, corners[j].y
+        else:
+          x, y = generator.uniform(-200, 700), generator.uniform(-200, 700)
+        self.assertEqual(hitbox.collide(x, y), reference_collide(hitbox, x, y))
+
+  def test_slots(self):
+    hitbox = SquareHitbox(0, 0, 10, 10, 0)
+    self.assertRaises(AttributeError, setattr, hitbox, 'extra', 1)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_hitboxset
+----------------------------------
+
+Tests for batched hit-testing with `HitboxSet`, with and without NumPy.
+
+"""
+
+import random
+import unittest
+
+from python_card_game.engine import hitboxset
+from python_card_game.engine.hitbox import SquareHitbox
+from python_card_game.engine.hitboxset import HitboxSet
+
+
+def random_hitboxes(generator, count):
+  return [SquareHitbox(generator.uniform(0, 700), generator.uniform(0, 500),
+                       generator.uniform(20, 100), generator.uniform(20, 100),
+                       generator.choice((0, 90, generator.uniform(0, 360))))
+          for i in range(count)]
+
+
+class HitboxSetTests(object):
+  # Run against both implementations by the subclasses below.
+  useNumpy = False
+
+  def make(self, hitboxes=(), zs=None):
+    return HitboxSet(hitboxes, zs, use_numpy=self.useNumpy)
+
+  def test_point_matches_collide(self):
+    generator = random.Random(7)
+    hitboxes = random_hitboxes(generator, 200)
+    zs = [generator.randrange(5) for hitbox in hitboxes]
+    hitbox_set = self.make(hitboxes, zs)
+    self.assertEqual(len(hitbox_set), 200)
+    for i in range(300):
+      x, y = generator.uniform(0, 800), generator.uniform(0, 600)
+      expected = [index for index, hitbox in enumerate(hitboxes) if hitbox.collide(x, y)]
+      expected.sort(key=lambda index: (zs[index], index))
+      self.assertEqual(hitbox_set.query_point(x, y), expected)
+
+  def test_sorted_by_z(self):
+    hitboxes = [SquareHitbox(0, 0, 10, 10, 0) for i in range(4)]
+    hitbox_set = self.make(hitboxes, [3, 1, 3, 0])
+    self.assertEqual(hitbox_set.query_point(5, 5), [3, 1, 0, 2])
+
+  def test_rect(self):
+    hitbox_set = self.make([SquareHitbox(0, 0, 10, 10, 0),
+                            SquareHitbox(100, 100, 10, 10, 0),
+                            SquareHitbox(50, 50, 40, 40, 45)])
+    self.assertEqual(hitbox_set.query_rect(-5, -5, 5, 5), [0])
+    self.assertEqual(hitbox_set.query_rect(-5, -5, 200, 200), [0, 1, 2])
+    self.assertEqual(hitbox_set.query_rect(20, 20, 30, 30), [])
+    # Inside the bounds of the diamond, but past its corner
+    self.assertEqual(hitbox_set.query_rect(52, 20, 55, 24), [])
+    self.assertEqual(hitbox_set.query_rect(60, 50, 65, 55), [2])
+
+  def test_small_rect_matches_point(self):
+    generator = random.Random(11)
+    hitboxes = random_hitboxes(generator, 100)
+    hitbox_set = self.make(hitboxes)
+    for i in range(300):
+      x, y = generator.uniform(0, 800), generator.uniform(0, 600)
+      self.assertEqual(hitbox_set.query_rect(x, y, x, y), hitbox_set.query_point(x, y))
+
+  def test_set_and_clear(self):
+    hitbox = SquareHitbox(0, 0, 10, 10, 0)
+    hitbox_set = self.make([hitbox])
+    hitbox.update(100, 100)
+    self.assertEqual(hitbox_set.query_point(105, 105), [])
+    hitbox_set.set(0, hitbox)
+    self.assertEqual(hitbox_set.query_point(105, 105), [0])
+    self.assertRaises(IndexError, hitbox_set.set, 1, hitbox)
+
+    hitbox_set.clear()
+    self.assertEqual(len(hitbox_set), 0)
+    self.assertEqual(hitbox_set.query_point(105, 105), [])
+    self.assertEqual(hitbox_set.append(hitbox), 0)
+
+  def test_grows(self):
+    hitbox_set = self.make()
+    for i in range(100):
+      hitbox_set.append(SquareHitbox(i * 10, 0, 10, 10, 0), z=-i)
+    self.assertEqual(hitbox_set.query_rect(0, 0, 25, 5), [2, 1, 0])
+
+
+class TestPythonHitboxSet(HitboxSetTests, unittest.TestCase):
+  useNumpy = False
+
+
+@unittest.skipIf(hitboxset.numpy is None, "numpy is not installed")
+class TestNumpyHitboxSet(HitboxSetTests, unittest.TestCase):
+  useNumpy = True
+
+
+class TestNumpyOption(unittest.TestCase):
+
+  def test_default(self):
+    self.assertEqual(HitboxSet().useNumpy, hitboxset.numpy is not None)
+
+  @unittest.skipIf(hitboxset.numpy is not None, "numpy is installed")
+  def test_numpy_required(self):
+    self.assertRaises(ImportError, HitboxSet, use_numpy=True)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
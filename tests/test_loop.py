@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_loop
+----------------------------------
+
+Tests for the fixed-timestep `GameLoop` and `CardEngine.run`, using a fake clock.
+
+"""
+
+import unittest
+
+from python_card_game.engine import CardEngine, Event, EventType
+from python_card_game.engine.loop import GameLoop
+
+
+class FakeClock(object):
+  # Time only moves when the loop sleeps or a test advances it.
+
+  def __init__(self):
+    self.now = 0.0
+    self.slept = []
+
+  def __call__(self):
+    return self.now
+
+  def sleep(self, seconds):
+    self.slept.append(seconds)
+    self.now += seconds
+
+
+class TestGameLoop(unittest.TestCase):
+
+  def setUp(self):
+    self.clock = FakeClock()
+    self.calls = []
+
+  def loop(self, **options):
+    return GameLoop(clock=self.clock, sleep=self.clock.sleep, **options)
+
+  def test_fixed_steps(self):
+    loop = self.loop(fps=30, tick_rate=60)
+    steps = []
+    loop.run(lambda: None, lambda: None, tick=steps.append, max_frames=10)
+    self.assertEqual(loop.frames, 10)
+    # Each 1/30 s frame runs two 1/60 s steps, apart from the first frame where no time has passed yet
+    self.assertTrue(16 <= len(steps) <= 18)
+    self.assertTrue(all(abs(step - 1.0 / 60) < 1e-9 for step in steps))
+
+  def test_frame_pacing(self):
+    loop = self.loop(fps=50)
+    loop.run(lambda: None, lambda: None, max_frames=5)
+    self.assertEqual(len(self.clock.slept), 4)
+    self.assertTrue(all(abs(seconds - 0.02) < 1e-9 for seconds in self.clock.slept))
+
+  def test_frame_skip(self):
+    loop = self.loop(fps=60, tick_rate=60, max_frame_skip=3)
+    steps = []
+
+    def slow_render():
+      # A render taking a whole second
+      self.clock.now += 1.0
+
+    loop.run(lambda: None, slow_render, tick=steps.append, max_frames=3)
+    # At most three steps per render, the rest of the time is dropped
+    self.assertEqual(len(steps), 6)
+    self.assertTrue(loop.droppedTicks > 0)
+
+  def test_idle_without_wait_ends(self):
+    loop = self.loop()
+    loop.run(lambda: self.calls.append('update'), lambda: None, idle=lambda: True)
+    self.assertEqual(self.calls, [])
+    self.assertFalse(loop.running)
+
+  def test_idle_waits(self):
+    loop = self.loop()
+    pending = []
+
+    def wait():
+      # Nothing happens for ten seconds, then an event arrives
+      self.clock.now += 10.0
+      pending.append('event')
+
+    def update():
+      self.calls.append(list(pending))
+      del pending[:]
+
+    steps = []
+    loop.run(update, lambda: None, tick=steps.append, idle=lambda: not pending, wait=wait, max_frames=1)
+    self.assertEqual(self.calls, [['event']])
+    # The time spent waiting is not caught up on
+    self.assertEqual(steps, [])
+
+  def test_stop(self):
+    loop = self.loop()
+    loop.run(loop.stop, lambda: self.calls.append('render'))
+    self.assertEqual(self.calls, [])
+
+
+class TestEngineRun(unittest.TestCase):
+
+  def setUp(self):
+    CardEngine.init(100, 100, headless=True)
+
+  def tearDown(self):
+    CardEngine.remove_all_ui_elements()
+
+  def test_headless_run_ends_when_idle(self):
+    keys = []
+    CardEngine.keyPress += keys.append
+    CardEngine.post_event(Event(EventType.KEYDOWN, key=32))
+    CardEngine.run(fps=0)
+    self.assertEqual(len(keys), 1)
+    self.assertTrue(CardEngine.is_idle())
+
+  def test_animation_keeps_running(self):
+    steps = []
+
+    def animate(seconds):
+      steps.append(seconds)
+      if len(steps) == 3:
+        CardEngine.gameTick -= animate
+
+    CardEngine.gameTick += animate
+    CardEngine.run(fps=0, tick_rate=1000)
+    self.assertEqual(len(steps), 3)
+
+  def test_quit_stops(self):
+    CardEngine.gameTick += lambda seconds: None
+    CardEngine.post_event(Event(EventType.QUIT))
+    CardEngine.run(fps=0)
+    self.assertEqual(CardEngine.loop.frames, 0)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
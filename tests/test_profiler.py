@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_profiler
+----------------------------------
+
+Tests for the `Profiler` timings and profiling a headless `CardEngine`.
+
+"""
+
+import csv
+import json
+import unittest
+from StringIO import StringIO
+
+from python_card_game.engine import CardEngine, Event, EventHandler, EventType
+from python_card_game.engine.profiler import NOTIFY, Profiler, RollingStats
+
+
+class FakeClock(object):
+
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+
+class TestRollingStats(unittest.TestCase):
+
+  def test_window(self):
+    stats = RollingStats(size=10)
+    for sample in range(100):
+      stats.add(sample / 1000.0)
+    self.assertEqual(stats.count, 100)
+    self.assertEqual(len(stats.samples), 10)
+    self.assertAlmostEqual(stats.percentile(0), 0.090)
+    self.assertAlmostEqual(stats.percentile(100), 0.099)
+
+  def test_summary_in_milliseconds(self):
+    stats = RollingStats()
+    for sample in (0.001, 0.002, 0.003):
+      stats.add(sample)
+    summary = stats.summary()
+    self.assertAlmostEqual(summary['mean'], 2.0)
+    self.assertAlmostEqual(summary['p50'], 2.0)
+    self.assertAlmostEqual(summary['max'], 3.0)
+
+  def test_empty(self):
+    self.assertEqual(RollingStats().percentile(95), 0.0)
+    self.assertEqual(RollingStats().summary()['mean'], 0.0)
+
+
+class TestProfiler(unittest.TestCase):
+
+  def setUp(self):
+    self.clock = FakeClock()
+    self.profiler = Profiler(clock=self.clock)
+
+  def test_time_block(self):
+    with self.profiler.time('phase', 'update'):
+      self.clock.now += 0.004
+    self.assertAlmostEqual(self.profiler.stats('phase', 'update').mean(), 0.004)
+    self.assertIsNone(self.profiler.stats('phase', 'render'))
+
+  def test_frames(self):
+    frames = []
+    self.profiler.frameEnded += frames.append
+    for i in range(3):
+      self.clock.now += 0.016
+      self.profiler.end_frame()
+    self.assertEqual(self.profiler.frames, 3)
+    self.assertEqual(len(frames), 3)
+    self.assertEqual(self.profiler.stats('phase', 'frame').count, 2)
+
+  def test_handler_notify_is_timed(self):
+    handler = EventHandler('clicked')
+    handler.profiler = self.profiler
+
+    def slow(value):
+      self.clock.now += 0.01
+
+    handler += slow
+    handler.notify(1)
+    self.assertAlmostEqual(self.profiler.stats(NOTIFY, 'clicked').mean(), 0.01)
+
+  def test_dumps(self):
+    self.profiler.record('render', 'Card', 0.002)
+    self.profiler.record('render', 'Text', 0.001)
+    self.profiler.record('phase', 'update', 0.003)
+
+    output = StringIO()
+    self.profiler.dump_json(output)
+    data = json.loads(output.getvalue())
+    self.assertAlmostEqual(data['timings']['render']['Card']['mean'], 2.0)
+
+    output = StringIO()
+    self.profiler.dump_csv(output)
+    rows = list(csv.reader(StringIO(output.getvalue())))
+    self.assertEqual(tuple(rows[0]), Profiler.COLUMNS)
+    # Sorted by category, slowest first
+    self.assertEqual([row[:2] for row in rows[1:]], [['phase', 'update'], ['render', 'Card'], ['render', 'Text']])
+    self.assertEqual(len(self.profiler.report(limit=2)), 2)
+
+
+class TestEngineProfiling(unittest.TestCase):
+
+  def setUp(self):
+    CardEngine.init(100, 100, headless=True)
+    self.profiler = CardEngine.enable_profiling()
+
+  def tearDown(self):
+    CardEngine.disable_profiling()
+    CardEngine.remove_all_ui_elements()
+
+  def test_phases_and_handlers(self):
+    CardEngine.keyPress += lambda event: None
+    CardEngine.post_event(Event(EventType.KEYDOWN, key=32))
+    CardEngine.run(fps=0)
+    self.assertEqual(self.profiler.stats('phase', 'update').count, 1)
+    self.assertEqual(self.profiler.stats(NOTIFY, 'keyPress').count, 1)
+    self.assertEqual(self.profiler.frames, 1)
+
+  def test_profiler_survives_init(self):
+    CardEngine.init(100, 100, headless=True)
+    self.assertIs(CardEngine.keyPress.profiler, self.profiler)
+    CardEngine.disable_profiling()
+    self.assertIsNone(CardEngine.keyPress.profiler)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_router
+----------------------------------
+
+Tests for `EventRouter` and event delivery to UI elements in `CardEngine`.
+
+"""
+
+import unittest
+
+from python_card_game.engine import CardEngine, Event, EventType, MouseButton
+from python_card_game.engine.router import EventRouter
+from python_card_game.engine.spatial import GridIndex
+
+MOUSE = (EventType.MOUSEMOTION, EventType.MOUSEBUTTONDOWN, EventType.MOUSEBUTTONUP)
+KEYBOARD = (EventType.KEYDOWN, EventType.KEYUP)
+
+
+class FakeElement(object):
+  # Rectangle that records the events it is handed.
+
+  def __init__(self, left, top, right, bottom, z=0, event_types=MOUSE):
+    self.z = z
+    self.bounds = (left, top, right, bottom)
+    self.eventTypes = event_types
+    self.events = []
+
+  def handle_event(self, event):
+    self.events.append(event)
+
+  def collide(self, x, y):
+    left, top, right, bottom = self.bounds
+    return left <= x <= right and top <= y <= bottom
+
+  def get_bounds(self):
+    return self.bounds
+
+
+def mouse(event_type, x, y):
+  return Event(event_type, pos=(x, y), button=MouseButton.LEFT)
+
+
+class TestEventRouter(unittest.TestCase):
+
+  def setUp(self):
+    self.router = EventRouter(EventType, cell_size=32)
+
+  def test_mouse_goes_to_hit_elements(self):
+    under = FakeElement(0, 0, 50, 50)
+    elsewhere = FakeElement(200, 200, 250, 250)
+    self.router.register(under, MOUSE)
+    self.router.register(elsewhere, MOUSE)
+
+    self.assertEqual(self.router.dispatch(mouse(EventType.MOUSEBUTTONDOWN, 10, 10)), 1)
+    self.assertEqual(len(under.events), 1)
+    self.assertEqual(elsewhere.events, [])
+
+  def test_only_registered_types(self):
+    clicks = FakeElement(0, 0, 50, 50)
+    self.router.register(clicks, (EventType.MOUSEBUTTONDOWN,))
+    self.router.dispatch(mouse(EventType.MOUSEMOTION, 10, 10))
+    self.router.dispatch(Event(EventType.KEYDOWN, key=32))
+    self.assertEqual(clicks.events, [])
+
+  def test_region(self):
+    element = FakeElement(0, 0, 50, 50)
+    self.router.register(element, MOUSE, region=(100, 100, 150, 150))
+    self.router.dispatch(mouse(EventType.MOUSEMOTION, 10, 10))
+    self.assertEqual(element.events, [])
+    self.router.dispatch(mouse(EventType.MOUSEMOTION, 120, 120))
+    self.assertEqual(len(element.events), 1)
+
+  def test_hovered_sees_mouse_leave(self):
+    button = FakeElement(0, 0, 50, 50)
+    self.router.register(button, MOUSE)
+    self.router.dispatch(mouse(EventType.MOUSEMOTION, 10, 10))
+    self.router.dispatch(mouse(EventType.MOUSEMOTION, 100, 100))
+    self.router.dispatch(mouse(EventType.MOUSEMOTION, 110, 110))
+    self.assertEqual([event.pos for event in button.events], [(10, 10), (100, 100)])
+
+  def test_pressed_sees_release(self):
+    button = FakeElement(0, 0, 50, 50)
+    self.router.register(button, (EventType.MOUSEBUTTONDOWN, EventType.MOUSEBUTTONUP))
+    self.router.dispatch(mouse(EventType.MOUSEBUTTONDOWN, 10, 10))
+    self.router.dispatch(mouse(EventType.MOUSEBUTTONUP, 100, 100))
+    self.assertEqual([event.type for event in button.events],
+                     [EventType.MOUSEBUTTONDOWN, EventType.MOUSEBUTTONUP])
+
+  def test_keyboard_goes_to_focus(self):
+    first = FakeElement(0, 0, 50, 50, event_types=MOUSE + KEYBOARD)
+    second = FakeElement(100, 0, 150, 50, event_types=MOUSE + KEYBOARD)
+    self.router.register(first, first.eventTypes)
+    self.router.register(second, second.eventTypes)
+
+    key = Event(EventType.KEYDOWN, key=32)
+    self.assertEqual(self.router.dispatch(key), 0)
+
+    # Clicking an element focuses it
+    self.router.dispatch(mouse(EventType.MOUSEBUTTONDOWN, 120, 10))
+    self.router.dispatch(mouse(EventType.MOUSEBUTTONUP, 120, 10))
+    self.assertIs(self.router.focus, second)
+    self.router.dispatch(key)
+    self.assertEqual(second.events[-1], key)
+    self.assertNotIn(key, first.events)
+
+    # The focused element sees the click that takes focus away
+    self.router.dispatch(mouse(EventType.MOUSEBUTTONDOWN, 300, 300))
+    self.router.dispatch(mouse(EventType.MOUSEBUTTONUP, 300, 300))
+    self.assertEqual(second.events[-1].pos, (300, 300))
+    self.assertIsNone(self.router.focus)
+
+  def test_focus_topmost_by_key(self):
+    router = EventRouter(EventType, key=lambda element: element.z)
+    top = FakeElement(0, 0, 50, 50, z=5, event_types=MOUSE + KEYBOARD)
+    bottom = FakeElement(0, 0, 50, 50, z=1, event_types=MOUSE + KEYBOARD)
+    router.register(top, top.eventTypes)
+    router.register(bottom, bottom.eventTypes)
+    router.dispatch(mouse(EventType.MOUSEBUTTONUP, 10, 10))
+    self.assertIs(router.focus, top)
+
+  def test_update_moves_element(self):
+    element = FakeElement(0, 0, 50, 50)
+    self.router.register(element, MOUSE)
+    element.bounds = (200, 200, 250, 250)
+    self.router.update(element)
+    self.router.dispatch(mouse(EventType.MOUSEMOTION, 10, 10))
+    self.assertEqual(element.events, [])
+    self.router.dispatch(mouse(EventType.MOUSEMOTION, 210, 210))
+    self.assertEqual(len(element.events), 1)
+
+  def test_unregister(self):
+    element = FakeElement(0, 0, 50, 50, event_types=MOUSE + KEYBOARD)
+    self.router.register(element, element.eventTypes)
+    self.router.set_focus(element)
+    self.router.unregister(element)
+    self.assertNotIn(element, self.router)
+    self.assertIsNone(self.router.focus)
+    self.assertEqual(self.router.dispatch(mouse(EventType.MOUSEMOTION, 10, 10)), 0)
+
+  def test_other_events_go_to_all_listeners(self):
+    first = FakeElement(0, 0, 50, 50)
+    second = FakeElement(100, 100, 150, 150)
+    self.router.register(first, (EventType.VIDEOEXPOSE,))
+    self.router.register(second, (EventType.VIDEOEXPOSE,))
+    self.assertEqual(self.router.dispatch(Event(EventType.VIDEOEXPOSE)), 2)
+
+  def test_shared_index(self):
+    # With the caller's index, elements registered without a region are found through it and not indexed again
+    index = GridIndex()
+    router = EventRouter(EventType, query_point=index.query_point)
+    element = FakeElement(0, 0, 50, 50)
+    keyboard_only = FakeElement(0, 0, 50, 50, event_types=KEYBOARD)
+    region = FakeElement(0, 0, 50, 50)
+    for other in (element, keyboard_only, region):
+      index.insert(other, other.get_bounds())
+    router.register(element, MOUSE)
+    router.register(keyboard_only, KEYBOARD)
+    router.register(region, MOUSE, region=(100, 100, 150, 150))
+    self.assertEqual(len(router._index), 1)
+
+    self.assertEqual(router.listeners(mouse(EventType.MOUSEMOTION, 10, 10)), [element])
+    self.assertEqual(router.listeners(mouse(EventType.MOUSEMOTION, 110, 110)), [region])
+    element.bounds = (200, 200, 250, 250)
+    index.update(element, element.bounds)
+    self.assertEqual(router.listeners(mouse(EventType.MOUSEMOTION, 210, 210)), [element])
+
+
+class TestEngineRouting(unittest.TestCase):
+
+  def setUp(self):
+    CardEngine.init(320, 240, headless=True)
+
+  def tearDown(self):
+    CardEngine.remove_all_ui_elements()
+
+  def test_engine_routes_to_elements(self):
+    under = FakeElement(0, 0, 50, 50)
+    elsewhere = FakeElement(100, 100, 150, 150)
+    CardEngine.add_ui_element(under)
+    CardEngine.add_ui_element(elsewhere)
+    CardEngine.post_event(mouse(EventType.MOUSEBUTTONDOWN, 10, 10))
+    CardEngine.update()
+    self.assertEqual(len(under.events), 1)
+    self.assertEqual(elsewhere.events, [])
+
+    CardEngine.remove_ui_element(under)
+    CardEngine.post_event(mouse(EventType.MOUSEBUTTONDOWN, 10, 10))
+    CardEngine.update()
+    self.assertEqual(len(under.events), 1)
+
+  def test_engine_index_is_shared(self):
+    # The router finds elements through the engine's index and keeps none of its own
+    element = FakeElement(0, 0, 50, 50)
+    CardEngine.add_ui_element(element)
+    self.assertEqual(len(CardEngine.eventRouter._index), 0)
+    element.bounds = (100, 100, 150, 150)
+    CardEngine.update_ui_element(element)
+    CardEngine.post_event(mouse(EventType.MOUSEBUTTONDOWN, 110, 110))
+    CardEngine.update()
+    self.assertEqual(len(element.events), 1)
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_shuffle
+----------------------------------
+
+Tests for the `Shuffler` and the `CardEngine` shuffle methods.
+
+"""
+
+import unittest
+
+from python_card_game.engine import CardEngine, Shuffler
+
+
+class TestShuffler(unittest.TestCase):
+
+  def setUp(self):
+    self.deck = range(52)
+
+  def tearDown(self):
+    pass
+
+  def test_shuffle_in_place(self):
+    deck = list(self.deck)
+    result = Shuffler(seed=1).shuffle(deck)
+    self.assertIs(result, deck)
+    self.assertEqual(sorted(deck), self.deck)
+    self.assertNotEqual(deck, self.deck)
+
+  def test_shuffled_copy(self):
+    result = Shuffler(seed=1).shuffled(self.deck)
+    self.assertIsNot(result, self.deck)
+    self.assertEqual(self.deck, range(52))
+    self.assertEqual(sorted(result), self.deck)
+
+  def test_seed_is_reproducible(self):
+    first = Shuffler(seed=7).shuffled(self.deck)
+    second = Shuffler(seed=7).shuffled(self.deck)
+    self.assertEqual(first, second)
+
+    shuffler = Shuffler(seed=7)
+    shuffler.shuffled(self.deck)
+    shuffler.seed(7)
+    self.assertEqual(shuffler.shuffled(self.deck), first)
+
+  def test_shuffle_all(self):
+    decks = [list(self.deck) for i in range(3)]
+    result = Shuffler(seed=3).shuffle_all(decks)
+    for deck, shuffled in zip(decks, result):
+      self.assertIs(deck, shuffled)
+      self.assertEqual(sorted(deck), self.deck)
+
+    copies = Shuffler(seed=3).shuffle_all([self.deck, self.deck], in_place=False)
+    self.assertEqual(copies[0], result[0])
+    self.assertEqual(self.deck, range(52))
+
+  def test_small_decks(self):
+    shuffler = Shuffler(seed=0)
+    self.assertEqual(shuffler.shuffled([]), [])
+    self.assertEqual(shuffler.shuffled([5]), [5])
+
+  def test_engine_shuffle(self):
+    CardEngine.seed(11)
+    first = CardEngine.shuffle(self.deck)
+    CardEngine.seed(11)
+    deck = list(self.deck)
+    CardEngine.shuffle_in_place(deck)
+    self.assertEqual(first, deck)
+    self.assertEqual(self.deck, range(52))
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_spatial
+----------------------------------
+
+Tests for the `GridIndex` spatial index and hit-testing in `CardEngine`.
+
+"""
+
+import unittest
+
+from python_card_game.engine import CardEngine, Event, EventType, MouseButton
+from python_card_game.engine.hitbox import SquareHitbox
+from python_card_game.engine.spatial import GridIndex
+
+
+class FakeElement(object):
+  # Minimal UI element backed by a hitbox, standing in for ui/UI.py elements.
+
+  def __init__(self, x, y, z, width=50, height=70, angle=0):
+    self.z = z
+    self.hitbox = SquareHitbox(x, y, width, height, angle)
+
+  def collide(self, x, y):
+    return self.hitbox.collide(x, y)
+
+  def get_bounds(self):
+    return self.hitbox.get_bounds()
+
+
+class TestGridIndex(unittest.TestCase):
+
+  def setUp(self):
+    self.index = GridIndex(cell_size=32)
+
+  def test_query_point(self):
+    self.index.insert('a', (0, 0, 100, 100))
+    self.index.insert('b', (50, 50, 60, 60))
+    self.assertEqual(self.index.query_point(55, 55), ['a', 'b'])
+    self.assertEqual(self.index.query_point(10, 10), ['a'])
+    self.assertEqual(self.index.query_point(500, 500), [])
+
+  def test_update_and_remove(self):
+    self.index.insert('a', (0, 0, 10, 10))
+    self.index.update('a', (200, 200, 210, 210))
+    self.assertEqual(self.index.query_point(5, 5), [])
+    self.assertEqual(self.index.query_point(205, 205), ['a'])
+
+    self.index.remove('a')
+    self.assertNotIn('a', self.index)
+    self.assertEqual(self.index.query_point(205, 205), [])
+    self.assertEqual(self.index._cells, {})
+
+  def test_negative_coordinates(self):
+    self.index.insert('a', (-40, -40, -1, -1))
+    self.assertEqual(self.index.query_point(-20, -20), ['a'])
+
+  def test_query_rect(self):
+    self.index.insert('a', (0, 0, 10, 10))
+    self.index.insert('b', (100, 100, 110, 110))
+    self.index.insert('c', (0, 0, 200, 200))
+    self.assertEqual(sorted(self.index.query_rect(5, 5, 50, 50)), ['a', 'c'])
+
+
+class TestHitTesting(unittest.TestCase):
+
+  def setUp(self):
+    CardEngine.init(headless=True)
+    self.clicked = []
+    CardEngine.cardClick += self.clicked.append
+
+  def tearDown(self):
+    CardEngine.cardClick -= self.clicked.append
+    CardEngine.remove_all_ui_elements()
+
+  def test_hitbox_bounds(self):
+    self.assertEqual(SquareHitbox(10, 20, 50, 70, 0).get_bounds(), (10, 20, 60, 90))
+    left, top, right, bottom = SquareHitbox(0, 0, 10, 10, 90).get_bounds()
+    self.assertAlmostEqual(left, 0)
+    self.assertAlmostEqual(top, -10)
+    self.assertAlmostEqual(right, 10)
+    self.assertAlmostEqual(bottom, 0)
+
+  def test_topmost_at(self):
+    low = FakeElement(0, 0, 1)
+    high = FakeElement(20, 20, 5)
+    far = FakeElement(400, 400, 9)
+    for element in (low, high, far):
+      CardEngine.add_ui_element(element)
+
+    self.assertIs(CardEngine.topmost_at(30, 30), high)
+    self.assertIs(CardEngine.topmost_at(5, 5), low)
+    self.assertIsNone(CardEngine.topmost_at(200, 200))
+
+    CardEngine.remove_ui_element(high)
+    self.assertIs(CardEngine.topmost_at(30, 30), low)
+
+  def test_moved_element(self):
+    element = FakeElement(0, 0, 1)
+    CardEngine.add_ui_element(element)
+    element.hitbox.update(300, 300)
+    CardEngine.update_ui_element(element)
+    self.assertIsNone(CardEngine.topmost_at(5, 5))
+    self.assertIs(CardEngine.topmost_at(310, 310), element)
+
+  def test_click_notifies(self):
+    element = FakeElement(0, 0, 1)
+    CardEngine.add_ui_element(element)
+    CardEngine.post_event(Event(EventType.MOUSEBUTTONDOWN, button=MouseButton.LEFT, pos=(10, 10)))
+    CardEngine.post_event(Event(EventType.MOUSEBUTTONDOWN, button=MouseButton.RIGHT, pos=(10, 10)))
+    CardEngine.update()
+    self.assertEqual(self.clicked, [element])
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(unittest.main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_ui_text
+----------------------------------
+
+Tests for the cached and incremental text drawing of `Text` and `TextBox` in `python_card_game/ui/UI.py`.
+
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python_card_game', 'ui'))
+
+# Run without a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+try:
+  import pygame
+except ImportError:
+  pygame = None
+else:
+  import UI
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestTextDrawing(unittest.TestCase):
+
+  def setUp(self):
+    pygame.display.set_mode((1, 1), 0, 32)
+
+    # Record the text of every render that goes through the shared text cache
+    self.rendered = []
+    self.cache = UI.TEXT_CACHE
+    cache = self.cache
+    rendered = self.rendered
+
+    class RecordingCache(object):
+      def render(self, font, text, *args, **kwargs):
+        rendered.append(text)
+        return cache.render(font, text, *args, **kwargs)
+    UI.TEXT_CACHE = RecordingCache()
+
+  def tearDown(self):
+    UI.TEXT_CACHE = self.cache
+    pygame.display.quit()
+
+  def test_text_redraws_only_on_change(self):
+    text = UI.Text(None, rect=(0, 0, 100, 20), text='score')
+    del self.rendered[:]
+    text.text = 'score'
+    self.assertEqual(self.rendered, [])
+    text.text = 'score 10'
+    self.assertEqual(self.rendered, ['score 10'])
+
+  def test_text_box_appends(self):
+    box = UI.TextBox(None, rect=(0, 0, 200, 30))
+    del self.rendered[:]
+    box.inputText = 'ab'
+    box._update()
+    box.inputText = 'abc'
+    box._update()
+    # Only the typed character is rendered on top of what is already drawn
+    self.assertEqual(self.rendered, ['ab', 'c'])
+
+  def test_text_box_redraws_when_text_changes_otherwise(self):
+    box = UI.TextBox(None, rect=(0, 0, 200, 30))
+    box.inputText = 'abc'
+    box._update()
+    del self.rendered[:]
+    box.inputText = 'ab'
+    box._update()
+    self.assertEqual(self.rendered, ['ab'])
+    box._update()
+    self.assertEqual(self.rendered, ['ab'])
+
+  def test_text_box_frame_invalidated(self):
+    box = UI.TextBox(None, rect=(0, 0, 200, 30), background_text='Name')
+    box.inputText = 'ab'
+    box._update()
+    del self.rendered[:]
+    # A new background color redraws the frame with its background text, and the input text on the new frame
+    box.backgroundColor = (200, 200, 200, 255)
+    self.assertEqual(self.rendered, ['Name', 'ab'])
+    self.assertEqual(tuple(box._surfaceInput.get_at((100, 15))), (200, 200, 200, 255))
+
+
+if __name__ == '__main__':
+  sys.exit(unittest.main())